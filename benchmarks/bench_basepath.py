@@ -0,0 +1,78 @@
+"""
+Compare basepath rewriting fused into node construction with the previous
+approach of two full-document re.sub passes over each rendered page.
+
+Usage: python3 benchmarks/bench_basepath.py [links_per_page] [pages]
+"""
+import sys, os, re, time, gc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.markdown import extract_markdown_images, extract_markdown_links
+from src.markdown_to_html import markdown_to_html_node
+from src.urls import normalize_basepath, prefix_url
+
+BASEPATH = "/Static-Site-Generator/"
+
+
+def legacy_prefix_basepath(html, basepath):
+    basepath = "/" + basepath.strip("/")
+    html = re.sub(r'href="/([^"]+)"', lambda m: f'href="{basepath}/{m.group(1)}"', html)
+    html = re.sub(r'src="/([^"]+)"', lambda m: f'src="{basepath}/{m.group(1)}"', html)
+    return html
+
+
+def make_page(links):
+    lines = ["# Links"]
+    for i in range(0, links, 4):
+        lines.append(
+            f"See [post {i}](/blog/post{i}), ![img {i}](/images/{i}.png), "
+            f"[ext {i}](https://example.com/{i}) and [rel {i}](page{i}.html) for more."
+        )
+    return "\n\n".join(lines)
+
+
+def best_of(fn, repeats=5):
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def main():
+    links = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    docs = [make_page(links) for _ in range(pages)]
+
+    def legacy():
+        return [legacy_prefix_basepath(markdown_to_html_node(d).to_html(), BASEPATH) for d in docs]
+
+    def fused():
+        return [markdown_to_html_node(d, BASEPATH).to_html() for d in docs]
+
+    assert legacy() == fused()
+    legacy_time = best_of(legacy)
+    fused_time = best_of(fused)
+
+    # The rewriting step on its own: regex passes over finished pages versus
+    # prefixing each link/image URL as its node is built
+    rendered = [markdown_to_html_node(d).to_html() for d in docs]
+    urls = [url for d in docs
+            for _, url in extract_markdown_links(d) + extract_markdown_images(d)]
+    url_prefix = normalize_basepath(BASEPATH)
+    regex_time = best_of(lambda: [legacy_prefix_basepath(html, BASEPATH) for html in rendered])
+    prefix_time = best_of(lambda: [prefix_url(url, url_prefix) for url in urls])
+
+    size_mb = sum(len(html) for html in rendered) / 1e6
+    print(f"{pages} pages x {links} links, {size_mb:.1f} MB of HTML")
+    print(f"  full render, regex post-pass: {legacy_time * 1000:8.1f} ms")
+    print(f"  full render, fused rewriting: {fused_time * 1000:8.1f} ms")
+    print(f"  rewrite step only, regex:     {regex_time * 1000:8.1f} ms")
+    print(f"  rewrite step only, fused:     {prefix_time * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare parsing with and without the block cache on pages that share a
+fraction of their blocks (footers, disclaimers, link lists) and on pages
+that share none.
+
+Usage: python3 benchmarks/bench_block_cache.py [pages] [shared_blocks] [entries]
+"""
+import sys, os, random, statistics, time, gc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import block_cache
+from src.markdown_to_html import parse_page
+from corpus import make_page
+
+
+def compare(docs, entries, rounds=5, chunk=10):
+    """
+    Parse docs with no cache and with a fresh cache of entries blocks per
+    round, chunk pages at a time, alternating which goes first: a shared
+    machine's drift then hits both alike. Returns the best round's total
+    for each, and the median on/off ratio over every chunk.
+    """
+    best, ratios = [float("inf")] * 2, []
+    gc.disable()
+    try:
+        for round_ in range(rounds):
+            cache = block_cache.BlockCache(entries)
+            totals = [0.0, 0.0]
+            for n, first in enumerate(range(0, len(docs), chunk)):
+                times = [0.0, 0.0]
+                for i in (0, 1) if (round_ + n) % 2 else (1, 0):
+                    block_cache.active = cache if i else None
+                    start = time.perf_counter()
+                    for doc in docs[first:first + chunk]:
+                        parse_page(doc)
+                    times[i] = time.perf_counter() - start
+                totals = [total + t for total, t in zip(totals, times)]
+                ratios.append(times[1] / times[0])
+            best = [min(b, total) for b, total in zip(best, totals)]
+    finally:
+        gc.enable()
+        block_cache.configure(0)
+    return best[0], best[1], statistics.median(ratios), cache
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    shared_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    entries = int(sys.argv[3]) if len(sys.argv) > 3 else 1024
+    rng = random.Random(1)
+    shared = make_page(rng, "Shared", shared_blocks).split("\n\n", 1)[1]
+    unique = [make_page(rng, f"Page {i}", 20) for i in range(pages)]
+    reused = [f"{page}\n\n{shared}" for page in unique]
+
+    for name, docs in (("no reuse", unique), (f"+{shared_blocks} shared blocks", reused)):
+        def parse(size):
+            block_cache.configure(size)
+            return [parse_page(doc) for doc in docs]
+
+        assert parse(0) == parse(entries)
+        off, on, ratio, cache = compare(docs, entries)
+        hits, misses = cache.hits, cache.misses
+        print(f"{pages} pages, {name}")
+        print(f"  cache off: {off * 1000:8.1f} ms")
+        print(f"  cache on:  {on * 1000:8.1f} ms  ({ratio:.0%}, {hits} hit(s), {misses} miss(es))")
+
+
+if __name__ == "__main__":
+    main()
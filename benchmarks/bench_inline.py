@@ -0,0 +1,67 @@
+"""
+Compare the single-pass inline lexer (text_to_textnodes) with the previous
+six-pass split_nodes pipeline on paragraph-heavy documents.
+
+Usage: python3 benchmarks/bench_inline.py [paragraphs] [repeats]
+"""
+import sys, os, time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.textnode import TextNode, TextType
+from src.markdown import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from corpus import make_paragraphs
+
+
+# Inputs where an element opens inside a link or image label, checked for
+# agreement along with the corpus
+EDGE_CASES = [
+    "[![logo](/images/logo.png)](/about)",
+    "[ b *c* [x](/u)",
+    "![a `b`](/c.png) and [d **e**](/f)",
+]
+
+
+def legacy_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT, None)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def bench(fn, paragraphs, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for p in paragraphs:
+            fn(p)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    paragraphs = make_paragraphs(count)
+    size_mb = sum(len(p) for p in paragraphs) / 1e6
+
+    for p in paragraphs + EDGE_CASES:
+        assert text_to_textnodes(p) == legacy_text_to_textnodes(p), p
+
+    legacy = bench(legacy_text_to_textnodes, paragraphs, repeats)
+    single = bench(text_to_textnodes, paragraphs, repeats)
+    print(f"{count} paragraphs, {size_mb:.2f} MB of inline markdown (best of {repeats})")
+    print(f"  six-pass pipeline: {legacy * 1000:8.1f} ms  {size_mb / legacy:6.1f} MB/s")
+    print(f"  single-pass lexer: {single * 1000:8.1f} ms  {size_mb / single:6.1f} MB/s")
+    print(f"  speedup: {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
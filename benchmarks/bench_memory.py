@@ -0,0 +1,125 @@
+"""
+Report memory used by parsed nodes: bytes per TextNode, bytes per HTMLNode
+and peak RSS while holding the parsed trees for a large synthetic corpus,
+with the slotted node classes and with the previous dict-backed ones that
+allocated an empty children list and props dict per node.
+
+Usage: python3 benchmarks/bench_memory.py [pages] [paragraphs_per_page]
+"""
+import sys, os, gc, resource, tracemalloc
+from contextlib import ExitStack, nullcontext
+from multiprocessing import get_context
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.markdown import text_to_textnodes
+from src.markdown_to_html import markdown_to_html_node
+from corpus import make_paragraphs
+
+
+class LegacyTextNode:
+    def __init__(self, text, text_type, url):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class LegacyHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children if children is not None else []
+        self.props = props if props is not None else {}
+
+
+class LegacyLeafNode(LegacyHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, [], props)
+
+
+class LegacyParentNode(LegacyHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag=tag, value=None, children=children, props=props)
+
+
+def legacy_nodes():
+    """Build nodes from the dict-backed classes while this context is open."""
+    stack = ExitStack()
+    for module, names in (("src.markdown", ["TextNode"]),
+                          ("src.converters", ["TextNode", "LeafNode"]),
+                          ("src.markdown_to_html", ["TextNode", "LeafNode", "ParentNode"])):
+        for name in names:
+            stack.enter_context(mock.patch(f"{module}.{name}", globals()[f"Legacy{name}"]))
+    return stack
+
+
+def make_pages(pages, paragraphs_per_page):
+    paragraphs = make_paragraphs(paragraphs_per_page * pages)
+    docs = []
+    for i in range(pages):
+        body = paragraphs[i * paragraphs_per_page:(i + 1) * paragraphs_per_page]
+        docs.append(
+            f"# Page {i}\n\n" + "\n\n".join(body)
+            + "\n\n- first **item**\n- second [link](/x)\n\n1. one\n2. two"
+        )
+    return docs
+
+
+def count_html_nodes(node):
+    count, stack = 0, [node]
+    while stack:
+        n = stack.pop()
+        count += 1
+        stack.extend(n.children)
+    return count
+
+
+def measure(build):
+    """Return (result, bytes allocated and still live) for build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def run(legacy, pages, per_page):
+    """Measure one set of node classes; runs in a fresh process so peak RSS is its own."""
+    docs = make_pages(pages, per_page)
+    paragraphs = [p for doc in docs for p in doc.split("\n\n")[1:-2]]
+    with legacy_nodes() if legacy else nullcontext():
+        # Peak RSS first, before tracemalloc's own bookkeeping inflates it
+        trees = [markdown_to_html_node(doc) for doc in docs]
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        del trees
+
+        text_nodes, text_bytes = measure(lambda: [text_to_textnodes(p) for p in paragraphs])
+        text_count = sum(len(nodes) for nodes in text_nodes)
+        del text_nodes
+
+        trees, tree_bytes = measure(lambda: [markdown_to_html_node(doc) for doc in docs])
+        html_count = sum(count_html_nodes(tree) for tree in trees)
+    return sum(len(d) for d in docs), text_count, text_bytes, html_count, tree_bytes, peak_rss_kb
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    results = {}
+    for name, legacy in (("dict-backed", True), ("slotted", False)):
+        with get_context("spawn").Pool(1) as pool:
+            results[name] = pool.apply(run, (legacy, pages, per_page))
+
+    print(f"{pages} pages, {results['slotted'][0] / 1e6:.1f} MB of markdown")
+    for name, (_, text_count, text_bytes, html_count, tree_bytes, peak_rss_kb) in results.items():
+        print(f"  {name}")
+        print(f"    TextNode: {text_count:9d} nodes  {text_bytes / text_count:6.1f} bytes/node (incl. lists, strings)")
+        print(f"    HTMLNode: {html_count:9d} nodes  {tree_bytes / html_count:6.1f} bytes/node (incl. props, strings)")
+        print(f"    peak RSS holding all trees: {peak_rss_kb / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Time each stage of the build separately on a synthetic corpus and emit JSON,
+so runs on different commits can be compared.
+
+Usage: python3 benchmarks/bench_stages.py [corpus options] [--repeats N]
+           [--output results.json] [--compare baseline.json [--threshold 0.1]]
+
+Corpus options are those of benchmarks/corpus.py (--pages, --blocks,
+--inline-density, --mix, --seed). With --compare, stages that got slower than
+the baseline by more than --threshold are reported and the exit status is 1.
+"""
+import sys, argparse, contextlib, gc, io, json, platform, subprocess, tempfile, time
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from src.converters import text_node_to_html_node
+from src.main import build_pages
+from src.markdown import (
+    BlockType,
+    block_to_block_type,
+    extract_markdown_images,
+    extract_markdown_links,
+    iter_blocks,
+    markdown_to_blocks,
+    text_to_textnodes,
+)
+from src.markdown_to_html import markdown_to_html_node
+from src.template import Template
+from src.urls import normalize_basepath, prefix_url
+from corpus import add_corpus_arguments, write_corpus
+
+BASEPATH = "/Static-Site-Generator/"
+
+
+def inline_texts(block, block_type):
+    """The inline markdown markdown_to_html_node hands to text_to_textnodes for a block."""
+    if block_type == BlockType.HEADING:
+        return [block.split(" ", 1)[1]]
+    if block_type == BlockType.CODE:
+        return []
+    if block_type == BlockType.QUOTE:
+        return [" ".join(line.lstrip("> ") for line in block.splitlines())]
+    if block_type in (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        return [line.split(" ", 1)[1] for line in block.splitlines() if " " in line]
+    return [block]
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def run_stages(content_dir: Path, work_dir: Path, repeats: int):
+    """Return ({stage: timing}, {input/output sizes}) for the corpus in content_dir."""
+    template_source = (ROOT / "template.html").read_text(encoding="utf-8")
+    paths = sorted(content_dir.rglob("*.md"))
+    docs = [p.read_text(encoding="utf-8") for p in paths]
+    blocks = [b for d in docs for b in markdown_to_blocks(d)]
+    typed = [(b, block_to_block_type(b)) for b in blocks]
+    texts = [t for b, kind in typed for t in inline_texts(b, kind)]
+    text_nodes = [n for t in texts for n in text_to_textnodes(t)]
+    trees = [markdown_to_html_node(d, BASEPATH) for d in docs]
+    contents = [tree.to_html() for tree in trees]
+    url_prefix = normalize_basepath(BASEPATH)
+    template = Template(template_source, url_prefix)
+    pages = [template.render({"Title": f"Page {i}", "Content": c}) for i, c in enumerate(contents)]
+    urls = [url for d in docs for _, url in extract_markdown_links(d) + extract_markdown_images(d)]
+    out_dir = work_dir / "out"
+    out_dir.mkdir()
+    page_bytes = [p.encode("utf-8") for p in pages]
+
+    def write_pages():
+        for i, data in enumerate(page_bytes):
+            (out_dir / f"{i}.html").write_bytes(data)
+
+    def end_to_end():
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_pages(content_dir, ROOT / "template.html", work_dir / "docs", BASEPATH,
+                        manifest_path=work_dir / "manifest.json")
+
+    stages = {
+        "read": (lambda: [p.read_text(encoding="utf-8") for p in paths], len(paths)),
+        "markdown_to_blocks": (lambda: [markdown_to_blocks(d) for d in docs], len(docs)),
+        "block_to_block_type": (lambda: [block_to_block_type(b) for b in blocks], len(blocks)),
+        # Split and type in one pass, as markdown_to_html_node does
+        "iter_blocks": (lambda: [list(iter_blocks(d.split("\n"))) for d in docs], len(docs)),
+        "text_to_textnodes": (lambda: [text_to_textnodes(t) for t in texts], len(texts)),
+        "text_node_to_html_node": (
+            lambda: [text_node_to_html_node(n, url_prefix) for n in text_nodes], len(text_nodes)),
+        "markdown_to_html_node": (lambda: [markdown_to_html_node(d, BASEPATH) for d in docs], len(docs)),
+        "to_html": (lambda: [tree.to_html() for tree in trees], len(trees)),
+        "template": (
+            lambda: [template.render({"Title": "T", "Content": c}) for c in contents], len(contents)),
+        # The basepath rewrite is fused into node construction; this is its per-URL cost
+        "basepath": (lambda: [prefix_url(u, url_prefix) for u in urls], len(urls)),
+        "write": (write_pages, len(page_bytes)),
+        "end_to_end": (end_to_end, len(paths)),
+    }
+
+    results = {}
+    for name, (fn, items) in stages.items():
+        seconds = best_of(fn, repeats)
+        results[name] = {
+            "seconds": seconds,
+            "items": items,
+            "us_per_item": seconds / items * 1e6 if items else None,
+        }
+    sizes = {
+        "markdown_bytes": sum(len(d.encode("utf-8")) for d in docs),
+        "html_bytes": sum(len(b) for b in page_bytes),
+    }
+    return results, sizes
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage ratios against baseline; return the stages that regressed."""
+    regressions = []
+    for name, stage in results["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old:
+            continue
+        ratio = stage["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:24s} {old['seconds'] * 1000:9.2f} -> {stage['seconds'] * 1000:9.2f} ms  x{ratio:.2f}{flag}",
+              file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage build benchmark")
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown per stage before it counts as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        write_corpus(work_dir / "content", args.pages, args.blocks, args.mix,
+                     args.inline_density, args.seed)
+        stages, sizes = run_stages(work_dir / "content", work_dir, args.repeats)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            "pages": args.pages,
+            "blocks": args.blocks,
+            "inline_density": args.inline_density,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "repeats": args.repeats,
+        "sizes": sizes,
+        "stages": stages,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
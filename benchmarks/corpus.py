@@ -0,0 +1,126 @@
+"""
+Reproducible synthetic content trees for benchmarks.
+
+Usage: python3 benchmarks/corpus.py OUT_DIR [--pages N] [--blocks N]
+           [--inline-density F] [--mix heading=1,paragraph=6,...] [--seed N]
+
+The same parameters and seed always produce byte-identical markdown.
+"""
+import argparse
+import random
+from pathlib import Path
+
+WORDS = "the ring elf hobbit road river mountain shadow light song king tree".split()
+
+INLINE = [
+    lambda w: f"**{w}**",
+    lambda w: f"*{w}*",
+    lambda w: f"_{w}_",
+    lambda w: f"`{w}`",
+    lambda w: f"[{w}](/blog/{w})",
+    lambda w: f"![{w}](/images/{w}.png)",
+]
+
+# Relative weight of each block type in a page
+DEFAULT_MIX = {
+    "heading": 1,
+    "paragraph": 6,
+    "unordered_list": 1,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+
+def make_inline_text(rng, words, inline_density):
+    """A run of words where roughly inline_density of them carry inline markup."""
+    out = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        out.append(rng.choice(INLINE)(word) if rng.random() < inline_density else word)
+    return " ".join(out)
+
+
+def make_paragraphs(count, seed=1, inline_density=0.15):
+    rng = random.Random(seed)
+    return [make_inline_text(rng, rng.randint(40, 120), inline_density) for _ in range(count)]
+
+
+def make_block(rng, kind, inline_density):
+    if kind == "heading":
+        return "#" * rng.randint(2, 4) + " " + make_inline_text(rng, rng.randint(2, 6), inline_density)
+    if kind == "paragraph":
+        # Always end with a period so the paragraph can't pass for a list
+        return make_inline_text(rng, rng.randint(40, 120), inline_density) + "."
+    if kind == "unordered_list":
+        return "\n".join("- " + make_inline_text(rng, rng.randint(4, 12), inline_density)
+                         for _ in range(rng.randint(2, 6)))
+    if kind == "ordered_list":
+        return "\n".join(f"{i}. " + make_inline_text(rng, rng.randint(4, 12), inline_density)
+                         for i in range(1, rng.randint(2, 6) + 1))
+    if kind == "quote":
+        return "\n".join("> " + make_inline_text(rng, rng.randint(6, 16), inline_density)
+                         for _ in range(rng.randint(1, 4)))
+    if kind == "code":
+        return "```\n" + "\n".join(f"print({rng.choice(WORDS)!r})"
+                                   for _ in range(rng.randint(2, 10))) + "\n```"
+    raise ValueError(f"Unknown block type: {kind}")
+
+
+def make_page(rng, title, blocks, mix=None, inline_density=0.15):
+    """Markdown for one page: an h1 followed by blocks drawn from mix."""
+    mix = mix or DEFAULT_MIX
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=blocks)
+    return "\n\n".join([f"# {title}"] + [make_block(rng, kind, inline_density) for kind in kinds])
+
+
+def iter_corpus(pages, blocks=20, mix=None, inline_density=0.15, seed=1):
+    """Yield (relative path, markdown) for each page, spread over nested sections."""
+    rng = random.Random(seed)
+    for i in range(pages):
+        rel = Path(f"section-{i % 10}") / f"page-{i}" / "index.md"
+        yield rel, make_page(rng, f"Page {i}", blocks, mix, inline_density)
+
+
+def write_corpus(root: Path, pages, blocks=20, mix=None, inline_density=0.15, seed=1) -> int:
+    """Write a content tree under root; returns the number of bytes written."""
+    total = 0
+    for rel, markdown in iter_corpus(pages, blocks, mix, inline_density, seed):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        total += path.write_text(markdown, encoding="utf-8")
+    return total
+
+
+def parse_mix(text):
+    """Parse "paragraph=6,code=1" into a mix dict."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown block type: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=20, help="blocks per page")
+    parser.add_argument("--inline-density", type=float, default=0.15,
+                        help="fraction of words carrying inline markup")
+    parser.add_argument("--mix", type=parse_mix, default=None,
+                        help="block weights, e.g. heading=1,paragraph=6,code=1")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out", type=Path)
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    size = write_corpus(args.out, args.pages, args.blocks, args.mix, args.inline_density, args.seed)
+    print(f"wrote {args.pages} pages ({size / 1e6:.1f} MB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
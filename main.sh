@@ -1,3 +1,3 @@
 #!/bin/bash
-python3 src/main.py        # builds into docs/ now
-cd docs && python3 -m http.server 8888
+# Build into docs/, then serve it with live reload, rebuilding on every edit
+python3 src/main.py --incremental --watch --port 8888
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path, PurePosixPath
+
+from src.manifest import hash_bytes
+
+# Written to the output root: {"/index.css": "/index.3f2a9c0b1d.css", ...}
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+# Hex digits of the content hash put into fingerprinted names
+FINGERPRINT_LENGTH = 10
+
+
+def fingerprinted_name(rel: str, digest: str) -> str:
+    """"images/a.png" with its sha256 digest -> "images/a.<first digits>.png"."""
+    path = PurePosixPath(rel)
+    return path.with_name(f"{path.stem}.{digest[:FINGERPRINT_LENGTH]}{path.suffix}").as_posix()
+
+
+class AssetMap:
+    """
+    Site-absolute URL of every static file -> the URL of its fingerprinted
+    copy, built from a fingerprinting sync_static state. Treated as immutable:
+    it hashes and compares by digest, so it can be part of a cache key, and
+    the digest is recorded in the build manifest.
+    """
+
+    __slots__ = ("urls", "digest")
+
+    def __init__(self, urls=None):
+        self.urls = dict(urls or {})
+        self.digest = hash_bytes(json.dumps(sorted(self.urls.items())).encode("utf-8"))
+
+    @classmethod
+    def from_static(cls, static_state: dict) -> "AssetMap":
+        return cls({f"/{rel}": f"/{fingerprinted_name(rel, entry[2])}" for rel, entry in static_state.items()})
+
+    def get(self, url: str, default=None):
+        return self.urls.get(url, default)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __eq__(self, other):
+        return isinstance(other, AssetMap) and other.digest == self.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(dict(sorted(self.urls.items())), indent=2) + "\n", encoding="utf-8")
+        tmp.replace(path)
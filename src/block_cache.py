@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+# Blocks longer than this are parsed every time: big blocks rarely repeat
+# and would crowd out the boilerplate the cache is for
+MAX_BLOCK_CHARS = 16 << 10
+
+# Keys seen once are remembered (as hashes) for this many times max_entries
+# blocks, then forgotten all at once
+SEEN_PER_ENTRY = 8
+
+
+class BlockCache:
+    """
+    In-memory LRU of rendered markdown blocks: (block type, block text, URL
+    prefix, AssetMap, whether terms are collected) -> (HTML, PageMetadata
+    gathered from that block alone). Up to max_entries blocks are kept,
+    least recently used dropped first. hits and misses count lookups.
+
+    A block is stored only once admit() has seen its key before, so pages
+    with nothing in common pay for lookups, not for rendering every block
+    to a string and churning the LRU.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._seen = set()  # hashes of keys missed once
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def admit(self, key) -> bool:
+        """True if key was missed before, else remember it and return False."""
+        h = hash(key)
+        if h in self._seen:
+            return True
+        if len(self._seen) >= SEEN_PER_ENTRY * self.max_entries:
+            self._seen.clear()
+        self._seen.add(h)
+        return False
+
+    def put(self, key, entry) -> None:
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# The cache every parse in this process uses, or None; see configure()
+active = None
+
+
+def configure(max_entries: int) -> None:
+    """Give this process a BlockCache of max_entries blocks, or none with 0."""
+    global active
+    active = BlockCache(max_entries) if max_entries > 0 else None
+
+
+def counters() -> tuple:
+    """(hits, misses) of this process's cache so far; (0, 0) without one."""
+    return (active.hits, active.misses) if active is not None else (0, 0)
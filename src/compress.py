@@ -0,0 +1,130 @@
+import gzip
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz variants are written
+    brotli = None
+
+log = logging.getLogger("ssg")
+
+# Text formats worth serving compressed; images, fonts and archives already are
+COMPRESSIBLE_SUFFIXES = {".html", ".htm", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".map"}
+
+VARIANT_SUFFIXES = (".gz", ".br")
+
+
+def encodings() -> dict:
+    """Suffix -> compress function for every encoding available here."""
+    # mtime=0 keeps the gzip header, and so the output, reproducible
+    found = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        found[".br"] = lambda data: brotli.compress(data, quality=11)
+    return found
+
+
+def _compress_file(path: Path, variants) -> None:
+    data = path.read_bytes()
+    st = path.stat()
+    for suffix, compress in variants:
+        out = path.with_name(path.name + suffix)
+        tmp = out.with_name(f".{out.name}.tmp")
+        tmp.write_bytes(compress(data))
+        # Stamp the variant with its source's mtime: an equal mtime means up to date
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, out)
+
+
+def _files(root: Path, paths=None):
+    """Every file under root, or just those paths (and their variants) relative to root."""
+    for rel in paths if paths is not None else [""]:
+        if not rel or rel.endswith("/"):
+            for dirpath, _, filenames in os.walk(root / rel):
+                for name in filenames:
+                    yield Path(dirpath) / name
+            continue
+        path = root / rel
+        for candidate in [path] + [path.with_name(path.name + suffix) for suffix in VARIANT_SUFFIXES]:
+            if candidate.is_file():
+                yield candidate
+
+
+def precompress(root: Path, workers=0, stats=None, available=None, paths=None) -> None:
+    """
+    Write a .gz sibling (and a .br one when brotli is installed) for every
+    compressible file under root, so a web server can serve them as they are.
+    A variant whose mtime matches its source's is up to date and left alone;
+    variants whose source is gone, or that are stale and can't be rebuilt
+    here, are deleted. Compression runs on a thread pool (zlib and brotli
+    release the GIL); workers=0 means one per CPU. Hidden files (manifests,
+    temporaries) are skipped. If stats is a dict, compressed_files,
+    compressed_bytes and removed_files are stored in it.
+    available (suffix -> compress function) defaults to encodings(). With
+    paths (outputs relative to root, or directories ending in "/"), only
+    those are brought up to date instead of every file under root.
+    """
+    if available is None:
+        available = encodings()
+    sources, variants = {}, []
+    for path in dict.fromkeys(_files(root, paths)):
+        if path.name.startswith("."):
+            continue
+        suffix = path.suffix.lower()
+        if suffix in VARIANT_SUFFIXES:
+            # Only "page.html.gz" is a variant; a static "archive.tar.gz" is left alone
+            if path.with_suffix("").suffix.lower() in COMPRESSIBLE_SUFFIXES:
+                variants.append(path)
+        elif suffix in COMPRESSIBLE_SUFFIXES:
+            sources[path] = path.stat().st_mtime_ns
+
+    removed = 0
+    for variant in variants:
+        source = variant.with_suffix("")
+        if source not in sources or (variant.suffix not in available
+                                     and variant.stat().st_mtime_ns != sources[source]):
+            variant.unlink()
+            removed += 1
+
+    pending = []
+    for path, mtime_ns in sources.items():
+        stale = []
+        for suffix, compress in available.items():
+            try:
+                fresh = path.with_name(path.name + suffix).stat().st_mtime_ns == mtime_ns
+            except FileNotFoundError:
+                fresh = False
+            if not fresh:
+                stale.append((suffix, compress))
+        if stale:
+            pending.append((path, stale))
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        # list() so any error is raised here
+        list(pool.map(lambda job: _compress_file(*job), pending))
+    if available:
+        log.info(f"Compressed {len(pending)} file(s) ({', '.join(available)})")
+    if stats is not None:
+        stats["compressed_files"] = len(pending)
+        stats["compressed_bytes"] = sum(path.stat().st_size for path, _ in pending)
+        stats["removed_files"] = removed
+
+
+def remove_variants(root: Path, stats=None) -> None:
+    """
+    Delete every compressed variant precompress would have written under
+    root, fresh or not, e.g. once precompressing is turned off. If stats is
+    a dict, removed_files is stored in it.
+    """
+    removed = 0
+    for path in _files(root):
+        if (not path.name.startswith(".") and path.suffix.lower() in VARIANT_SUFFIXES
+                and path.with_suffix("").suffix.lower() in COMPRESSIBLE_SUFFIXES):
+            path.unlink()
+            removed += 1
+    if removed:
+        log.info(f"Removed {removed} compressed file(s)")
+    if stats is not None:
+        stats["removed_files"] = removed
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+from collections import OrderedDict
+from contextlib import nullcontext
+from pathlib import Path
+
+from src.manifest import hash_bytes
+from src.markdown import decode_markdown
+from src.markdown_to_html import PageMetadata, parse_page
+from src.urls import normalize_basepath, prefix_url
+
+CACHE_DIR_NAME = ".ssg-cache"
+
+# Bump whenever a change to markdown parsing or HTML node building alters the
+# content HTML, so entries written by an older parser are never reused.
+PARSER_VERSION = "4"
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+# Entries are parsed with this basepath and the real one is substituted on
+# read, so one entry serves every basepath. It can't occur in HTML built from
+# sources without NUL bytes, and sources with them are never cached.
+_BASEPATH_PLACEHOLDER = "/\x00basepath\x00"
+# A placeholder-prefixed URL up to the end of its attribute value
+_PLACEHOLDER_URL_RE = re.compile(re.escape(_BASEPATH_PLACEHOLDER) + r'(/[^"]*)')
+
+
+class ContentCache:
+    """
+    On-disk cache of the PageMetadata and content HTML of each markdown source, keyed
+    by a hash of the source bytes and PARSER_VERSION. Entries don't depend on
+    the template or basepath, so changing either skips markdown parsing.
+
+    Entries are written to a per-process temporary file and renamed into place,
+    so parallel workers and concurrent builds only ever read complete entries.
+    Reading an entry refreshes its mtime; evict() drops the least recently used
+    entries once the cache grows past max_bytes. Any unreadable entry is a miss.
+
+    A long-running process can also keep up to memory_entries entries in
+    memory, most recently used first. They aren't sent to worker processes.
+    """
+
+    def __init__(self, root: Path, max_bytes=DEFAULT_MAX_BYTES, memory_entries=0):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        return state
+
+    def _remember(self, key: str, entry) -> None:
+        if self.memory_entries:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def key(source: bytes) -> str:
+        return hash_bytes(PARSER_VERSION.encode("ascii") + b"\0" + source)
+
+    def get(self, key: str):
+        """Return (PageMetadata, content HTML with the placeholder) for key, or None."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_bytes())
+            metadata, html = PageMetadata.from_dict(entry["metadata"]), entry["html"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._remember(key, (metadata, html))
+        return metadata, html
+
+    def put(self, key: str, metadata: PageMetadata, html: str) -> None:
+        """Store an entry; failing to write it only costs a later re-parse."""
+        self._remember(key, (metadata, html))
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"metadata": metadata.as_dict(), "html": html}), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def render(self, source: bytes, basepath="/", profile=None, assets=None, collect_terms=False):
+        """
+        Return (PageMetadata, content HTML) for markdown source bytes, parsing only
+        on a miss. With a PageProfile, lookups and stores are timed as "cache".
+        The basepath, and an AssetMap's fingerprinted URLs, are applied on the
+        way out, so entries stay valid when either changes. With collect_terms,
+        an entry stored without search terms counts as a miss.
+        """
+        if b"\0" in source:
+            return parse_page(decode_markdown(source), basepath, profile, assets, collect_terms)
+        key = self.key(source)
+        with profile.measure("cache") if profile is not None else nullcontext():
+            cached = self.get(key)
+        if cached is None or (collect_terms and cached[0].terms is None):
+            metadata, html = parse_page(decode_markdown(source), _BASEPATH_PLACEHOLDER, profile,
+                                        collect_terms=collect_terms)
+            with profile.measure("cache") if profile is not None else nullcontext():
+                self.put(key, metadata, html)
+        else:
+            metadata, html = cached
+        url_prefix = normalize_basepath(basepath)
+        if assets is None:
+            return metadata, html.replace(_BASEPATH_PLACEHOLDER, url_prefix)
+        return metadata, _PLACEHOLDER_URL_RE.sub(lambda m: prefix_url(m.group(1), url_prefix, assets), html)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits in max_bytes; returns the count."""
+        entries, total = [], 0
+        # scandir rather than glob: this runs after every build, even one
+        # that rendered a single page
+        try:
+            shards = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        except FileNotFoundError:
+            shards = []
+        for shard in shards:
+            with os.scandir(shard) as files:
+                for entry in files:
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
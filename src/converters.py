@@ -1,20 +1,28 @@
 from src.textnode import TextNode, TextType
 from src.htmlnode import LeafNode
+from src.urls import prefix_url
 
-def text_node_to_html_node(text_node):
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
-    elif text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    elif text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    elif text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    else:
-        raise ValueError(f"Unsupported TextType: {text_node.text_type}")
-    
+# One converter per TextType, looked up once instead of walking an if/elif chain.
+# Each takes the node, the normalized basepath (see src.urls.normalize_basepath)
+# and an AssetMap or None.
+_CONVERTERS = {
+    TextType.TEXT: lambda node, prefix, assets: LeafNode(None, node.text),
+    TextType.BOLD: lambda node, prefix, assets: LeafNode("b", node.text),
+    TextType.ITALIC: lambda node, prefix, assets: LeafNode("i", node.text),
+    TextType.CODE: lambda node, prefix, assets: LeafNode("code", node.text),
+    TextType.LINK: lambda node, prefix, assets: LeafNode(
+        "a", node.text, {"href": prefix_url(node.url, prefix, assets)}),
+    TextType.IMAGE: lambda node, prefix, assets: LeafNode(
+        "img", "", {"src": prefix_url(node.url, prefix, assets), "alt": node.text}),
+}
 
+def text_node_to_html_node(text_node, url_prefix="", assets=None):
+    """
+    Convert a TextNode to a LeafNode. Site-absolute link and image URLs are
+    prefixed with url_prefix, an already-normalized basepath such as "/site",
+    and point at fingerprinted files when an AssetMap is given.
+    """
+    convert = _CONVERTERS.get(text_node.text_type)
+    if convert is None:
+        raise ValueError(f"Unsupported TextType: {text_node.text_type}")
+    return convert(text_node, url_prefix, assets)
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from src.manifest import BuildManifest, hash_file, stat_key
+
+# Unix socket the daemon listens on, in the project root
+DAEMON_SOCKET_NAME = ".ssg-daemon.sock"
+
+log = logging.getLogger("ssg")
+
+
+class SourceSnapshot:
+    """
+    What a long-running builder remembers about the content tree between
+    builds: the page list from the last walk, each source's hash (reused while
+    its [size, mtime_ns] is unchanged) and the manifest it saved last (reused
+    while the file on disk is the one it wrote). list_pages() returns the
+    (markdown_path, html_path) pairs, like iter_pages.
+    """
+
+    def __init__(self, list_pages):
+        self._list_pages = list_pages
+        self._pages = None
+        self._hashes = {}  # source path -> (stat key, sha256)
+        self._manifest = None  # (path, stat key, BuildManifest)
+
+    def pages(self) -> list:
+        if self._pages is None:
+            self._pages = list(self._list_pages())
+        return self._pages
+
+    def hash(self, path: Path) -> str:
+        key = stat_key(path)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = hash_file(path)
+        self._hashes[path] = (key, digest)
+        return digest
+
+    def load_manifest(self, path: Path) -> BuildManifest:
+        cached = self._manifest
+        if cached is not None and cached[0] == path and cached[1] == stat_key(path):
+            return cached[2]
+        return BuildManifest.load(path)
+
+    def saved_manifest(self, path: Path, manifest: BuildManifest) -> None:
+        self._manifest = (path, stat_key(path), manifest)
+
+    def forget(self, paths=None) -> None:
+        """
+        Drop what is known about paths (everything when None). A markdown
+        file that appeared or disappeared, or any directory, means walking the
+        tree again on the next build.
+        """
+        if paths is None:
+            self._pages, self._manifest = None, None
+            self._hashes.clear()
+            return
+        known = {from_path for from_path, _ in self._pages or ()}
+        for path in paths:
+            self._hashes.pop(path, None)
+            if path.is_dir() or (path.suffix.lower() == ".md" and (path in known) != path.is_file()):
+                self._pages = None
+
+
+class BuildQueue:
+    """
+    Runs builds one at a time on a background thread, coalescing requests.
+    Every request that arrives while a build is running is folded into the
+    next one, and each submit() returns the result of the first build that
+    started after it was made, so no caller sees a build that missed its
+    paths. build(paths) gets a set of paths, or None for everything.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._cond = threading.Condition()
+        self._paths = set()
+        self._everything = False
+        self._waiting = 0  # requests not yet picked up by a build
+        self._started = 0
+        self._finished = 0
+        self._results = OrderedDict()  # build number -> result, for waiting callers
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="ssg-builder", daemon=True)
+        self._thread.start()
+
+    def submit(self, paths=None) -> dict:
+        with self._cond:
+            if paths is None:
+                self._everything = True
+            else:
+                self._paths.update(paths)
+            self._waiting += 1
+            ticket = self._started + 1
+            self._cond.notify_all()
+            while self._finished < ticket and not self._stopped:
+                self._cond.wait()
+            return self._results.get(ticket, {"ok": False, "error": "build daemon is shutting down"})
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._waiting and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                paths = None if self._everything else self._paths
+                coalesced = self._waiting
+                self._paths, self._everything, self._waiting = set(), False, 0
+                self._started += 1
+                number = self._started
+
+            start = time.perf_counter()
+            try:
+                result = {"ok": True, "rendered": self._build(paths)}
+            except Exception as e:
+                log.error(f"Build {number} failed: {type(e).__name__}: {e}")
+                result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                if getattr(e, "failures", None):
+                    result["failures"] = [list(failure) for failure in e.failures]
+                if getattr(e, "broken_links", None):
+                    result["broken_links"] = [list(link) for link in e.broken_links]
+            result["seconds"] = time.perf_counter() - start
+            result["requests"] = coalesced
+
+            with self._cond:
+                self._results[number] = result
+                while len(self._results) > 64:
+                    self._results.popitem(last=False)
+                self._finished = number
+                self._cond.notify_all()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One JSON request per line, answered by one JSON line."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                paths = request.get("paths")
+                if paths is not None:
+                    paths = {self.server.resolve(p) for p in paths}
+            except (ValueError, TypeError, AttributeError) as e:
+                result = {"ok": False, "error": f"bad request: {e}"}
+            else:
+                if request.get("command") == "stop":
+                    self._reply({"ok": True})
+                    threading.Thread(target=self.server.shutdown).start()
+                    return
+                result = self.server.queue.submit(paths)
+            self._reply(result)
+
+    def _reply(self, result):
+        self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class BuildDaemon:
+    """
+    Serves a BuildQueue on a Unix socket. Clients send lines such as
+    {"paths": ["content/blog/post.md"]} (relative to root, or absolute),
+    {"paths": null} to rebuild everything, or {"command": "stop"}, and get
+    back {"ok", "rendered", "seconds", "requests"} or {"ok": false, "error"}.
+    """
+
+    def __init__(self, socket_path: Path, build, root: Path):
+        server_class = getattr(socketserver, "ThreadingUnixStreamServer", None)
+        if server_class is None:
+            raise RuntimeError("the build daemon needs Unix domain sockets, which this platform lacks")
+        self.socket_path = Path(socket_path)
+        _claim_socket(self.socket_path)
+        self.queue = BuildQueue(build)
+        self._server = server_class(os.fspath(self.socket_path), _Handler)
+        self._server.daemon_threads = True
+        self._server.queue = self.queue
+        self._server.resolve = lambda p: Path(os.path.normpath(Path(root) / p))
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.queue.stop()
+            self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+
+
+def _claim_socket(path: Path) -> None:
+    """Remove a socket left by a daemon that died; refuse if one is still listening."""
+    if not path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(os.fspath(path))
+    except OSError:
+        path.unlink()
+    else:
+        raise RuntimeError(f"a build daemon is already listening on {path}")
+    finally:
+        probe.close()
@@ -0,0 +1,60 @@
+"""
+Ask a running build daemon (main.py --daemon) to rebuild paths:
+
+    python3 src/daemon_client.py content/blog/post.md static/index.css
+    python3 src/daemon_client.py --all
+    python3 src/daemon_client.py --stop
+
+Imports only the standard library, so a request costs an interpreter start
+and a socket round trip, not loading the generator.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Keep in sync with src.daemon.DAEMON_SOCKET_NAME
+DEFAULT_SOCKET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".ssg-daemon.sock")
+
+
+def request(message: dict, socket_path=DEFAULT_SOCKET, timeout=None) -> dict:
+    """Send one request and wait for its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as replies:
+            line = replies.readline()
+    if not line:
+        raise ConnectionError("the build daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send a rebuild request to the build daemon.")
+    parser.add_argument("paths", nargs="*", help="changed or removed files, relative to the project root")
+    parser.add_argument("--all", action="store_true", help="rebuild everything, rescanning the tree")
+    parser.add_argument("--stop", action="store_true", help="shut the daemon down")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="daemon socket path")
+    args = parser.parse_args(argv)
+    if not (args.paths or args.all or args.stop):
+        parser.error("give paths to rebuild, --all or --stop")
+
+    if args.stop:
+        message = {"command": "stop"}
+    else:
+        cwd = os.getcwd()
+        message = {"paths": None if args.all else [os.path.join(cwd, p) for p in args.paths]}
+    try:
+        reply = request(message, args.socket)
+    except OSError as e:
+        sys.exit(f"No build daemon at {args.socket}: {e}")
+    if not reply["ok"]:
+        sys.exit(f"Build failed: {reply['error']}")
+    if "rendered" in reply:
+        print(f"Rendered {len(reply['rendered'])} page(s) in {reply['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
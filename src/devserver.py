@@ -0,0 +1,149 @@
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from src.urls import normalize_basepath
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = () => location.reload();</script>'
+).encode("utf-8")
+
+
+class PageCache:
+    """
+    In-memory copy of the built site: output path relative to root -> the bytes
+    served for it. Misses are loaded from disk once; rebuilt pages are put()
+    directly so a refresh never waits on the filesystem.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def get(self, rel: str):
+        with self._lock:
+            data = self._files.get(rel)
+        if data is None:
+            path = self.root / rel
+            if not path.is_file():
+                return None
+            data = self.put(rel, path.read_bytes())
+        return data
+
+    def put(self, rel: str, data: bytes) -> bytes:
+        if rel.endswith(".html"):
+            # Inject the live-reload client once, when the page enters the cache
+            head, body_end, tail = data.rpartition(b"</body>")
+            data = head + LIVE_RELOAD_SCRIPT + body_end + tail if body_end else data + LIVE_RELOAD_SCRIPT
+        with self._lock:
+            self._files[rel] = data
+        return data
+
+    def invalidate(self, rel: str = None) -> None:
+        """
+        Forget one cached file, every file under a directory given with a
+        trailing "/", or everything when rel is None.
+        """
+        with self._lock:
+            if rel is None:
+                self._files.clear()
+            elif rel.endswith("/"):
+                for cached in [cached for cached in self._files if cached.startswith(rel)]:
+                    del self._files[cached]
+            else:
+                self._files.pop(rel, None)
+
+
+class DevServer:
+    """Serves a PageCache over HTTP and pushes reload events to open pages."""
+
+    def __init__(self, root: Path, port=8888, basepath="/", host="localhost"):
+        self.cache = PageCache(root)
+        self.url_prefix = normalize_basepath(basepath)
+        self._version = 0
+        self._changed = threading.Condition()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def resolve(self, url_path: str):
+        """Map a request path to a cached output path, or None if there is none."""
+        path = unquote(urlsplit(url_path).path)
+        if self.url_prefix and (path == self.url_prefix or path.startswith(self.url_prefix + "/")):
+            path = path[len(self.url_prefix):]
+        rel = path.strip("/")
+        if ".." in rel.split("/"):
+            return None
+        candidates = [rel + "/index.html" if rel else "index.html", rel + ".html"]
+        if rel and not path.endswith("/"):
+            candidates.insert(0, rel)
+        for candidate in candidates:
+            if self.cache.get(candidate) is not None:
+                return candidate
+        return None
+
+    def notify_reload(self) -> None:
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def wait_for_reload(self, seen: int, timeout: float) -> int:
+        """Block until a reload newer than seen is announced (or timeout); return the version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != seen, timeout)
+            return self._version
+
+    def serve_in_background(self) -> None:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _make_handler(server: DevServer):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == LIVE_RELOAD_PATH:
+                return self._live_reload()
+            rel = server.resolve(self.path)
+            data = server.cache.get(rel) if rel is not None else None
+            if data is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(rel)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _live_reload(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            seen = server.wait_for_reload(-1, 0)
+            try:
+                while True:
+                    version = server.wait_for_reload(seen, 15)
+                    # A comment line keeps idle connections alive
+                    self.wfile.write(b"data: reload\n\n" if version != seen else b": ping\n\n")
+                    self.wfile.flush()
+                    seen = version
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
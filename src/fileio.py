@@ -0,0 +1,54 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+# Default for --io-threads: file system calls kept waiting at once. Threads
+# are enough, since they release the GIL while they wait on the disk.
+IO_THREADS = 8
+
+
+def _list_dir(path: Path) -> list:
+    # DirEntry types come from the directory listing itself on most systems,
+    # so telling files from directories rarely costs a stat per entry
+    with os.scandir(path) as entries:
+        return [(Path(entry.path), entry.is_dir(), entry.is_file()) for entry in entries]
+
+
+def scan_tree(root: Path, workers=IO_THREADS) -> dict:
+    """
+    List every directory under root, listing up to workers directories at
+    once: {directory: [(path, is_dir, is_file), ...] sorted by path}.
+    Symlinks are followed, as Path.is_dir() and is_file() do.
+    """
+    listing = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {pool.submit(_list_dir, root): root}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory = running.pop(future)
+                listing[directory] = entries = sorted(future.result())
+                for path, is_dir, _ in entries:
+                    if is_dir:
+                        running[pool.submit(_list_dir, path)] = path
+    return listing
+
+
+def prefetch(fn, items, workers=IO_THREADS):
+    """
+    Yield fn(item) for each item, in order, with up to workers calls running
+    ahead on threads. items is consumed lazily, at most 2 * workers ahead of
+    the caller, so it may be a generator of any length.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for item in items:
+            window.append(pool.submit(fn, item))
+            if len(window) > 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
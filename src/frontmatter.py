@@ -0,0 +1,66 @@
+FENCE = "---"
+
+
+def parse_front_matter(lines) -> dict:
+    """
+    Parse front matter lines of the form "key: value". Keys are lower-cased;
+    values are strings, with surrounding quotes removed, or lists written as
+    "[a, b]". Blank lines and lines starting with "#" are ignored.
+    """
+    data = {}
+    for number, line in enumerate(lines, start=2):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if not sep or not key.strip():
+            raise ValueError(f"front matter line {number}: expected 'key: value', got {line!r}")
+        data[key.strip().lower()] = _parse_value(value.strip())
+    return data
+
+
+def _parse_value(value: str):
+    if value.startswith("[") and value.endswith("]"):
+        return [_unquote(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    return _unquote(value)
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def split_front_matter(markdown: str):
+    """
+    Split a page into (front matter dict, markdown body). Front matter is
+    only recognised when the first line is "---" and a closing "---" follows;
+    otherwise the page is returned unchanged with an empty dict.
+    """
+    if not markdown.startswith(FENCE):
+        return {}, markdown
+    lines = markdown.split("\n")
+    if lines[0].rstrip() != FENCE:
+        return {}, markdown
+    for end in range(1, len(lines)):
+        if lines[end].rstrip() == FENCE:
+            return parse_front_matter(lines[1:end]), "\n".join(lines[end + 1:])
+    return {}, markdown
+
+
+def read_front_matter(f):
+    """
+    split_front_matter for a seekable text file: returns the front matter
+    dict and leaves f positioned at the start of the markdown body.
+    """
+    start = f.tell()
+    if f.readline().rstrip() != FENCE:
+        f.seek(start)
+        return {}
+    lines = []
+    for line in f:
+        if line.rstrip() == FENCE:
+            return parse_front_matter(lines)
+        lines.append(line)
+    f.seek(start)
+    return {}
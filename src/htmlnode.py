@@ -1,24 +1,48 @@
 
+from types import MappingProxyType
+
+# Shared, immutable stand-ins for "no children" / "no props", so leaf nodes
+# don't each allocate an empty list and dict.
+NO_CHILDREN = ()
+NO_PROPS = MappingProxyType({})
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
-        self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        self.children = children if children is not None else NO_CHILDREN
+        self.props = props if props is not None else NO_PROPS
 
 
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method")
+
+    def iter_html(self):
+        """Yield the HTML for this node as a sequence of string chunks."""
+        yield self.to_html()
+
+    def write_html(self, out):
+        """Write the HTML for this node to any object with a write(str) method."""
+        write = out.write
+        for chunk in self.iter_html():
+            write(chunk)
     
     def props_to_html(self):
+        if not self.props:
+            return ""
         return "".join(f' {key}="{value}"' for key, value in self.props.items())
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, [], props)
+        super().__init__(tag, value, NO_CHILDREN, props)
 
     def to_html(self):
         # Ensure that the tag is set if value is not None
@@ -29,22 +53,31 @@ class LeafNode(HTMLNode):
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, value=None, children=children, props=props)
 
     def to_html(self):
-        # Ensure that the tag and children are set
-        if self.tag is None:
-            raise ValueError("ParentNode must have a tag")
-        if self.children is None:
-            raise ValueError("ParentNode must have children")
-        # Create opening tag with any props
-        opening_tag = f"<{self.tag}{self.props_to_html()}>"
-    
-        # Process all children and join their HTML
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-    
-        # Combine everything with closing tag
-        return f"{opening_tag}{children_html}</{self.tag}>"
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # Walk the tree with an explicit stack instead of recursing, so wide
+        # nodes are never re-copied and deep trees can't hit the recursion limit.
+        # The stack holds nodes still to render and closing tags still to emit.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, ParentNode):
+                # Ensure that the tag and children are set
+                if node.tag is None:
+                    raise ValueError("ParentNode must have a tag")
+                if node.children is None:
+                    raise ValueError("ParentNode must have children")
+                yield f"<{node.tag}{node.props_to_html()}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                yield node.to_html()
@@ -0,0 +1,72 @@
+import os
+import posixpath
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+
+def output_paths(dest_dir: Path) -> set:
+    """Every file under dest_dir, as a path relative to it with "/" separators."""
+    found = set()
+    for dirpath, _, filenames in os.walk(dest_dir):
+        rel = os.path.relpath(dirpath, dest_dir)
+        prefix = "" if rel == "." else rel.replace(os.sep, "/") + "/"
+        found.update(prefix + name for name in filenames)
+    return found
+
+
+def link_target(url: str, output: str):
+    """
+    The path, relative to the output root, that a link or image URL on the
+    page written to output points at: site-absolute URLs from the root,
+    relative ones from the page's directory. None for external URLs and
+    same-page anchors.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join("/" + posixpath.dirname(output), path)
+    return posixpath.normpath(path).lstrip("/")
+
+
+def _exists(target: str, paths: set) -> bool:
+    # "/blog/tom" and "/blog/tom/" are served by blog/tom/index.html, "/about" by about.html
+    index = f"{target}/index.html" if target else "index.html"
+    return target in paths or index in paths or f"{target}.html" in paths
+
+
+def _locate(path: Path, urls) -> list:
+    """(line, url) of every place the markdown at path links to one of urls; line is None if not found."""
+    text = path.read_text(encoding="utf-8")
+    found = []
+    for url in urls:
+        needle = f"]({url})"
+        pos = text.find(needle)
+        if pos == -1:
+            found.append((None, url))
+        while pos != -1:
+            found.append((text.count("\n", 0, pos) + 1, url))
+            pos = text.find(needle, pos + 1)
+    return sorted(found, key=lambda item: (item[0] is None, item[0] or 0, item[1]))
+
+
+def find_broken_links(pages: dict, paths: set, content_dir: Path) -> list:
+    """
+    Check the links and images of every page against paths, the set of
+    output files from output_paths(). pages maps each source (relative to
+    content_dir) to (output path, URLs recorded while it was parsed), so
+    nothing is parsed again: each internal URL costs a few set lookups.
+    Returns (source, line, url) for every broken one, in source and line
+    order; only sources that have one are read again, to find the lines.
+    """
+    broken = []
+    for source, (output, urls) in sorted(pages.items()):
+        missing = []
+        for url in urls:
+            target = link_target(url, output)
+            if target is not None and not _exists(target, paths):
+                missing.append(url)
+        if missing:
+            broken.extend((source, line, url) for line, url in _locate(content_dir / source, missing))
+    return broken
@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from html import escape
+from pathlib import Path, PurePosixPath
+
+from src.manifest import hash_bytes, stat_key
+from src.static_sync import remove_output
+from src.template import load_template
+from src.urls import normalize_basepath, prefix_url
+
+# Newest entries included in each feed
+FEED_LIMIT = 20
+
+log = logging.getLogger("ssg")
+
+
+def index_entry(metadata) -> dict:
+    """
+    The site-index entry for a parsed page: everything listings, feeds and the
+    sitemap need, taken from its PageMetadata and front matter.
+    """
+    front_matter = metadata.front_matter
+    date = front_matter.get("date")
+    if date is not None:
+        _parse_date(date)
+    tags = front_matter.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return {
+        "title": metadata.title,
+        "date": date,
+        "tags": tags,
+        "description": front_matter.get("description"),
+        "word_count": metadata.word_count,
+    }
+
+
+def _parse_date(value) -> datetime:
+    """Parse a front matter date ("2024-05-01" or an ISO datetime); naive values are UTC."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid front matter date: {value!r}") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def page_url(output: str) -> str:
+    """Site-absolute URL of an output path: "blog/tom/index.html" -> "/blog/tom/"."""
+    if output == "index.html":
+        return "/"
+    if output.endswith("/index.html"):
+        return "/" + output[: -len("index.html")]
+    return "/" + output
+
+
+def tag_slug(tag: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+
+def _newest_first(entries):
+    """Dated entries newest first, then undated ones, each group by URL."""
+    def key(entry):
+        timestamp = _parse_date(entry["date"]).timestamp() if entry["date"] else float("-inf")
+        return -timestamp, entry["url"]
+    return sorted(entries, key=key)
+
+
+def plan_listings(index: dict, taken=(), site_url=None) -> dict:
+    """
+    Work out every generated output from the site index ({source: entry with
+    "output"}): returns {output: (kind, title, entries)}.
+
+    - a section listing (kind "section") for every directory holding dated
+      pages, unless a page of its own already renders that index.html
+    - a listing per tag at tags/<slug>/index.html (kind "tag")
+    - with a site_url: feed.xml (RSS), atom.xml and sitemap.xml
+    """
+    entries = [dict(entry, url=page_url(entry["output"])) for _, entry in sorted(index.items())]
+    planned = {}
+
+    sections = {}
+    for entry in entries:
+        if entry["date"] is None:
+            continue
+        page_dir = PurePosixPath(entry["output"]).parent
+        if entry["output"].endswith("/index.html"):
+            page_dir = page_dir.parent
+        sections.setdefault(page_dir.as_posix(), []).append(entry)
+    for section, members in sections.items():
+        output = "index.html" if section == "." else f"{section}/index.html"
+        title = PurePosixPath(section).name.replace("-", " ").title() or "Posts"
+        planned[output] = ("section", title, _newest_first(members))
+
+    tags = {}
+    for entry in entries:
+        for tag in entry["tags"]:
+            tags.setdefault(tag_slug(tag), (tag, []))[1].append(entry)
+    for slug, (tag, members) in tags.items():
+        planned[f"tags/{slug}/index.html"] = ("tag", f"Tagged: {tag}", _newest_first(members))
+
+    for output in taken:
+        planned.pop(output, None)
+
+    if site_url:
+        dated = _newest_first(e for e in entries if e["date"] is not None)[:FEED_LIMIT]
+        home = next((e for e in entries if e["url"] == "/"), None)
+        site_title = home["title"] if home else site_url
+        planned["feed.xml"] = ("rss", site_title, dated)
+        planned["atom.xml"] = ("atom", site_title, dated)
+        listed = [{"url": page_url(output), "date": None} for output, plan in planned.items()
+                  if plan[0] in ("section", "tag")]
+        planned["sitemap.xml"] = ("sitemap", site_title, sorted(entries + listed, key=lambda e: e["url"]))
+    return planned
+
+
+def render_listing(kind, title, entries, template_path: Path, basepath="/", site_url=None, assets=None) -> str:
+    url_prefix = normalize_basepath(basepath)
+    if kind in ("section", "tag"):
+        items = []
+        for entry in entries:
+            item = f'<li><a href="{escape(prefix_url(entry["url"], url_prefix))}">{escape(entry["title"])}</a>'
+            if entry["date"]:
+                item += f' <time datetime="{escape(entry["date"])}">{escape(entry["date"][:10])}</time>'
+            if entry["description"]:
+                item += f"<p>{escape(entry['description'])}</p>"
+            items.append(item + "</li>")
+        content = f"<div><h1>{escape(title)}</h1><ul>{''.join(items)}</ul></div>"
+        return load_template(template_path, basepath, assets).render({"Title": escape(title), "Content": content})
+
+    def absolute(url):
+        return site_url.rstrip("/") + prefix_url(url, url_prefix)
+
+    if kind == "rss":
+        items = "".join(
+            "<item>"
+            f"<title>{escape(e['title'])}</title>"
+            f"<link>{escape(absolute(e['url']))}</link>"
+            f"<guid>{escape(absolute(e['url']))}</guid>"
+            f"<pubDate>{format_datetime(_parse_date(e['date']))}</pubDate>"
+            + (f"<description>{escape(e['description'])}</description>" if e["description"] else "")
+            + "</item>"
+            for e in entries
+        )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<rss version="2.0"><channel><title>{escape(title)}</title>'
+            f"<link>{escape(absolute('/'))}</link><description>{escape(title)}</description>"
+            f"{items}</channel></rss>\n"
+        )
+    if kind == "atom":
+        updated = _parse_date(entries[0]["date"]).isoformat() if entries else "1970-01-01T00:00:00+00:00"
+        items = "".join(
+            "<entry>"
+            f"<title>{escape(e['title'])}</title>"
+            f"<id>{escape(absolute(e['url']))}</id>"
+            f'<link href="{escape(absolute(e["url"]))}"/>'
+            f"<updated>{_parse_date(e['date']).isoformat()}</updated>"
+            + (f"<summary>{escape(e['description'])}</summary>" if e["description"] else "")
+            + "</entry>"
+            for e in entries
+        )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<feed xmlns="http://www.w3.org/2005/Atom"><title>{escape(title)}</title>'
+            f"<id>{escape(absolute('/'))}</id>"
+            f'<link rel="self" href="{escape(absolute("/atom.xml"))}"/>'
+            f"<updated>{updated}</updated>{items}</feed>\n"
+        )
+    if kind == "sitemap":
+        urls = "".join(
+            f"<url><loc>{escape(absolute(e['url']))}</loc>"
+            + (f"<lastmod>{escape(e['date'][:10])}</lastmod>" if e["date"] else "")
+            + "</url>"
+            for e in entries
+        )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>\n'
+        )
+    raise ValueError(f"Unknown listing kind: {kind}")
+
+
+def build_listings(index: dict, dest_dir: Path, template_path: Path, basepath="/", site_url=None,
+                   previous=None, reusable=None, taken=(), assets=None) -> dict:
+    """
+    Render the listings planned from the site index into dest_dir and return
+    their state ({output: {"input_hash", "output_hash", "output_stat"}}) for
+    the manifest. A listing whose inputs hash the same as in reusable, and
+    whose output is untouched, is not rendered again. Listings in previous
+    that are no longer planned are removed unless a page now owns the path.
+    """
+    previous = previous or {}
+    reusable = reusable or {}
+    state = {}
+    for output, (kind, title, entries) in plan_listings(index, taken, site_url).items():
+        dest = dest_dir / output
+        input_hash = hash_bytes(json.dumps([kind, title, entries, site_url], sort_keys=True).encode("utf-8"))
+        old = reusable.get(output)
+        if old and old["input_hash"] == input_hash and stat_key(dest) == old["output_stat"]:
+            state[output] = old
+            continue
+        log.debug(f"Generating {kind} listing {dest}")
+        data = render_listing(kind, title, entries, template_path, basepath, site_url, assets).encode("utf-8")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, dest)
+        state[output] = {"input_hash": input_hash, "output_hash": hash_bytes(data), "output_stat": stat_key(dest)}
+
+    taken = set(taken)
+    for output in previous:
+        if output not in state and output not in taken:
+            log.info(f"Removing {output} (listing no longer generated)")
+            remove_output(dest_dir / output, dest_dir)
+    return state
@@ -1,16 +1,145 @@
-import sys, os, re, shutil
+import sys, os, shutil, argparse, hashlib, time, logging
+from collections import Counter, deque
+from itertools import chain, islice
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from pathlib import Path
-from textnode import TextType, TextNode
-from src.markdown import extract_title
-from src.markdown_to_html import markdown_to_html_node
-
-
-def get_basepath():
-    # If a CLI argument is provided, use it; otherwise default to "/"
-    if len(sys.argv) > 1:
-        return sys.argv[1]
-    return "/"
+from src.markdown import decode_markdown, extract_title_from_lines
+from src.markdown_to_html import PageMetadata, iter_block_nodes, parse_page, title_from_lines
+from src.frontmatter import read_front_matter
+from src.listings import build_listings, index_entry, page_url
+from src.content_cache import CACHE_DIR_NAME, ContentCache
+from src.template import load_template
+from src.urls import normalize_basepath, prefix_url
+from src.static_sync import LINK_MODES, place_file, remove_output, sync_static
+from src.publish import prepare_staging, publish, staging_dir
+from src.compress import encodings, precompress, remove_variants
+from src.assets import ASSET_MANIFEST_NAME, AssetMap
+from src.search import SEARCH_DIR, TermSpill, remove_search_index, update_search_index
+from src.links import find_broken_links, output_paths
+from src.fileio import IO_THREADS, prefetch, scan_tree
+from src import block_cache
+from src.daemon import DAEMON_SOCKET_NAME, BuildDaemon, SourceSnapshot
+from src.devserver import DevServer
+from src.watch import watch
+from src.profiling import BuildReport, PageProfile
+from src.shards import SHARD_MANIFEST_NAME, ShardError, in_shard, merge_shards, parse_shard
+from src.manifest import BuildManifest, GENERATOR_VERSION, MANIFEST_NAME, hash_bytes, hash_file, stat_key
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/.")
+    # Positional basepath kept for build.sh; defaults to "/" for local dev
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-render pages whose inputs changed since the last build",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render pages across N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="copy",
+        help="how static files are placed in docs/ (links fall back to copies)",
+    )
+    parser.add_argument(
+        "--hash-static",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building, serve docs/ from memory and rebuild what changes",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="dev server port for --watch")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=f"stay running and rebuild docs/ on requests sent to {DAEMON_SOCKET_NAME} "
+             "(see src/daemon_client.py)",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="public site URL, e.g. https://example.com; enables feed.xml, atom.xml and sitemap.xml",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="K/N",
+        help="render only shard K of N (pages split by a stable hash of their path); "
+             "static files and listings are left to --merge",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        type=Path,
+        metavar="DIR",
+        help="combine the docs/ trees of every --shard build into docs/, with static files and listings",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="also place static files under content-hashed names, link pages to those, "
+             "and write docs/asset-manifest.json",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a client-side search index of every page to docs/search/",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="fail the build if a page links to, or shows an image from, a path missing from docs/",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and, with the brotli package, .br) copies of every text file in docs/",
+    )
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT_PAGES, metavar="PAGES",
+                        help="pages handed to --jobs workers at a time; bounds memory on large sites")
+    parser.add_argument("--max-in-flight-mb", type=int, default=MAX_IN_FLIGHT_MB, metavar="MB",
+                        help="combined source size of the pages handed to workers at a time")
+    parser.add_argument("--io-threads", type=int, default=IO_THREADS, metavar="N",
+                        help="file system calls (directory scans, reads, writes, static copies) "
+                             "kept in flight at once; raise it on network storage")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"don't reuse parsed pages from {CACHE_DIR_NAME}/")
+    parser.add_argument("--cache-size", type=int, default=64, metavar="MB",
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--block-cache", type=int, default=0, metavar="N",
+                        help="reuse the HTML of up to N repeated blocks (paragraphs, lists, quotes, code) "
+                             "across pages instead of parsing them again (0 = off)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every page and file written")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every build stage and print a summary when done",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        metavar="FILE",
+        help="write per-page and per-stage timings to FILE as JSON (implies profiling)",
+    )
+    parser.add_argument("--slowest", type=int, default=10, metavar="N",
+                        help="number of slowest pages listed by --profile/--report")
+    args = parser.parse_args(argv)
+    for option in ("search", "check_links"):
+        if getattr(args, option) and (args.shard or args.merge):
+            parser.error(f"--{option.replace('_', '-')} can't be combined with --shard or --merge")
+    return args
 
 
 # Paths anchored to project root
@@ -19,98 +148,855 @@ SRC_STATIC = ROOT / "static"
 DST_PUBLIC = ROOT / "docs"
 CONTENT_DIR = ROOT / "content"
 TEMPLATE_PATH = ROOT / "template.html"
-
-
-def _prefix_basepath(html: str, basepath: str) -> str:
-    """Safely rewrite absolute /href and /src with a basepath."""
-    # Skip for local dev
-    if not basepath or basepath == "/":
-        return html
-
-    # Normalize basepath (no trailing slash)
-    if not basepath.startswith("/"):
-        basepath = "/" + basepath
-    basepath = basepath.rstrip("/")
-
-    def repl_href(m):
-        path = m.group(1)
-        return f'href="{basepath}/{path}"'
-
-    def repl_src(m):
-        path = m.group(1)
-        return f'src="{basepath}/{path}"'
-
-    html = re.sub(r'href="/([^"]+)"', repl_href, html)
-    html = re.sub(r'src="/([^"]+)"', repl_src, html)
-    return html
-
-
-def _clean_dir(path: Path) -> None:
-    if path.exists():
-        shutil.rmtree(path)
-    path.mkdir(parents=True, exist_ok=True)
-
-
-def _copy_dir(src: Path, dst: Path) -> None:
-    if not src.exists():
-        raise FileNotFoundError(f"Source directory does not exist: {src}")
-    dst.mkdir(parents=True, exist_ok=True)
-
-    for item in src.iterdir():
-        d_path = dst / item.name
-        if item.is_dir():
-            _copy_dir(item, d_path)
-        else:
-            shutil.copy2(item, d_path)
-        print(f"copied {item} -> {d_path}")
-
-
-def copy_static_to_public(static_dir: Path = SRC_STATIC, public_dir: Path = DST_PUBLIC) -> None:
-    _clean_dir(public_dir)
-    _copy_dir(static_dir, public_dir)
-
-
-def generate_page(from_path: Path, template_path: Path, dest_path: Path, basepath="/") -> None:
-    print(f"Generating page from {from_path} to {dest_path} using template {template_path}")
-
-    markdown_content = from_path.read_text(encoding="utf-8")
-    template_html = template_path.read_text(encoding="utf-8")
-
-    html_node = markdown_to_html_node(markdown_content)
-    content_html = html_node.to_html()
-    title = extract_title(markdown_content)
-
-    final_html = (
-        template_html.replace("{{ Title }}", title)
-                     .replace("{{ Content }}", content_html)
-    )
-
-    # Only rewrite links if basepath != "/"
-    final_html = _prefix_basepath(final_html, basepath)
-
+MANIFEST_PATH = ROOT / MANIFEST_NAME
+CACHE_DIR = ROOT / CACHE_DIR_NAME
+# Parsed pages the build daemon keeps in memory, in front of the on-disk cache
+DAEMON_MEMORY_ENTRIES = 4096
+# Sources at least this large are parsed and rendered block by block from the
+# file instead of being read and parsed whole
+STREAM_THRESHOLD = 1 << 20
+# Default limits on the pages handed to worker processes and not yet
+# collected, by count and by combined source size
+MAX_IN_FLIGHT_PAGES = 256
+MAX_IN_FLIGHT_MB = 64
+
+log = logging.getLogger("ssg")
+
+
+class BuildError(Exception):
+    """
+    Raised after a build in which one or more pages failed to render, or
+    that found broken links: failures lists (source, error) and
+    broken_links (source, line, url).
+    """
+
+    def __init__(self, failures, broken_links=()):
+        self.failures = failures
+        self.broken_links = list(broken_links)
+        problems = []
+        if failures:
+            problems.append(f"{len(failures)} page(s) failed to render")
+        if self.broken_links:
+            problems.append(f"{len(self.broken_links)} broken link(s)")
+        super().__init__(", ".join(problems))
+
+
+class _PageWriter:
+    """
+    Buffered UTF-8 writer for a binary file that hashes everything written,
+    so pages can be streamed out chunk by chunk without joining them first.
+    """
+
+    def __init__(self, f, buffer_chars=1 << 16):
+        self._f = f
+        self._digest = hashlib.sha256()
+        self._parts = []
+        self._size = 0
+        self._buffer_chars = buffer_chars
+        self.bytes_written = 0
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._buffer_chars:
+            self.flush()
+
+    def flush(self) -> None:
+        data = "".join(self._parts).encode("utf-8")
+        self._digest.update(data)
+        self._f.write(data)
+        self.bytes_written += len(data)
+        self._parts.clear()
+        self._size = 0
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def render_page(from_path: Path, template_path: Path, basepath="/", profile=None, cache=None,
+                page_info=None, assets=None, collect_terms=False, raw=None):
+    """
+    Parse one markdown page and return an iterator over its HTML chunks.
+    With a PageProfile, every stage is timed (see _render_page_profiled).
+    With a ContentCache, the metadata and content HTML are reused when the
+    source is unchanged; sources large enough to stream bypass the cache.
+    If page_info is a dict, the page's site-index entry is stored in it once
+    the chunks have been consumed. With an AssetMap, URLs of static files in
+    the page and the template point at their fingerprinted copies. With
+    collect_terms, page_info also gets the page's search "terms". raw is the
+    source's bytes, if they have already been read.
+    """
+    if profile is not None:
+        return _render_page_profiled(from_path, template_path, basepath, profile, cache, page_info, assets,
+                                     collect_terms, raw)
+    if raw is None:
+        if from_path.stat().st_size >= STREAM_THRESHOLD:
+            return _render_page_streaming(from_path, template_path, basepath, page_info, assets, collect_terms)
+        raw = from_path.read_bytes()
+    if cache is not None:
+        metadata, content_html = cache.render(raw, basepath, assets=assets, collect_terms=collect_terms)
+    else:
+        metadata, content_html = parse_page(decode_markdown(raw), basepath, assets=assets,
+                                            collect_terms=collect_terms)
+    if page_info is not None:
+        _fill_page_info(page_info, metadata)
+    template = load_template(template_path, basepath, assets)
+    return template.iter_chunks({"Title": metadata.title, "Content": content_html})
+
+
+def _fill_page_info(page_info: dict, metadata: PageMetadata) -> None:
+    page_info.update(index_entry(metadata))
+    # Not part of the site index either; build_pages keeps them to check links
+    page_info["links"] = sorted({url for _, url in metadata.links} | {url for _, url in metadata.images})
+    if metadata.terms is not None:
+        # Not part of the site index: build_pages takes them out for the search index
+        page_info["terms"] = metadata.terms
+
+
+def _render_page_streaming(from_path: Path, template_path: Path, basepath, page_info=None, assets=None,
+                           collect_terms=False):
+    """
+    render_page for large sources: the file is scanned for the title,
+    then read again line by line while each block is parsed and serialized,
+    so memory depends on the largest block rather than the whole page.
+    """
+    template = load_template(template_path, basepath, assets)
+    with open(from_path, encoding="utf-8") as f:
+        front_matter = read_front_matter(f)
+        title = front_matter["title"] if "title" in front_matter else title_from_lines(f)
+        if title is None:
+            # No h1 block; fall back to any "# " line, as parse_page does
+            f.seek(0)
+            read_front_matter(f)
+            title = extract_title_from_lines(f)
+
+    def content():
+        metadata = PageMetadata(front_matter=front_matter, terms=Counter() if collect_terms else None)
+        yield "<div>"
+        with open(from_path, encoding="utf-8") as f:
+            read_front_matter(f)
+            for node in iter_block_nodes(f, basepath, metadata=metadata, assets=assets):
+                yield from node.iter_html()
+        yield "</div>"
+        if page_info is not None:
+            metadata.title = title
+            _fill_page_info(page_info, metadata)
+
+    return template.iter_chunks({"Title": title, "Content": content})
+
+
+def _render_page_profiled(from_path: Path, template_path: Path, basepath, profile, cache=None,
+                          page_info=None, assets=None, collect_terms=False, raw=None):
+    """
+    render_page with each stage timed. Serialization and template filling are
+    materialized one after the other here, rather than streamed together, so
+    they can be measured apart.
+    """
+    if raw is None:
+        with profile.measure("read"):
+            raw = from_path.read_bytes()
+    profile.bytes_in = len(raw)
+    with profile.measure("template"):
+        template = load_template(template_path, basepath, assets)
+
+    if cache is not None:
+        metadata, content_html = cache.render(raw, basepath, profile, assets, collect_terms)
+    else:
+        metadata, content_html = parse_page(decode_markdown(raw), basepath, profile, assets, collect_terms)
+    if page_info is not None:
+        _fill_page_info(page_info, metadata)
+    with profile.measure("template"):
+        final_html = template.render({"Title": metadata.title, "Content": content_html})
+    return [final_html]
+
+
+def generate_page(from_path: Path, template_path: Path, dest_path: Path, basepath="/",
+                  profile=None, cache=None, page_info=None, assets=None, collect_terms=False, raw=None) -> str:
+    """Render one markdown page and return the hash of the HTML written."""
+    chunks = render_page(from_path, template_path, basepath, profile, cache, page_info, assets, collect_terms,
+                         raw)
+    return _write_page(chunks, dest_path, profile)
+
+
+def _write_page(chunks, dest_path: Path, profile=None) -> str:
+    """Write a page's HTML chunks to dest_path and return the hash of what was written."""
+    # Serialize straight into a temporary file, then rename it over dest_path:
+    # readers never see a partial page, and an existing file (possibly a
+    # hardlink shared with the live site) is replaced rather than rewritten
     dest_path.parent.mkdir(parents=True, exist_ok=True)
-    dest_path.write_text(final_html, encoding="utf-8")
-
-
-def generate_pages_recursive(content_dir: Path, template_path: Path, dest_dir: Path, basepath="/") -> None:
+    tmp = dest_path.with_name(f".{dest_path.name}.tmp")
+    try:
+        with profile.measure("write") if profile is not None else nullcontext():
+            with open(tmp, "wb") as f:
+                out = _PageWriter(f)
+                for chunk in chunks:
+                    out.write(chunk)
+                out.flush()
+            os.replace(tmp, dest_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if profile is not None:
+        profile.bytes_out = out.bytes_written
+    return out.hexdigest()
+
+
+def iter_pages(content_dir: Path, dest_dir: Path, workers=1):
+    """
+    Yield (markdown_path, html_path) for every page under content_dir, in a
+    stable order. With workers > 1, the directories are all listed first,
+    that many at a time (see src.fileio.scan_tree).
+    """
     if not content_dir.exists():
         raise FileNotFoundError(f"Content directory does not exist: {content_dir}")
+    if workers > 1:
+        yield from _iter_listed(scan_tree(content_dir, workers), content_dir, dest_dir)
+        return
 
-    for item in content_dir.iterdir():
-        rel = item.relative_to(content_dir)
-        out_path = dest_dir / rel
+    for item in sorted(content_dir.iterdir()):
+        out_path = dest_dir / item.relative_to(content_dir)
 
         if item.is_dir():
-            generate_pages_recursive(item, template_path, out_path, basepath)
+            yield from iter_pages(item, out_path)
         elif item.is_file() and item.suffix.lower() == ".md":
-            dest_file = out_path.with_suffix(".html")
-            generate_page(item, template_path, dest_file, basepath)
+            yield item, out_path.with_suffix(".html")
+
+
+def _iter_listed(listing: dict, directory: Path, out_dir: Path):
+    """iter_pages over a scan_tree listing."""
+    for path, is_dir, is_file in listing[directory]:
+        out_path = out_dir / path.name
+        if is_dir:
+            yield from _iter_listed(listing, path, out_path)
+        elif is_file and path.suffix.lower() == ".md":
+            yield path, out_path.with_suffix(".html")
 
 
-def main():
-    basepath = get_basepath()
-    copy_static_to_public()
-    generate_pages_recursive(CONTENT_DIR, TEMPLATE_PATH, DST_PUBLIC, basepath)
+def generate_pages_recursive(content_dir: Path, template_path: Path, dest_dir: Path, basepath="/") -> None:
+    for from_path, dest_file in iter_pages(content_dir, dest_dir):
+        log.debug(f"Generating page from {from_path} to {dest_file} using template {template_path}")
+        generate_page(from_path, template_path, dest_file, basepath)
+
+
+def _render_job(job):
+    """
+    Process-pool entry point: render one page, never raise.
+    Returns (output_hash, None, profile, index entry) on success or
+    (None, error message, None, None) on failure; profile is a PageProfile
+    dict when the job asks for one.
+    """
+    return _start_job(job)()
+
+
+def _start_job(job, io=None):
+    """
+    Render one page and return a function giving its _render_job result.
+    With a ThreadPoolExecutor as io, a page whose source was read ahead is
+    rendered here but written by an I/O thread, and the function waits for
+    the write; the next page can be rendered meanwhile.
+    """
+    from_path, template_path, dest_file, basepath, profile_as, cache, assets, collect_terms, raw = job
+    profile = PageProfile(profile_as) if profile_as is not None else None
+    page_info = {}
+    hits, misses = block_cache.counters()
+    write = output_hash = None
+    try:
+        chunks = render_page(from_path, template_path, basepath, profile, cache, page_info, assets, collect_terms,
+                             raw)
+        if io is not None and raw is not None and profile is None:
+            write = io.submit(_write_page, list(chunks), dest_file)
+        else:
+            output_hash = _write_page(chunks, dest_file, profile)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return lambda: (None, error, None, None)
+    # This page's block cache lookups, wherever the page was rendered
+    now = block_cache.counters()
+    page_info["block_cache"] = (now[0] - hits, now[1] - misses)
+
+    def result():
+        try:
+            written = write.result() if write is not None else output_hash
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}", None, None
+        return written, None, profile.as_dict() if profile is not None else None, page_info
+    return result
+
+
+def _render_in_process(jobs, io_threads):
+    """Render jobs one after another here, writing up to io_threads pages at once."""
+    if io_threads <= 1:
+        yield from map(_render_job, jobs)
+        return
+    with ThreadPoolExecutor(max_workers=io_threads) as io:
+        window = deque()
+        for job in jobs:
+            window.append(_start_job(job, io))
+            if len(window) > io_threads:
+                yield window.popleft()()
+        while window:
+            yield window.popleft()()
+
+
+def _render_chunk(chunk):
+    return [_render_job(job) for job in chunk]
+
+
+def _source_size(job) -> int:
+    if job[-1] is not None:
+        return len(job[-1])
+    try:
+        return job[0].stat().st_size
+    except OSError:
+        return 0  # the job reports the error
+
+
+def _chunks(jobs, workers, max_pages, max_bytes):
+    """
+    Group jobs into (jobs, combined source size) chunks for the worker
+    processes: single pages at first, so short builds still reach every
+    worker, then growing with the number of jobs seen (several pages per
+    chunk keep IPC cheap for small pages) up to a share of the limits.
+    """
+    cap_pages = max(1, max_pages // (workers * 2))
+    cap_bytes = max(1, max_bytes // (workers * 2))
+    chunk, size, seen = [], 0, 0
+    for job in jobs:
+        chunk.append(job)
+        size += _source_size(job)
+        seen += 1
+        if len(chunk) >= min(cap_pages, max(1, seen // (workers * 8))) or size >= cap_bytes:
+            yield chunk, size
+            chunk, size = [], 0
+    if chunk:
+        yield chunk, size
+
+
+def render_pages(jobs, workers=1, max_in_flight=MAX_IN_FLIGHT_PAGES, max_in_flight_bytes=MAX_IN_FLIGHT_MB << 20,
+                 io_threads=1):
+    """
+    Render (from_path, template_path, dest_file, basepath, profile_as, cache, assets,
+    collect_terms, raw) jobs, in parallel when workers > 1; raw is the
+    source's bytes when they were read ahead, else None. Results are yielded in job order so logs stay deterministic.
+
+    jobs can be any iterable and is consumed lazily. Pages are submitted to
+    the workers in chunks while fewer than max_in_flight pages, and less
+    than max_in_flight_bytes of source, are waiting or being rendered (a
+    chunk always goes out when nothing else is in flight); past that, no
+    more jobs are taken until the caller has consumed the oldest results.
+    So memory doesn't grow with the number of pages, whatever the speed of
+    the workers or the caller. Each page streams from its source to its
+    output inside one worker; see generate_page.
+    Worker processes get a block cache of the same size as this process's.
+    Without workers, pages are rendered in this process and, with
+    io_threads > 1, written by that many threads while the next ones render.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    jobs = iter(jobs)
+    first = list(islice(jobs, 2))
+    if workers <= 1 or len(first) <= 1:
+        yield from _render_in_process(chain(first, jobs), io_threads)
+        return
+
+    entries = block_cache.active.max_entries if block_cache.active is not None else 0
+    window, pages, nbytes = deque(), 0, 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=block_cache.configure, initargs=(entries,)) as pool:
+        for chunk, size in _chunks(chain(first, jobs), workers, max_in_flight, max_in_flight_bytes):
+            while window and (pages + len(chunk) > max_in_flight or nbytes + size > max_in_flight_bytes):
+                future, count, used = window.popleft()
+                pages, nbytes = pages - count, nbytes - used
+                yield from future.result()
+            window.append((pool.submit(_render_chunk, chunk), len(chunk), size))
+            pages, nbytes = pages + len(chunk), nbytes + size
+        while window:
+            yield from window.popleft()[0].result()
+
+
+class BuildOptions:
+    """
+    How build_pages runs, apart from what it builds: worker processes and
+    the bounds on pages in flight (see render_pages), file system calls kept
+    in flight (see src.fileio), and the optional outputs: feeds and a
+    sitemap with a site_url, a search index, a link check. variants are the
+    compressed copies the caller writes afterwards, recorded in the manifest.
+    """
+
+    def __init__(self, jobs=1, max_in_flight=MAX_IN_FLIGHT_PAGES, max_in_flight_bytes=MAX_IN_FLIGHT_MB << 20,
+                 io_threads=IO_THREADS, site_url=None, search=False, check_links=False, variants=()):
+        self.jobs = jobs
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.io_threads = io_threads
+        self.site_url = site_url
+        self.search = search
+        self.check_links = check_links
+        self.variants = list(variants)
+
+    @classmethod
+    def from_args(cls, args) -> "BuildOptions":
+        return cls(args.jobs, args.max_in_flight, args.max_in_flight_mb << 20, args.io_threads,
+                   args.site_url, args.search, args.check_links, encodings() if args.precompress else ())
+
+
+def build_pages(content_dir: Path, template_path: Path, dest_dir: Path, basepath="/",
+                manifest_path: Path = MANIFEST_PATH, incremental=False, static_state=None, report=None,
+                cache=None, shard=None, assets=None, snapshot=None, options=None) -> list:
+    """
+    Render every page (only changed ones when incremental), then the
+    listings, and write a manifest describing the build. Returns the source
+    paths rendered; raises BuildError listing failed pages and broken links.
+    """
+    options = options if options is not None else BuildOptions()
+    io_threads, search, check_links = options.io_threads, options.search, options.check_links
+    manifest = BuildManifest(hash_file(template_path), basepath, GENERATOR_VERSION,
+                             shard=list(shard) if shard is not None else None,
+                             assets_hash=assets.digest if assets is not None else None,
+                             variants=options.variants)
+    # A full build reuses nothing, but still reads the last manifest to clean
+    # up after deleted sources, as dest_dir may start with the last output
+    if snapshot is not None:
+        previous = snapshot.load_manifest(manifest_path)
+    else:
+        previous = BuildManifest.load(manifest_path)
+    reusable = previous.pages if incremental and manifest.is_compatible(previous) else {}
+    indexed = previous.search.get("pages", {}) if search else None
+    manifest.static = static_state if static_state is not None else previous.static
+
+    pages = snapshot.pages() if snapshot is not None else iter_pages(content_dir, dest_dir, io_threads)
+    pending = {}  # source -> output of every page sent to be rendered
+    in_flight = deque()  # (source, source_hash, output, from_path, dest_file) of pages sent, in order
+
+    def candidates():
+        for from_path, dest_file in pages:
+            source = from_path.relative_to(content_dir).as_posix()
+            if shard is None or in_shard(source, shard):
+                yield source, from_path, dest_file
+
+    def read(candidate):
+        # Runs on an I/O thread. A source small enough to render in memory
+        # is read once, for its hash and for the renderer
+        source, from_path, dest_file = candidate
+        raw = None
+        if snapshot is not None:
+            source_hash = snapshot.hash(from_path)
+        elif from_path.stat().st_size < STREAM_THRESHOLD:
+            raw = from_path.read_bytes()
+            source_hash = hash_bytes(raw)
+        else:
+            source_hash = hash_file(from_path)
+        return source, from_path, dest_file, source_hash, raw, stat_key(dest_file)
+
+    def discover():
+        # A snapshot mostly answers from its cache, where threads only add overhead
+        ahead = prefetch(read, candidates(), io_threads if snapshot is None else 1)
+        for source, from_path, dest_file, source_hash, raw, output_stat in ahead:
+            output = dest_file.relative_to(dest_dir).as_posix()
+            entry = reusable.get(source)
+            if (entry and entry["source_hash"] == source_hash and entry["output"] == output
+                    and output_stat == entry.get("output_stat") and (indexed is None or source in indexed)
+                    and (not check_links or "links" in entry)):
+                manifest.pages[source] = entry
+            else:
+                pending[source] = output
+                in_flight.append((source, source_hash, output, from_path, dest_file))
+                # A profiled page reads its source again, so the read is timed
+                profile_as = source if report is not None else None
+                yield (from_path, template_path, dest_file, basepath, profile_as, cache, assets, search,
+                       raw if profile_as is None else None)
+
+    # Pages are read and hashed as earlier ones render; render_pages yields
+    # results in job order, so each one belongs to the oldest page in flight
+    rendered, failures = [], []
+    terms = TermSpill() if search else None
+    block_hits = block_misses = 0
+    for output_hash, error, page_profile, meta in render_pages(discover(), options.jobs, options.max_in_flight,
+                                                               options.max_in_flight_bytes, io_threads):
+        source, source_hash, output, from_path, dest_file = in_flight.popleft()
+        log.debug(f"Generating page from {from_path} to {dest_file} using template {template_path}")
+        if error is not None:
+            log.error(f"error: {from_path}: {error}")
+            failures.append((source, error))
+            continue
+        if search:
+            terms.add(source, meta.pop("terms"))
+        links = meta.pop("links")
+        hits, misses = meta.pop("block_cache")
+        block_hits += hits
+        block_misses += misses
+        manifest.record(source, source_hash, output, output_hash, stat_key(dest_file), meta,
+                        links if check_links else None)
+        rendered.append(source)
+        if report is not None:
+            report.add_page(page_profile)
+
+    # Failed pages keep their previous output; only deleted sources are cleaned up
+    listed = set(manifest.pages) | set(pending)
+    live_outputs = {entry["output"] for entry in manifest.pages.values()}
+    live_outputs.update(pending.values())
+    for source, entry in previous.pages.items():
+        if source not in listed and entry["output"] not in live_outputs:
+            log.info(f"Removing {entry['output']} (source {source} was deleted)")
+            remove_output(dest_dir / entry["output"], dest_dir)
+
+    if shard is None:
+        index = {source: dict(entry["meta"], output=entry["output"]) for source, entry in manifest.pages.items()}
+        manifest.listings = build_listings(
+            index, dest_dir, template_path, basepath, options.site_url, previous=previous.listings,
+            reusable=previous.listings if incremental and manifest.is_compatible(previous) else {},
+            taken=live_outputs,
+            assets=assets)
+        if search:
+            url_prefix = normalize_basepath(basepath)
+            pages = {source: (prefix_url(page_url(entry["output"]), url_prefix), entry["meta"]["title"])
+                     for source, entry in manifest.pages.items()}
+            manifest.search = update_search_index(dest_dir, pages, terms, previous.search if incremental else None)
+            terms.close()
+        elif previous.search:
+            remove_search_index(dest_dir)
+
+    manifest.save(manifest_path)
+    if snapshot is not None:
+        snapshot.saved_manifest(manifest_path, manifest)
+    if cache is not None and rendered:
+        cache.evict()
+    skipped = len(manifest.pages) - len(rendered)
+    if report is not None:
+        report.skipped = skipped
+    log.info(f"Rendered {len(rendered)} page(s), {skipped} unchanged")
+    if block_hits or block_misses:
+        log.info(f"Block cache: {block_hits} hit(s), {block_misses} miss(es)")
+        if report is not None:
+            report.block_cache = {"hits": block_hits, "misses": block_misses}
+    broken = []
+    if check_links:
+        pages = {source: (entry["output"], entry["links"]) for source, entry in manifest.pages.items()}
+        broken = find_broken_links(pages, output_paths(dest_dir), content_dir)
+        for source, line, url in broken:
+            log.error(f"error: {content_dir / source}:{line if line is not None else '?'}: broken link to {url}")
+    if failures or broken:
+        raise BuildError(failures, broken)
+    return rendered
+
+
+def _content_cache(args):
+    """The ContentCache selected on the command line, or None with --no-cache."""
+    if args.no_cache:
+        return None
+    return ContentCache(CACHE_DIR, args.cache_size << 20)
+
+
+def _page_outputs(dest_dir: Path) -> set:
+    """Output paths of every page, which a static sync must never delete."""
+    return {dest.relative_to(dest_dir).as_posix() for _, dest in iter_pages(CONTENT_DIR, dest_dir)}
+
+
+def _update_variants(dest_dir: Path, args, written, paths=None) -> None:
+    """
+    precompress dest_dir (or just paths in it) with --precompress, on -j
+    threads (one per CPU by default). Without it, the .gz/.br files are
+    removed if written (the variants of the last build's manifest) says
+    there are any, so a server can't send stale ones; otherwise dest_dir
+    isn't walked at all.
+    """
+    if args.precompress:
+        precompress(dest_dir, args.jobs if args.jobs > 1 else 0, paths=paths)
+    elif written:
+        remove_variants(dest_dir)
+
+
+def _sync_assets(dest_dir: Path, previous_static, args, keep=(), stats=None):
+    """
+    sync_static with the options given on the command line. With
+    --fingerprint, also writes the asset manifest into dest_dir.
+    Returns (static state, AssetMap or None).
+    """
+    state = sync_static(SRC_STATIC, dest_dir, previous_static, keep=keep, verify_hash=args.hash_static,
+                        link=args.link, workers=args.io_threads, stats=stats, fingerprint=args.fingerprint)
+    if not args.fingerprint:
+        (dest_dir / ASSET_MANIFEST_NAME).unlink(missing_ok=True)
+        return state, None
+    assets = AssetMap.from_static(state)
+    assets.save(dest_dir / ASSET_MANIFEST_NAME)
+    return state, assets
+
+
+def rebuild_changed(changed, removed, args, cache=None, snapshot=None, dest_dir=DST_PUBLIC):
+    """
+    Bring dest_dir up to date, in place, with a batch of changed and removed
+    source files: an incremental page build when pages or the template (or,
+    with --fingerprint, static files) changed, and per-file static updates
+    otherwise (plus a link check with --check-links). Returns (rendered
+    sources, outputs touched), where the latter is None if any output may
+    have changed. A BuildError is raised only after the static files and
+    precompressed variants are updated. A snapshot must list its pages'
+    outputs under dest_dir.
+    """
+    pages_changed = any(CONTENT_DIR in path.parents and path.suffix.lower() == ".md"
+                        for path in changed | removed)
+    static_changed = any(SRC_STATIC in path.parents for path in changed | removed)
+    rendered, touched, failure = [], set(), None
+    static_state = assets = None
+    load_manifest = snapshot.load_manifest if snapshot is not None else BuildManifest.load
+    before = load_manifest(MANIFEST_PATH)
+    if args.fingerprint:
+        # Fingerprinted names are baked into every page, so a static change
+        # means a full sync and pages rebuilt against the new AssetMap
+        static_state = before.static
+        if static_changed:
+            static_state, _ = _sync_assets(dest_dir, static_state, args, keep=_page_outputs(dest_dir))
+            touched = None
+        assets = AssetMap.from_static(static_state)
+    # Static files go first, so links to them can be checked
+    for path in sorted(changed | removed):
+        if SRC_STATIC in path.parents and not args.fingerprint:
+            rel = path.relative_to(SRC_STATIC).as_posix()
+            if path in removed:
+                remove_output(dest_dir / rel, dest_dir)
+            else:
+                place_file(path, dest_dir / rel, args.link)
+            if touched is not None:
+                touched.add(rel)
+    if (TEMPLATE_PATH in changed or pages_changed
+            or (static_changed and (args.fingerprint or args.check_links))):
+        # An incremental build re-renders just the changed pages (every page if
+        # the template or the AssetMap changed) and only the listings whose
+        # entries changed; with --check-links it checks every page's links
+        try:
+            rendered = build_pages(CONTENT_DIR, TEMPLATE_PATH, dest_dir, args.basepath, incremental=True,
+                                   static_state=static_state, cache=cache, assets=assets, snapshot=snapshot,
+                                   options=BuildOptions.from_args(args))
+        except BuildError as e:
+            failure = e
+        if touched is not None:
+            touched |= _outputs_written(before, load_manifest(MANIFEST_PATH))
+    _update_variants(dest_dir, args, before.variants, touched)
+    if failure is not None:
+        raise failure
+    return rendered, touched
+
+
+def _outputs_written(before: BuildManifest, after: BuildManifest) -> set:
+    """
+    Outputs a build_pages run rewrote or removed, from the manifests before
+    and after it; the search index counts as its directory, "search/".
+    """
+    written = set()
+    for source in before.pages.keys() | after.pages.keys():
+        old, new = before.pages.get(source), after.pages.get(source)
+        if (old is None or new is None
+                or (old["output"], old.get("output_stat")) != (new["output"], new.get("output_stat"))):
+            written.update(entry["output"] for entry in (old, new) if entry is not None)
+    for output in before.listings.keys() | after.listings.keys():
+        if before.listings.get(output) != after.listings.get(output):
+            written.add(output)
+    if before.search != after.search:
+        written.add(f"{SEARCH_DIR}/")
+    return written
+
+
+def _apply_changes(changed, removed, server, args, cache=None, snapshot=None):
+    """Rebuild only what a batch of file changes affects and refresh the dev server."""
+    start = time.perf_counter()
+    if snapshot is not None:
+        snapshot.forget(changed | removed)
+    try:
+        _, touched = rebuild_changed(changed, removed, args, cache, snapshot)
+    except BuildError:
+        touched = None  # already logged page by page; keep serving the last good output
+    except OSError as e:
+        # e.g. a file removed or made unreadable between the event and the rebuild
+        log.error(f"Rebuild failed: {type(e).__name__}: {e}")
+        touched = None
+    if touched is None:
+        server.cache.invalidate()
+    else:
+        for rel in touched:
+            server.cache.invalidate(rel)
+    server.notify_reload()
+    log.info(f"Rebuilt {len(changed) + len(removed)} changed file(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def serve_and_watch(args) -> None:
+    server = DevServer(DST_PUBLIC, args.port, args.basepath)
+    server.serve_in_background()
+    # As in run_daemon, the content tree and source hashes are kept between
+    # batches, so a one-page edit doesn't walk and hash the whole site
+    cache = _content_cache(args)
+    snapshot = SourceSnapshot(lambda: iter_pages(CONTENT_DIR, DST_PUBLIC))
+    log.info(f"Serving on http://localhost:{server.port}/ - watching for changes (Ctrl+C to stop)")
+    try:
+        for changed, removed in watch([CONTENT_DIR, SRC_STATIC, TEMPLATE_PATH]):
+            _apply_changes(changed, removed, server, args, cache, snapshot)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+def _built_from(path: Path, manifest: BuildManifest, dest_dir: Path) -> set:
+    """
+    The source files under path, a directory in content/ or static/, that
+    the build in dest_dir was made from: the pages in its manifest, or the
+    static files copied into it (static updates don't rewrite the manifest).
+    """
+    if CONTENT_DIR in path.parents:
+        return {CONTENT_DIR / source for source in manifest.pages if path in (CONTENT_DIR / source).parents}
+    if SRC_STATIC not in path.parents:
+        return set()
+    generated = {entry["output"] for entry in manifest.pages.values()} | set(manifest.listings)
+    copies = (copy.relative_to(dest_dir).as_posix()
+              for copy in (dest_dir / path.relative_to(SRC_STATIC)).rglob("*") if copy.is_file())
+    return {SRC_STATIC / rel for rel in copies if rel not in generated}
+
+
+def run_daemon(args) -> None:
+    """
+    Keep the generator, its templates, parsed pages and a snapshot of the
+    content tree loaded, and rebuild docs/ for each batch of paths clients
+    send; see src.daemon.BuildDaemon. As in main, each batch is built into a
+    staging copy of docs/ and published only if it succeeds.
+    """
+    cache = None
+    if not args.no_cache:
+        cache = ContentCache(CACHE_DIR, args.cache_size << 20, memory_entries=DAEMON_MEMORY_ENTRIES)
+    # Every batch is built in the same staging directory, so the snapshot lists outputs there
+    staging = staging_dir(DST_PUBLIC)
+    snapshot = SourceSnapshot(lambda: iter_pages(CONTENT_DIR, staging))
+
+    def build_batch(paths):
+        if paths is None:
+            snapshot.forget()
+            previous = snapshot.load_manifest(MANIFEST_PATH)
+            static_state, assets = _sync_assets(staging, previous.static, args, keep=_page_outputs(staging))
+            rendered = build_pages(CONTENT_DIR, TEMPLATE_PATH, staging, args.basepath, incremental=True,
+                                   static_state=static_state, cache=cache, assets=assets, snapshot=snapshot,
+                                   options=BuildOptions.from_args(args))
+            _update_variants(staging, args, previous.variants)
+            return rendered
+        files = set()
+        for path in paths:
+            if path.is_dir():
+                files.update(p for p in path.rglob("*") if p.is_file())
+            elif not path.exists() and path.suffix.lower() != ".md":
+                # Maybe a deleted directory: then everything built from under it is gone
+                files.update(_built_from(path, snapshot.load_manifest(MANIFEST_PATH), staging) or {path})
+            else:
+                files.add(path)
+        snapshot.forget(paths | files)
+        changed = {path for path in files if path.exists()}
+        rendered, _ = rebuild_changed(changed, files - changed, args, cache, snapshot, staging)
+        return rendered
+
+    def build(paths):
+        prepare_staging(DST_PUBLIC, carry_over=True)
+        previous = snapshot.load_manifest(MANIFEST_PATH)
+        try:
+            rendered = build_batch(paths)
+        except BaseException:
+            # The live site stays as it was, and so does the manifest describing it
+            shutil.rmtree(staging)
+            previous.save(MANIFEST_PATH)
+            snapshot.saved_manifest(MANIFEST_PATH, previous)
+            raise
+        publish(staging, DST_PUBLIC)
+        return rendered
+
+    try:
+        daemon = BuildDaemon(ROOT / DAEMON_SOCKET_NAME, build, ROOT)
+    except (RuntimeError, OSError) as e:
+        sys.exit(f"Can't start the build daemon: {e}")
+    # Warm everything up with a full incremental build before taking requests
+    daemon.queue.submit(None)
+    log.info(f"Build daemon listening on {daemon.socket_path} (Ctrl+C to stop)")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+    # Profiling is opt-in: without it no page is timed and nothing is wrapped
+    report = BuildReport() if args.profile or args.report else None
+    sync_stats = {}
+    block_cache.configure(args.block_cache)
+
+    if args.daemon:
+        run_daemon(args)
+        return
+    # Every build is written to a staging directory and swapped in for docs/
+    # only when it succeeds. It starts from hardlinks of docs/, so even a full
+    # build, which renders every page, leaves unchanged static files and
+    # compressed variants where they are
+    staging = prepare_staging(DST_PUBLIC, carry_over=True)
+    previous = BuildManifest.load(MANIFEST_PATH)
+    if args.merge:
+        static_state, assets = _sync_assets(staging, previous.static, args)
+        try:
+            merge_shards(args.merge, staging, TEMPLATE_PATH, args.basepath, MANIFEST_PATH,
+                         static_state, args.site_url, args.link, assets=assets,
+                         variants=encodings() if args.precompress else ())
+        except ShardError as e:
+            sys.exit(f"Merge failed: {e}")
+        _update_variants(staging, args, previous.variants)
+        publish(staging, DST_PUBLIC)
+        return
+    if args.shard:
+        # A shard renders its pages only, into a docs/ tree of its own that
+        # --merge later combines; its manifest travels inside that tree.
+        # Fingerprinting needs the asset hashes, so then static files are synced too
+        shard_manifest = staging / SHARD_MANIFEST_NAME
+        static_state = assets = None
+        if args.fingerprint:
+            static_state, assets = _sync_assets(staging, BuildManifest.load(shard_manifest).static, args,
+                                                keep=_page_outputs(staging))
+        # Shards are compressed, if at all, once merged
+        options = BuildOptions.from_args(args)
+        options.variants = []
+        try:
+            build_pages(CONTENT_DIR, TEMPLATE_PATH, staging, args.basepath,
+                        manifest_path=shard_manifest, incremental=args.incremental, static_state=static_state,
+                        cache=_content_cache(args), shard=args.shard, assets=assets, options=options)
+        except BuildError as e:
+            sys.exit(f"Build failed: {e}")
+        publish(staging, DST_PUBLIC)
+        return
+
+    static_start = time.perf_counter()
+    # Only static files that changed are copied; rendered pages are never
+    # treated as stale static files
+    static_state, assets = _sync_assets(staging, previous.static, args, keep=_page_outputs(staging),
+                                        stats=sync_stats)
+    if report is not None:
+        report.set_static(time.perf_counter() - static_start, sync_stats["copied_files"], sync_stats["copied_bytes"])
+
+    failure = None
+    try:
+        build_pages(CONTENT_DIR, TEMPLATE_PATH, staging, args.basepath, incremental=args.incremental,
+                    static_state=static_state, report=report, cache=_content_cache(args), assets=assets,
+                    options=BuildOptions.from_args(args))
+    except BuildError as e:
+        failure = f"Build failed: {e}"
+    if failure:
+        # The live site stays as it was, and so does the manifest describing it
+        shutil.rmtree(staging)
+        previous.save(MANIFEST_PATH)
+    else:
+        _update_variants(staging, args, previous.variants)
+        publish(staging, DST_PUBLIC)
+    if report is not None:
+        if args.report:
+            report.write(args.report, args.slowest)
+        if args.profile:
+            print(report.summary(args.slowest))
+    if failure and not args.watch:
+        sys.exit(failure)
+    if failure:
+        log.error(failure)
+    if args.watch:
+        serve_and_watch(args)
 
 
 if __name__ == "__main__":
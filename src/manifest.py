@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Bump whenever a change to the generator alters the HTML it produces, so that
+# incremental builds invalidate every page rendered by an older version.
+GENERATOR_VERSION = "8"
+
+MANIFEST_NAME = ".ssg-manifest.json"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stat_key(path: Path):
+    """[size, mtime_ns] of path, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class BuildManifest:
+    """
+    Record of the last build: the inputs every page depends on and, for each
+    source page, its content hash plus the output it produced.
+
+    pages maps a source path (relative to the content dir) to a dict with
+    "source_hash", "output" (relative to the output dir), "output_hash",
+    "output_stat" and "meta", the page's entry in the site index, plus
+    "links", the URLs of its links and images, when links were checked.
+    static maps each file copied from static/ to its [size, mtime_ns].
+    listings maps each generated listing, feed or sitemap to the hash of its
+    inputs and the hash and stat of its output.
+    shard is [K, N] for a build of shard K of N, otherwise None.
+    assets_hash is the digest of the AssetMap pages were rendered with, or
+    None when static files weren't fingerprinted.
+    search is the search index's state (see src.search.update_search_index),
+    empty when the build wrote none.
+    variants lists the suffixes of the compressed copies written next to the
+    outputs (see src.compress.precompress), empty when none were.
+    """
+
+    def __init__(self, template_hash=None, basepath=None, version=GENERATOR_VERSION, pages=None,
+                 static=None, listings=None, shard=None, assets_hash=None, search=None, variants=None):
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self.version = version
+        self.pages = pages if pages is not None else {}
+        self.static = static if static is not None else {}
+        self.listings = listings if listings is not None else {}
+        self.shard = shard
+        self.assets_hash = assets_hash
+        self.search = search if search is not None else {}
+        self.variants = variants if variants is not None else []
+
+    @classmethod
+    def load(cls, path: Path) -> "BuildManifest":
+        """Load a manifest, returning an empty one if it is missing or unreadable."""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            return cls(
+                template_hash=data["template_hash"],
+                basepath=data["basepath"],
+                version=data["version"],
+                pages=dict(data["pages"]),
+                static=dict(data.get("static", {})),
+                listings=dict(data.get("listings", {})),
+                shard=data.get("shard"),
+                assets_hash=data.get("assets_hash"),
+                search=dict(data.get("search", {})),
+                variants=list(data.get("variants", [])),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(version=None)
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        data = {
+            "version": self.version,
+            "template_hash": self.template_hash,
+            "basepath": self.basepath,
+            "pages": dict(sorted(self.pages.items())),
+            "static": dict(sorted(self.static.items())),
+            "listings": dict(sorted(self.listings.items())),
+            "shard": self.shard,
+            "assets_hash": self.assets_hash,
+            "search": self.search,
+            "variants": self.variants,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        # Streamed out one entry per line: on a large site the whole JSON text
+        # would be a large share of the build's peak memory, and json.dump
+        # (or indent=) would bypass the C encoder
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("{")
+            for i, (key, value) in enumerate(data.items()):
+                f.write(f'{"," if i else ""}\n  {json.dumps(key)}: ')
+                if isinstance(value, dict) and value:
+                    f.write("{")
+                    for j, (name, entry) in enumerate(value.items()):
+                        f.write(f'{"," if j else ""}\n    {json.dumps(name)}: {json.dumps(entry)}')
+                    f.write("\n  }")
+                else:
+                    f.write(json.dumps(value))
+            f.write("\n}\n")
+        os.replace(tmp, path)
+
+    def is_compatible(self, other: "BuildManifest") -> bool:
+        """True if pages recorded in other can be reused for a build described by self."""
+        return (
+            other.version == self.version
+            and other.template_hash == self.template_hash
+            and other.basepath == self.basepath
+            and other.assets_hash == self.assets_hash
+        )
+
+    def record(self, source: str, source_hash: str, output: str, output_hash: str,
+               output_stat=None, meta=None, links=None) -> None:
+        self.pages[source] = {
+            "source_hash": source_hash,
+            "output": output,
+            "output_hash": output_hash,
+            # [size, mtime_ns] of the written output, to notice outside edits
+            "output_stat": output_stat,
+            "meta": meta,
+        }
+        if links is not None:
+            self.pages[source]["links"] = links
@@ -10,29 +10,70 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def block_to_block_type(block):
-    stripped = block.strip()
-    
-    if stripped.startswith("#"):
-        heading_level = len(stripped.split(" ")[0])
+def _is_ordered_item(line):
+    number, dot, rest = line.partition(".")
+    return number.isdigit() and dot == "." and rest.startswith(" ")
+
+def _classify_lines(lines):
+    """
+    Block type of a block given as its lines, with no leading or trailing
+    blank lines. Quote and list markers are checked in a single pass.
+    """
+    first = lines[0].lstrip()
+    if first.startswith("#"):
+        heading_level = len(first.split(" ")[0])
         if 1 <= heading_level <= 6:
             return BlockType.HEADING
 
-    if stripped.startswith("```") and stripped.endswith("```"):
+    if first.startswith("```") and lines[-1].rstrip().endswith("```"):
         return BlockType.CODE
 
-    if all(line.strip().startswith(">") for line in stripped.splitlines()):
+    quote = unordered = ordered = True
+    for line in lines:
+        line = line.strip()
+        if quote and not line.startswith(">"):
+            quote = False
+        if unordered and not line.startswith("-"):
+            unordered = False
+        if ordered and not _is_ordered_item(line):
+            ordered = False
+        if not (quote or unordered or ordered):
+            return BlockType.PARAGRAPH
+
+    if quote:
         return BlockType.QUOTE
-
-    if all(line.strip().startswith("-") for line in stripped.splitlines()):
+    if unordered:
         return BlockType.UNORDERED_LIST
+    return BlockType.ORDERED_LIST
+
+def block_to_block_type(block):
+    return _classify_lines(block.strip().split("\n"))
+
+def iter_blocks(lines):
+    """
+    Yield (block_type, block) for each block in an iterable of lines, such as
+    an open file, as soon as the blank line that ends it has been read. The
+    blocks are those of markdown_to_blocks, but only one is held at a time.
+    """
+    buffer = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line:
+            # Whitespace-only lines belong to a block but never start one
+            if buffer or line.strip():
+                buffer.append(line)
+            continue
+        if buffer:
+            yield _finish_block(buffer)
+            buffer = []
+    if buffer:
+        yield _finish_block(buffer)
 
-    if all(line.strip().split(".", 1)[0].isdigit() and line.strip().split(".", 1)[1].startswith(" ")
-           for line in stripped.splitlines() if "." in line):
-        return BlockType.ORDERED_LIST
+def _finish_block(buffer):
+    while not buffer[-1].strip():
+        buffer.pop()
+    return _classify_lines(buffer), "\n".join(buffer).strip()
 
-    return BlockType.PARAGRAPH
- 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
 
@@ -62,11 +103,17 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+# Compiled once and shared by the extract/split helpers and the inline lexer
+IMAGE_RE = re.compile(r"!\[([^\]]+)\]\(([^)]+)\)")
+LINK_RE = re.compile(r"(?<!\!)\[([^\]]+)\]\(([^)]+)\)")
+# Characters that can open an inline element; everything else is plain text
+_INLINE_START_RE = re.compile(r"[*_`!\[]")
+
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\]]+)\]\(([^\)]+)\)", text)
+    return IMAGE_RE.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!\!)\[([^\]]+)\]\(([^\)]+)\)", text)
+    return LINK_RE.findall(text)
 
 def split_nodes_image(old_nodes):
     new_nodes = []
@@ -76,7 +123,7 @@ def split_nodes_image(old_nodes):
             new_nodes.append(node)
             continue
 
-        matches = list(re.finditer(r"!\[([^\]]+)\]\(([^)]+)\)", node.text))
+        matches = list(IMAGE_RE.finditer(node.text))
         if not matches:
             new_nodes.append(node)
             continue
@@ -104,7 +151,7 @@ def split_nodes_link(old_nodes):
             new_nodes.append(node)
             continue
 
-        matches = list(re.finditer(r"(?<!\!)\[([^\]]+)\]\(([^)]+)\)", node.text))
+        matches = list(LINK_RE.finditer(node.text))
         if not matches:
             new_nodes.append(node)
             continue
@@ -124,29 +171,100 @@ def split_nodes_link(old_nodes):
 
     return new_nodes
 
+_DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+def _opens_inside(text, element, link):
+    """
+    Whether another element that would match opens inside an image or link
+    match: emphasis or code in its label, or an image anywhere in a link.
+    """
+    label_end = element.end(1)
+    for opener in _INLINE_START_RE.finditer(text, element.start(1), element.end() if link else label_end):
+        pos = opener.start()
+        char = text[pos]
+        if char == "!":
+            if link and IMAGE_RE.match(text, pos):
+                return True
+        elif char != "[" and pos < label_end:
+            delimiter = "**" if text.startswith("**", pos) else char
+            if text.find(delimiter, pos + len(delimiter)) != -1:
+                return True
+    return False
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT, None)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    """
+    Split inline markdown into TextNodes in a single left-to-right scan.
+
+    Produces the same nodes as running split_nodes_delimiter for **, *, _ and `
+    followed by split_nodes_image and split_nodes_link, but whichever element
+    opens first wins, so a link URL containing "_" or code containing "*" is
+    kept intact. Emphasis or code in a link or image label, and an image in
+    a link, are the exception: they are matched on their own and the
+    brackets around them stay text, as in the split pipeline. Unmatched
+    delimiters still raise ValueError.
+    """
+    nodes = []
+    plain_start = 0
+    pos = 0
+
+    while True:
+        match = _INLINE_START_RE.search(text, pos)
+        if match is None:
+            break
+        pos = match.start()
+        char = text[pos]
+
+        if char == "!" or char == "[":
+            element = (IMAGE_RE if char == "!" else LINK_RE).match(text, pos)
+            if element is None or _opens_inside(text, element, char == "["):
+                pos += 1
+                continue
+            if pos > plain_start:
+                nodes.append(TextNode(text[plain_start:pos], TextType.TEXT, None))
+            label, url = element.groups()
+            nodes.append(TextNode(label, TextType.IMAGE if char == "!" else TextType.LINK, url))
+            pos = plain_start = element.end()
+            continue
+
+        delimiter = "**" if text.startswith("**", pos) else char
+        inner_start = pos + len(delimiter)
+        end = text.find(delimiter, inner_start)
+        if end == -1:
+            raise ValueError(f"Unmatched delimiter '{delimiter}' in: {text}")
+        if pos > plain_start:
+            nodes.append(TextNode(text[plain_start:pos], TextType.TEXT, None))
+        if end > inner_start:
+            nodes.append(TextNode(text[inner_start:end], _DELIMITER_TYPES[delimiter], None))
+        pos = plain_start = end + len(delimiter)
+
+    if plain_start < len(text):
+        nodes.append(TextNode(text[plain_start:], TextType.TEXT, None))
     return nodes
 
 def markdown_to_blocks(markdown):
     lines = markdown.split("\n\n")
     return [block.strip() for block in lines if block.strip()]
 
+def decode_markdown(data: bytes) -> str:
+    """Decode source bytes as UTF-8 with universal newlines, like Path.read_text."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
 def extract_title(markdown: str) -> str:
     """
     Extracts the first level-1 heading ('# ') from markdown text.
     Raises ValueError if none is found.
     """
-    for line in markdown.splitlines():
+    return extract_title_from_lines(markdown.splitlines())
+
+def extract_title_from_lines(lines) -> str:
+    """extract_title for an iterable of lines, such as an open file."""
+    for line in lines:
         stripped = line.lstrip()
         if stripped.startswith("# "):
             return stripped[2:].strip()
     raise ValueError("Markdown does not contain a top-level heading (# ).")
-
-
@@ -1,78 +1,265 @@
 # src/markdown_to_html.py
 import re
-from src.htmlnode import ParentNode
+from collections import Counter
+from functools import partial
+from contextlib import nullcontext
+from src.htmlnode import LeafNode, ParentNode
 from src.textnode import TextNode, TextType
 from src.markdown import (
-    markdown_to_blocks,
-    block_to_block_type,
+    extract_title,
+    iter_blocks,
     text_to_textnodes,
     BlockType,
 )
 from src.converters import text_node_to_html_node  # use the real converter
+from src.frontmatter import split_front_matter
+from src.urls import normalize_basepath
+from src.search import tokenize
+from src import block_cache
 
 
-def text_to_children(text):
-    return [text_node_to_html_node(n) for n in text_to_textnodes(text)]
+def text_to_children(text, url_prefix=""):
+    return [text_node_to_html_node(n, url_prefix) for n in text_to_textnodes(text)]
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
+class PageMetadata:
+    """
+    What a page's parse learns about it besides the HTML: the first h1 title,
+    the (level, text) outline of every heading, the number of words outside
+    code blocks (counted by separators, so approximate), and the (text, url)
+    of every link and (alt, url) of every image. URLs are as written in the
+    markdown, without the basepath. front_matter holds the page's front
+    matter, if it has any. terms is a Counter of the search terms outside code
+    blocks, or None when they weren't collected.
+    """
+    __slots__ = ("title", "outline", "word_count", "links", "images", "front_matter", "terms")
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
+    def __init__(self, title=None, outline=None, word_count=0, links=None, images=None,
+                 front_matter=None, terms=None):
+        self.title = title
+        self.outline = outline if outline is not None else []
+        self.word_count = word_count
+        self.links = links if links is not None else []
+        self.images = images if images is not None else []
+        self.front_matter = front_matter if front_matter is not None else {}
+        self.terms = terms
 
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageMetadata":
+        return cls(
+            title=data["title"],
+            outline=[tuple(h) for h in data["outline"]],
+            word_count=data["word_count"],
+            links=[tuple(link) for link in data["links"]],
+            images=[tuple(image) for image in data["images"]],
+            front_matter=data["front_matter"],
+            terms=Counter(data["terms"]) if data.get("terms") is not None else None,
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, PageMetadata) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"PageMetadata({self.as_dict()!r})"
+
+
+def markdown_to_html_node(markdown, basepath="/", profile=None, assets=None):
+    """
+    Parse markdown into a div ParentNode. Pass a PageProfile as profile to
+    time block parsing, inline parsing and node building; without one nothing
+    is wrapped and there is no per-block overhead.
+    """
+    return ParentNode("div", list(iter_block_nodes(markdown.split("\n"), basepath, profile, assets=assets)))
+
+
+def parse_markdown(markdown, basepath="/", profile=None, assets=None, collect_terms=False):
+    """
+    Like markdown_to_html_node, but also return the PageMetadata gathered
+    during the same parse: (div ParentNode, PageMetadata). Search terms are
+    only tokenized with collect_terms.
+    """
+    metadata = PageMetadata(terms=Counter() if collect_terms else None)
+    nodes = iter_block_nodes(markdown.split("\n"), basepath, profile, metadata, assets)
+    return ParentNode("div", list(nodes)), metadata
+
+
+def title_from_lines(lines) -> str:
+    """
+    The title parse_page takes from a page's markdown lines (after any front
+    matter): the first h1 block, so a "# " line in a code block doesn't
+    count. Returns None if there is no h1 block.
+    """
+    for block_type, block in iter_blocks(lines):
+        if block_type == BlockType.HEADING and block.startswith("# "):
+            return block.split("\n", 1)[0][2:].strip()
+    return None
+
+
+def parse_page(markdown, basepath="/", profile=None, assets=None, collect_terms=False):
+    """
+    Return (PageMetadata, content HTML) for a markdown page that may start
+    with front matter, timing the title and serialization stages into profile
+    if one is given. A "title" in the front matter wins over the first h1.
+    Raises ValueError if the page has no title. An AssetMap rewrites links
+    and images to fingerprinted static files. collect_terms fills in
+    metadata.terms for the search index.
+    """
+    front_matter, markdown = split_front_matter(markdown)
+    html_node, metadata = parse_markdown(markdown, basepath, profile, assets, collect_terms)
+    metadata.front_matter = front_matter
+    with profile.measure("title") if profile is not None else nullcontext():
+        if "title" in front_matter:
+            metadata.title = front_matter["title"]
+        elif metadata.title is None:
+            # No h1 block; fall back to any "# " line, as extract_title always has
+            metadata.title = extract_title(markdown)
+    with profile.measure("serialize") if profile is not None else nullcontext():
+        content_html = html_node.to_html()
+    return metadata, content_html
+
+
+def iter_block_nodes(lines, basepath="/", profile=None, metadata=None, assets=None):
+    """
+    Yield the HTML node for each block of an iterable of markdown lines, such
+    as an open file, as soon as the block has been read. Pass a PageMetadata
+    as metadata to fill it in along the way; its terms are counted too if
+    metadata.terms is a Counter. While this process has a BlockCache (see
+    src.block_cache), blocks other than headings are looked up there and,
+    from the second time they are seen, yielded as their rendered HTML.
+    """
+    # Site-absolute link/image URLs are rewritten here, as nodes are built
+    url_prefix = normalize_basepath(basepath)
+    blocks = iter_blocks(lines)
+    to_html_node = text_node_to_html_node
+    if assets is not None:
+        to_html_node = partial(text_node_to_html_node, assets=assets)
+    if profile is not None:
+        # Splitting and typing happen in one pass, timed together as "blocks"
+        blocks = profile.timed("blocks", list)(blocks)
+        to_html_node = profile.timed("html_build", to_html_node)
+
+    def inline_parser(metadata):
+        to_textnodes = text_to_textnodes
+        if metadata is not None:
+            to_textnodes = _collecting_metadata(to_textnodes, metadata)
+        if profile is not None:
+            to_textnodes = profile.timed("inline", to_textnodes)
+        return to_textnodes
+
+    to_textnodes = inline_parser(metadata)
+    memo = block_cache.active
+    collect_terms = metadata is not None and metadata.terms is not None
+
+    def heading_children(level, text, block):
+        nodes = to_textnodes(text)
+        if metadata is not None:
+            metadata.outline.append((level, "".join(n.text for n in nodes)))
+            if level == 1 and metadata.title is None:
+                metadata.title = block.split("\n", 1)[0][2:].strip()
+        return [to_html_node(n, url_prefix) for n in nodes]
+
+    for block_type, block in blocks:
         if block_type == BlockType.HEADING:
             heading_level = len(block.split(" ")[0])
             text = block[heading_level + 1 :].strip()
-            children.append(ParentNode(f"h{heading_level}", text_to_children(text)))
-
-        elif block_type == BlockType.CODE:
-            code_text = block.replace("```", "").strip()
-            children.append(
-                ParentNode("pre", [text_node_to_html_node(TextNode(code_text, TextType.CODE, None))])
-            )
-
-        elif block_type == BlockType.QUOTE:
-            # support lines like "> quote"
-            quote_lines = []
-            for line in block.split("\n"):
-                s = line.lstrip()
-                quote_lines.append(s[2:] if s.startswith("> ") else s)
-            quote_text = " ".join([q for q in quote_lines if q.strip()])
-            children.append(ParentNode("blockquote", text_to_children(quote_text)))
-
-        elif block_type == BlockType.UNORDERED_LIST:
-            li_nodes = []
-            for raw in block.split("\n"):
-                item = raw.strip()
-                if not item:
-                    continue
-                # accept "- foo", "* foo", "+ foo", allow extra spaces
-                m = re.match(r"^[\-\*\+]\s+(.*)$", item)
-                text = (m.group(1) if m else re.sub(r"^[\-\*\+]\s*", "", item)).strip()
-                if text:
-                    li_nodes.append(ParentNode("li", text_to_children(text)))
-            children.append(ParentNode("ul", li_nodes))
-
-        elif block_type == BlockType.ORDERED_LIST:
-            li_nodes = []
-            for raw in block.split("\n"):
-                item = raw.strip()
-                if not item:
-                    continue
-                # prefer "1. text", tolerate "1.text", spaces, indentation
-                m = re.match(r"^\s*\d+\.\s*(.*)$", item)
-                if m:
-                    text = m.group(1).strip()
-                else:
-                    # fallback: strip leading digits + dot and optional space
-                    text = re.sub(r"^\s*\d+\.\s*", "", item).strip()
-                if text:
-                    li_nodes.append(ParentNode("li", text_to_children(text)))
-            children.append(ParentNode("ol", li_nodes))
-
+            yield ParentNode(f"h{heading_level}", heading_children(heading_level, text, block))
+        elif memo is None or len(block) > block_cache.MAX_BLOCK_CHARS:
+            yield _block_node(block_type, block, to_textnodes, to_html_node, url_prefix)
         else:
-            children.append(ParentNode("p", text_to_children(block)))
+            key = (block_type, block, url_prefix, assets, collect_terms)
+            entry = memo.get(key)
+            if entry is None and not memo.admit(key):
+                # Only a block seen before is worth storing; until then it costs a lookup
+                yield _block_node(block_type, block, to_textnodes, to_html_node, url_prefix)
+                continue
+            if entry is None:
+                # Gather the block's metadata on its own, to replay it on every hit
+                found = PageMetadata(terms=Counter() if collect_terms else None)
+                node = _block_node(block_type, block, inline_parser(found), to_html_node, url_prefix)
+                entry = (node.to_html(), found)
+                memo.put(key, entry)
+            html, found = entry
+            if metadata is not None:
+                metadata.word_count += found.word_count
+                metadata.links.extend(found.links)
+                metadata.images.extend(found.images)
+                if collect_terms:
+                    metadata.terms.update(found.terms)
+            yield LeafNode(None, html)
+
+
+def _block_node(block_type, block, to_textnodes, to_html_node, url_prefix):
+    """The HTML node for a block other than a heading."""
+    def to_children(text):
+        return [to_html_node(n, url_prefix) for n in to_textnodes(text)]
+
+    if block_type == BlockType.CODE:
+        code_text = block.replace("```", "").strip()
+        return ParentNode("pre", [to_html_node(TextNode(code_text, TextType.CODE, None))])
+
+    elif block_type == BlockType.QUOTE:
+        # support lines like "> quote"
+        quote_lines = []
+        for line in block.split("\n"):
+            s = line.lstrip()
+            quote_lines.append(s[2:] if s.startswith("> ") else s)
+        quote_text = " ".join([q for q in quote_lines if q.strip()])
+        return ParentNode("blockquote", to_children(quote_text))
+
+    elif block_type == BlockType.UNORDERED_LIST:
+        li_nodes = []
+        for raw in block.split("\n"):
+            item = raw.strip()
+            if not item:
+                continue
+            # accept "- foo", "* foo", "+ foo", allow extra spaces
+            m = re.match(r"^[\-\*\+]\s+(.*)$", item)
+            text = (m.group(1) if m else re.sub(r"^[\-\*\+]\s*", "", item)).strip()
+            if text:
+                li_nodes.append(ParentNode("li", to_children(text)))
+        return ParentNode("ul", li_nodes)
+
+    elif block_type == BlockType.ORDERED_LIST:
+        li_nodes = []
+        for raw in block.split("\n"):
+            item = raw.strip()
+            if not item:
+                continue
+            # prefer "1. text", tolerate "1.text", spaces, indentation
+            m = re.match(r"^\s*\d+\.\s*(.*)$", item)
+            if m:
+                text = m.group(1).strip()
+            else:
+                # fallback: strip leading digits + dot and optional space
+                text = re.sub(r"^\s*\d+\.\s*", "", item).strip()
+            if text:
+                li_nodes.append(ParentNode("li", to_children(text)))
+        return ParentNode("ol", li_nodes)
+
+    return ParentNode("p", to_children(block))
+
+
+def _collecting_metadata(to_textnodes, metadata):
+    """Wrap text_to_textnodes to count words, record links and images and count terms."""
+    links, images, terms = metadata.links, metadata.images, metadata.terms
 
-    return ParentNode("div", children)
+    def wrapper(text):
+        nodes = to_textnodes(text)
+        # Counted on the inline source, where markup never adds a word, by
+        # counting separators: splitting into word lists doubles parse time
+        if text:
+            metadata.word_count += text.count(" ") + text.count("\n") + 1
+        if "](" in text:
+            for node in nodes:
+                if node.text_type is TextType.LINK:
+                    links.append((node.text, node.url))
+                elif node.text_type is TextType.IMAGE:
+                    images.append((node.text, node.url))
+        if terms is not None and text:
+            # Link and image URLs aren't searchable; their text and alt are
+            terms.update(tokenize("".join([n.text for n in nodes]) if "](" in text else text))
+        return nodes
+    return wrapper
@@ -0,0 +1,150 @@
+import json
+import time
+from pathlib import Path
+
+# Per-page stages, in pipeline order. Blocks are split and typed in one pass
+# ("blocks"), and basepath rewriting happens while link and image nodes are
+# built, so its cost is part of html_build. "cache" is content cache lookups
+# and stores; on a hit it replaces the parsing stages.
+STAGES = ("read", "cache", "blocks", "inline", "html_build", "title", "serialize",
+          "template", "write")
+
+
+class PageProfile:
+    """Wall and CPU time per stage, plus bytes in and out, for one page."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.stages = {}  # stage -> [wall seconds, cpu seconds]
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, stage: str, wall: float, cpu: float) -> None:
+        totals = self.stages.setdefault(stage, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+
+    def measure(self, stage: str):
+        """Context manager timing the enclosed block as stage."""
+        return _Measure(self, stage)
+
+    def timed(self, stage: str, fn):
+        """Wrap fn so every call is timed as stage."""
+        def wrapper(*args):
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args)
+            finally:
+                self.add(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+        return wrapper
+
+    def as_dict(self) -> dict:
+        return {
+            "page": self.source,
+            "wall": sum(wall for wall, _ in self.stages.values()),
+            "cpu": sum(cpu for _, cpu in self.stages.values()),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "stages": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in self.stages.items()},
+        }
+
+
+class _Measure:
+    __slots__ = ("profile", "stage", "wall", "cpu")
+
+    def __init__(self, profile, stage):
+        self.profile = profile
+        self.stage = stage
+
+    def __enter__(self):
+        self.wall, self.cpu = time.perf_counter(), time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.stage, time.perf_counter() - self.wall, time.thread_time() - self.cpu)
+        return False
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process and its finished workers, if known."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage * 1024  # ru_maxrss is in KiB on Linux
+
+
+class BuildReport:
+    """Collects page profiles and build-wide numbers for --profile / --report."""
+
+    def __init__(self):
+        self.pages = []
+        self.static = None
+        self.block_cache = None
+        self.skipped = 0
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def add_page(self, page: dict) -> None:
+        self.pages.append(page)
+
+    def set_static(self, seconds: float, files: int, nbytes: int) -> None:
+        self.static = {
+            "seconds": seconds,
+            "files": files,
+            "bytes": nbytes,
+            "bytes_per_second": nbytes / seconds if seconds else None,
+        }
+
+    def to_dict(self, slowest=10) -> dict:
+        stages = {}
+        for page in self.pages:
+            for name, t in page["stages"].items():
+                total = stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+                total["wall"] += t["wall"]
+                total["cpu"] += t["cpu"]
+        return {
+            "wall": time.perf_counter() - self._wall,
+            "cpu": time.process_time() - self._cpu,
+            "pages_rendered": len(self.pages),
+            "pages_skipped": self.skipped,
+            "bytes_in": sum(p["bytes_in"] for p in self.pages),
+            "bytes_out": sum(p["bytes_out"] for p in self.pages),
+            "stages": {name: stages[name] for name in STAGES if name in stages},
+            "static": self.static,
+            "block_cache": self.block_cache,
+            "slowest_pages": sorted(self.pages, key=lambda p: p["wall"], reverse=True)[:slowest],
+            "peak_rss_bytes": peak_rss_bytes(),
+            "pages": self.pages,
+        }
+
+    def write(self, path: Path, slowest=10) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(slowest), indent=2) + "\n", encoding="utf-8")
+
+    def summary(self, slowest=10) -> str:
+        data = self.to_dict(slowest)
+        lines = [
+            f"Build: {data['wall']:.3f}s wall, {data['cpu']:.3f}s CPU, "
+            f"{data['pages_rendered']} page(s) rendered, {data['pages_skipped']} skipped",
+        ]
+        page_wall = sum(t["wall"] for t in data["stages"].values()) or 1.0
+        for name, t in data["stages"].items():
+            lines.append(f"  {name:12s} {t['wall'] * 1000:10.2f} ms wall {t['cpu'] * 1000:10.2f} ms cpu"
+                         f"  {t['wall'] / page_wall:6.1%}")
+        if data["static"]:
+            s = data["static"]
+            rate = f"{s['bytes_per_second'] / 1e6:.1f} MB/s" if s["bytes_per_second"] else "-"
+            lines.append(f"  static: {s['files']} file(s), {s['bytes'] / 1e6:.2f} MB in {s['seconds'] * 1000:.1f} ms ({rate})")
+        if data["block_cache"]:
+            b = data["block_cache"]
+            lookups = b["hits"] + b["misses"]
+            lines.append(f"  block cache: {b['hits']} hit(s) of {lookups} lookup(s) ({b['hits'] / lookups:.1%})")
+        if data["slowest_pages"]:
+            lines.append("  slowest pages:")
+            for page in data["slowest_pages"]:
+                lines.append(f"    {page['wall'] * 1000:9.2f} ms  {page['page']}")
+        if data["peak_rss_bytes"]:
+            lines.append(f"  peak RSS: {data['peak_rss_bytes'] / 2**20:.1f} MiB")
+        return "\n".join(lines)
@@ -0,0 +1,87 @@
+import ctypes
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+log = logging.getLogger("ssg")
+
+# renameat2() flag swapping two paths in one step (Linux 3.15+)
+_RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
+
+
+def staging_dir(live: Path) -> Path:
+    """Where the next build of live is written: a hidden sibling on the same filesystem."""
+    return live.parent / f".{live.name}.staging"
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Cross-device or no hardlink support: fall back to a plain copy
+        shutil.copy2(src, dst)
+
+
+def prepare_staging(live: Path, carry_over=False) -> Path:
+    """
+    Return an empty staging directory for a build of live, removing any left
+    behind by an interrupted build. With carry_over, it starts as a copy of
+    the current live output made of hardlinks, so an incremental build only
+    has to replace what changed. Every writer replaces files by renaming a
+    new file over them, so the live copies are never modified through a link.
+    """
+    staging = staging_dir(live)
+    if staging.exists():
+        shutil.rmtree(staging)
+    if carry_over and live.is_dir():
+        shutil.copytree(live, staging, symlinks=True, copy_function=_link_or_copy)
+    else:
+        staging.mkdir(parents=True)
+    return staging
+
+
+def _exchange(a: Path, b: Path) -> None:
+    """Swap two paths atomically where the OS supports it, else with three renames."""
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError, TypeError):  # not Linux/glibc
+        renameat2 = None
+    if renameat2 is not None:
+        if renameat2(_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE) == 0:
+            return
+        log.debug(f"renameat2 exchange unavailable ({os.strerror(ctypes.get_errno())}); using renames")
+    # b is briefly missing between the first two renames
+    parked = a.with_name(a.name + ".old")
+    os.rename(b, parked)
+    os.rename(a, b)
+    os.rename(parked, a)
+
+
+def publish(staging: Path, live: Path) -> None:
+    """
+    Put a finished staging directory in place of live in a single rename,
+    whatever the size of the site; readers see either the old output or the
+    new one, never a mix. If live is a symlink, the staged tree is given a
+    versioned name next to it and the link is flipped. Otherwise the two
+    directories are exchanged. The previous output is deleted afterwards.
+    """
+    if live.is_symlink():
+        old = live.resolve()
+        target = live.parent / f".{live.name}.{time.time_ns()}"
+        os.rename(staging, target)
+        link = live.with_name(f".{live.name}.link")
+        link.unlink(missing_ok=True)
+        link.symlink_to(target.name, target_is_directory=True)
+        os.replace(link, live)
+        # Only delete trees this function created, never a directory the link was pointed at by hand
+        if old.parent == live.parent.resolve() and old.name.startswith(f".{live.name}."):
+            shutil.rmtree(old, ignore_errors=True)
+    elif live.exists():
+        _exchange(staging, live)
+        shutil.rmtree(staging)
+    else:
+        os.rename(staging, live)
+    log.debug(f"Published {live}")
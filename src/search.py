@@ -0,0 +1,210 @@
+"""
+Client-side search index, written under docs/search/:
+
+- index.json: {"version", "prefix_length", "docs_per_chunk", "doc_count",
+  "shards": {prefix: file name}}, fetched first
+- terms/<file>: {term: [doc id, term frequency, doc id, term frequency, ...]}
+  for every term starting with that shard's prefix, ids ascending
+- docs/<n>.json: [[url, title], ...] for doc ids n * docs_per_chunk onwards;
+  ids of removed pages are null
+
+A browser tokenizes the query like tokenize() below, fetches the term shard
+for each query term's prefix and the docs chunks of the hits.
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+SEARCH_DIR = "search"
+INDEX_VERSION = 1
+# Terms are sharded by their first PREFIX_LENGTH characters
+PREFIX_LENGTH = 2
+DOCS_PER_CHUNK = 256
+# Bytes of terms a TermSpill holds in memory before appending them to its files
+SPILL_BYTES = 8 << 20
+
+# Runs of letters and digits, at least PREFIX_LENGTH long; "_" separates words
+TERM_RE = re.compile(r"[^\W_]{%d,}" % PREFIX_LENGTH)
+# Every ASCII character that isn't a letter or digit -> a space
+_ASCII_SEPARATORS = str.maketrans({chr(i): " " for i in range(128) if not chr(i).isalnum()})
+
+
+def tokenize(text: str) -> list:
+    text = text.lower()
+    if text.isascii():
+        # Same terms as TERM_RE, in about half the time
+        return [word for word in text.translate(_ASCII_SEPARATORS).split() if len(word) >= PREFIX_LENGTH]
+    return TERM_RE.findall(text)
+
+
+def _shard_file(prefix: str) -> str:
+    # Non-ASCII prefixes are hex-encoded so file names stay portable
+    if prefix.isascii() and prefix.isalnum():
+        return f"{prefix}.json"
+    return f"_{prefix.encode('utf-8').hex()}.json"
+
+
+def _split_prefixes(prefixes: str) -> list:
+    return [prefixes[i:i + PREFIX_LENGTH] for i in range(0, len(prefixes), PREFIX_LENGTH)]
+
+
+def _write_json(path: Path, data) -> None:
+    # Replace rather than rewrite: the file may be a hardlink shared with the live site
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+class TermSpill:
+    """
+    The {term: count} of each page rendered in a build, split by shard
+    prefix into JSON lines that are appended to one temporary file per
+    prefix whenever more than max_bytes are buffered, so a build never holds
+    every page's terms. prefixes maps each source added to the shard
+    prefixes it has terms in.
+    """
+
+    def __init__(self, max_bytes=SPILL_BYTES):
+        self.max_bytes = max_bytes
+        self.prefixes = {}
+        self._buffer = {}  # prefix -> JSON lines of [source, {term: count}]
+        self._buffered = 0
+        self._dir = None
+
+    def add(self, source: str, counts) -> None:
+        by_prefix = {}
+        for term, count in counts.items():
+            by_prefix.setdefault(term[:PREFIX_LENGTH], {})[term] = count
+        self.prefixes[source] = "".join(sorted(by_prefix))
+        for prefix, shard_terms in by_prefix.items():
+            line = json.dumps([source, shard_terms], ensure_ascii=False, separators=(",", ":"))
+            self._buffer.setdefault(prefix, []).append(line)
+            self._buffered += len(line)
+        if self._buffered > self.max_bytes:
+            self._flush()
+
+    def _path(self, prefix: str) -> Path:
+        return Path(self._dir.name) / f"{_shard_file(prefix)}l"
+
+    def _flush(self) -> None:
+        if self._dir is None:
+            self._dir = tempfile.TemporaryDirectory(prefix="ssg-terms-")
+        for prefix, lines in self._buffer.items():
+            with open(self._path(prefix), "a", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in lines)
+        self._buffer.clear()
+        self._buffered = 0
+
+    def entries(self, prefix: str):
+        """Yield (source, {term: count}) for every page added with terms under prefix."""
+        if self._dir is not None and self._path(prefix).exists():
+            with open(self._path(prefix), encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+        for line in self._buffer.get(prefix, ()):
+            yield json.loads(line)
+
+    def close(self) -> None:
+        if self._dir is not None:
+            self._dir.cleanup()
+            self._dir = None
+        self._buffer.clear()
+
+
+def remove_search_index(dest_dir: Path) -> None:
+    shutil.rmtree(dest_dir / SEARCH_DIR, ignore_errors=True)
+
+
+def update_search_index(dest_dir: Path, pages: dict, terms: dict, previous=None) -> dict:
+    """
+    Bring the search index under dest_dir up to date and return its state
+    for the build manifest.
+
+    pages maps every live source to its (url, title); terms holds the
+    {term: count} of the sources rendered in this build, as a TermSpill or
+    a dict. Term shards are rewritten one at a time. previous is the state
+    returned last time ({"pages": {source: [doc id, prefixes]}, "next_id"}),
+    where prefixes concatenates the shard prefixes the page has terms in.
+    Only the term shards and docs chunks holding changed, added or removed
+    pages are read and rewritten. Doc ids stay stable across builds; ids of
+    removed pages are retired until a build without previous state.
+    """
+    if isinstance(terms, dict):
+        spill = TermSpill()
+        for source, counts in terms.items():
+            spill.add(source, counts)
+        terms = spill
+    root = dest_dir / SEARCH_DIR
+    previous = previous or {}
+    old_pages = previous.get("pages", {})
+    if not old_pages:
+        remove_search_index(dest_dir)
+    next_id = previous.get("next_id", 0)
+
+    state, dropped, touched = {}, set(), set()
+    for source, (doc_id, prefixes) in old_pages.items():
+        if source in pages and source not in terms.prefixes:
+            state[source] = [doc_id, prefixes]
+        else:
+            dropped.add(doc_id)
+            touched.update(_split_prefixes(prefixes))
+
+    for source, prefixes in sorted(terms.prefixes.items()):
+        if source not in pages:
+            continue
+        if source in old_pages:
+            doc_id = old_pages[source][0]
+        else:
+            doc_id, next_id = next_id, next_id + 1
+        state[source] = [doc_id, prefixes]
+        dropped.add(doc_id)
+        touched.update(_split_prefixes(prefixes))
+
+    for prefix in touched:
+        path = root / "terms" / _shard_file(prefix)
+        shard = {}
+        for term, flat in _read_json(path, {}).items():
+            postings = [(flat[i], flat[i + 1]) for i in range(0, len(flat), 2) if flat[i] not in dropped]
+            if postings:
+                shard[term] = postings
+        for source, counts in terms.entries(prefix):
+            if source in pages:
+                doc_id = state[source][0]
+                for term, count in counts.items():
+                    shard.setdefault(term, []).append((doc_id, count))
+        if shard:
+            _write_json(path, {term: [n for posting in sorted(postings) for n in posting]
+                               for term, postings in sorted(shard.items())})
+        else:
+            path.unlink(missing_ok=True)
+
+    by_id = {doc_id: source for source, (doc_id, _) in state.items()}
+    for chunk in {doc_id // DOCS_PER_CHUNK for doc_id in dropped}:
+        first = chunk * DOCS_PER_CHUNK
+        docs = [list(pages[by_id[doc_id]]) if doc_id in by_id else None
+                for doc_id in range(first, min(first + DOCS_PER_CHUNK, next_id))]
+        _write_json(root / "docs" / f"{chunk}.json", docs)
+
+    shards = {}
+    for source, (_, prefixes) in state.items():
+        for prefix in _split_prefixes(prefixes):
+            shards[prefix] = _shard_file(prefix)
+    _write_json(root / "index.json", {
+        "version": INDEX_VERSION,
+        "prefix_length": PREFIX_LENGTH,
+        "docs_per_chunk": DOCS_PER_CHUNK,
+        "doc_count": next_id,
+        "shards": dict(sorted(shards.items())),
+    })
+    return {"pages": dict(sorted(state.items())), "next_id": next_id}
@@ -0,0 +1,112 @@
+import argparse
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.listings import build_listings
+from src.manifest import GENERATOR_VERSION, BuildManifest, hash_file, stat_key
+from src.static_sync import place_file
+
+# Written into each shard's output directory, so it travels with the output
+SHARD_MANIFEST_NAME = ".ssg-shard.json"
+
+log = logging.getLogger("ssg")
+
+
+class ShardError(Exception):
+    """Shard outputs that can't be merged: missing, duplicate, stale or overlapping."""
+
+
+def parse_shard(text: str):
+    """argparse type for "K/N": shard K (1-based) of N."""
+    index, sep, count = text.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not sep or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"expected K/N with 1 <= K <= N, got {text!r}")
+    return index, count
+
+
+def shard_of(source: str, count: int) -> int:
+    """
+    The 1-based shard a source path belongs to out of count. Uses a stable
+    hash of the path, so every machine and Python version agrees.
+    """
+    digest = hashlib.sha256(source.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def in_shard(source: str, shard) -> bool:
+    index, count = shard
+    return shard_of(source, count) == index
+
+
+def merge_shards(shard_dirs, dest_dir: Path, template_path: Path, basepath="/", manifest_path: Path = None,
+                 static_state=None, site_url=None, link="copy", workers=8, assets=None,
+                 variants=()) -> BuildManifest:
+    """
+    Copy the pages of every shard output directory into dest_dir, then render
+    the site-wide listings from the combined index. All N shards of one
+    partition must be present, built by this generator version with the same
+    template, basepath and AssetMap, and no two may claim the same output.
+    Writes the merged manifest to manifest_path, so later incremental builds
+    of dest_dir can reuse every page, and returns it; variants is recorded
+    in it as in build_pages.
+    """
+    manifest = BuildManifest(hash_file(template_path), basepath, GENERATOR_VERSION,
+                             assets_hash=assets.digest if assets is not None else None,
+                             variants=list(variants))
+    manifest.static = static_state if static_state is not None else {}
+
+    shards = {}
+    for shard_dir in map(Path, shard_dirs):
+        if shard_dir.resolve() == Path(dest_dir).resolve():
+            raise ShardError(f"{shard_dir}: shard output can't be merged into itself")
+        shard = BuildManifest.load(shard_dir / SHARD_MANIFEST_NAME)
+        if shard.shard is None:
+            raise ShardError(f"{shard_dir}: no shard manifest ({SHARD_MANIFEST_NAME})")
+        if not manifest.is_compatible(shard):
+            raise ShardError(f"{shard_dir}: built with a different template, basepath, "
+                             f"fingerprinted assets or generator version")
+        key = tuple(shard.shard)
+        if key in shards:
+            raise ShardError(f"{shard_dir}: shard {key[0]}/{key[1]} given twice")
+        shards[key] = (shard_dir, shard)
+
+    counts = {count for _, count in shards}
+    if len(counts) != 1:
+        raise ShardError(f"shards come from different partitions: {sorted(shards)}")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {index for index, _ in shards})
+    if missing:
+        raise ShardError(f"missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}")
+
+    owners, copies = {}, []
+    for (index, _), (shard_dir, shard) in sorted(shards.items()):
+        for source, entry in shard.pages.items():
+            output = entry["output"]
+            if output in owners:
+                raise ShardError(f"{output} is produced by shards {owners[output]} and {index}/{count}")
+            owners[output] = f"{index}/{count}"
+            manifest.pages[source] = entry
+            copies.append((shard_dir / output, dest_dir / output))
+
+    def copy(pair):
+        src, dst = pair
+        place_file(src, dst, link)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(copy, copies))
+    for entry in manifest.pages.values():
+        entry["output_stat"] = stat_key(dest_dir / entry["output"])
+    log.info(f"Merged {len(manifest.pages)} page(s) from {count} shard(s)")
+
+    index = {source: dict(entry["meta"], output=entry["output"]) for source, entry in manifest.pages.items()}
+    manifest.listings = build_listings(index, dest_dir, template_path, basepath, site_url,
+                                       taken=set(owners), assets=assets)
+    if manifest_path is not None:
+        manifest.save(manifest_path)
+    return manifest
@@ -0,0 +1,163 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.assets import fingerprinted_name
+from src.manifest import hash_file
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+log = logging.getLogger("ssg")
+
+# Linux ioctl that clones a file's extents (copy-on-write) on btrfs, XFS, etc.
+_FICLONE = 0x40049409
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    import fcntl
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    shutil.copystat(src, dst)
+
+
+def place_file(src: Path, dst: Path, link: str) -> None:
+    """Copy (or link) src to dst via a temporary name so readers never see a partial file."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        if link == "hardlink":
+            os.link(src, tmp)
+        elif link == "reflink":
+            _reflink(src, tmp)
+        else:
+            shutil.copy2(src, tmp)
+    except OSError:
+        if link == "copy":
+            raise
+        # Cross-device links or no reflink support: fall back to a plain copy
+        tmp.unlink(missing_ok=True)
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def remove_output(path: Path, root: Path) -> None:
+    """Delete a stale output file and any directories under root it leaves empty."""
+    path.unlink(missing_ok=True)
+    parent = path.parent
+    while parent != root and root in parent.parents:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
+
+
+def _walk_files(root: Path):
+    """Yield (relative posix path, os.stat_result) for every file under root."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(Path(entry.path))
+                elif entry.is_file():
+                    rel = Path(entry.path).relative_to(root).as_posix()
+                    yield rel, entry.stat()
+
+
+def _unchanged(src: Path, dst: Path, st, recorded, verify_hash: bool) -> bool:
+    try:
+        dst_st = dst.stat()
+    except FileNotFoundError:
+        return False
+    if dst_st.st_size != st.st_size:
+        return False
+    if verify_hash:
+        return hash_file(src) == hash_file(dst)
+    if recorded is not None and recorded[:2] == [st.st_size, st.st_mtime_ns]:
+        return True
+    return dst_st.st_mtime_ns == st.st_mtime_ns
+
+
+def sync_static(src: Path, dst: Path, previous=None, keep=(), verify_hash=False,
+                link="copy", workers=8, stats=None, fingerprint=False) -> dict:
+    """
+    Mirror the files under src into dst, touching only what changed.
+
+    A file is copied when it is new or its size/mtime (or, with verify_hash,
+    its content hash) differs from the copy in dst. previous is the state
+    returned by the last sync; files recorded there that no longer exist in
+    src are deleted from dst, unless listed in keep (e.g. rendered pages).
+    link may be "copy", "hardlink" or "reflink"; links fall back to copies
+    where the filesystem can't provide them. Copies run on a thread pool.
+    If stats is a dict, copied_files, copied_bytes and removed_files are stored in it.
+
+    With fingerprint, every file is also placed under a name carrying its
+    content hash (see fingerprinted_name), hardlinked to the plain copy where
+    possible. Hashes are computed alongside the copies and reused from
+    previous while a file's size and mtime are unchanged; fingerprinted names
+    of old contents are removed.
+
+    Returns the new state: relative path -> [size, mtime_ns] of each source
+    file, plus its sha256 when fingerprinting.
+    """
+    if not src.exists():
+        raise FileNotFoundError(f"Source directory does not exist: {src}")
+    if link not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link}")
+    previous = previous or {}
+    dst.mkdir(parents=True, exist_ok=True)
+
+    state, changed = {}, []
+    for rel, st in _walk_files(src):
+        state[rel] = [st.st_size, st.st_mtime_ns]
+        recorded = previous.get(rel)
+        if not _unchanged(src / rel, dst / rel, st, recorded, verify_hash):
+            changed.append(rel)
+        if fingerprint and recorded is not None and len(recorded) == 3 and recorded[:2] == state[rel]:
+            state[rel].append(recorded[2])
+
+    def place(rel, copy):
+        if copy:
+            place_file(src / rel, dst / rel, link)
+        if fingerprint:
+            entry = state[rel]
+            if len(entry) == 2:
+                entry.append(hash_file(src / rel))
+            fingerprinted = dst / fingerprinted_name(rel, entry[2])
+            if copy or not fingerprinted.exists():
+                place_file(dst / rel, fingerprinted, "hardlink")
+
+    # Fingerprinting visits every file: unchanged ones may still need a hash or a fingerprinted copy
+    jobs = [(rel, True) for rel in changed]
+    if fingerprint:
+        copied = set(changed)
+        jobs += [(rel, False) for rel in state if rel not in copied]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # list() so any copy error is raised here
+        list(pool.map(lambda job: place(*job), jobs))
+    for rel in changed:
+        log.debug(f"copied {src / rel} -> {dst / rel}")
+
+    keep = set(keep)
+    removed = 0
+    for rel, recorded in previous.items():
+        if rel not in state and rel not in keep:
+            remove_output(dst / rel, dst)
+            log.debug(f"removed {dst / rel}")
+            removed += 1
+        if len(recorded) == 3 and state.get(rel, [])[2:] != recorded[2:]:
+            # The content changed or fingerprinting was turned off
+            remove_output(dst / fingerprinted_name(rel, recorded[2]), dst)
+
+    if stats is not None:
+        stats["copied_files"] = len(changed)
+        stats["copied_bytes"] = sum(state[rel][0] for rel in changed)
+        stats["removed_files"] = removed
+
+    return state
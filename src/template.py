@@ -0,0 +1,73 @@
+import os
+import re
+from pathlib import Path
+from src.urls import normalize_basepath, prefix_url
+
+# Matches placeholders such as "{{ Title }}" or "{{Content}}"
+SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# href/src attributes written in the template itself, e.g. the stylesheet link
+URL_ATTR_RE = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+class Template:
+    """
+    A page template compiled once into literal segments and named slots.
+
+    literals always has one more entry than slots: rendering emits
+    literals[0], slot 0, literals[1], slot 1, ..., literals[-1]. Each slot costs
+    the same regardless of how many there are or how large the page is.
+    Site-absolute href/src URLs in the template are prefixed with url_prefix
+    (a normalized basepath), and pointed at fingerprinted files when an
+    AssetMap is given, once, at compile time.
+    """
+
+    def __init__(self, source: str, url_prefix: str = "", assets=None):
+        if url_prefix or assets is not None:
+            source = URL_ATTR_RE.sub(
+                lambda m: f'{m.group(1)}="{prefix_url(m.group(2), url_prefix, assets)}"', source)
+        self.literals = []
+        self.slots = []  # (name, placeholder text) pairs
+        pos = 0
+        for match in SLOT_RE.finditer(source):
+            self.literals.append(source[pos:match.start()])
+            self.slots.append((match.group(1), match.group(0)))
+            pos = match.end()
+        self.literals.append(source[pos:])
+
+    def iter_chunks(self, context: dict):
+        """
+        Yield the rendered page as string chunks.
+
+        Context values may be strings or zero-argument callables returning an
+        iterable of chunks (e.g. an HTMLNode's iter_html), which are streamed.
+        Slots missing from context are left as written in the template.
+        """
+        literals = self.literals
+        for i, (name, placeholder) in enumerate(self.slots):
+            yield literals[i]
+            value = context.get(name, placeholder)
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value()
+        yield literals[-1]
+
+    def render(self, context: dict) -> str:
+        return "".join(self.iter_chunks(context))
+
+
+# (path, url prefix, AssetMap) -> (mtime_ns, size, Template); edited templates are recompiled
+_cache = {}
+
+
+def load_template(path: Path, basepath: str = "/", assets=None) -> Template:
+    """Return the compiled template at path, reading and parsing it only once."""
+    url_prefix = normalize_basepath(basepath)
+    key = (os.fspath(path), url_prefix, assets)
+    st = os.stat(key[0])
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    template = Template(Path(path).read_text(encoding="utf-8"), url_prefix, assets)
+    _cache[key] = (st.st_mtime_ns, st.st_size, template)
+    return template
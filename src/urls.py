@@ -0,0 +1,27 @@
+def normalize_basepath(basepath: str) -> str:
+    """
+    Turn a CLI basepath into the prefix prepended to site-absolute URLs:
+    "/" or "" -> "" (no rewriting), "site" or "/site/" -> "/site".
+    """
+    if not basepath or basepath == "/":
+        return ""
+    if not basepath.startswith("/"):
+        basepath = "/" + basepath
+    return basepath.rstrip("/")
+
+
+def prefix_url(url: str, url_prefix: str, assets=None) -> str:
+    """
+    Prefix a site-absolute URL ("/images/a.png") with a normalized basepath.
+    With an AssetMap, URLs of fingerprinted static files are first replaced
+    by their fingerprinted URL, keeping any query string or fragment.
+    """
+    # Leave relative, external and protocol-relative ("//host/...") URLs alone
+    if not url or not url.startswith("/") or url.startswith("//"):
+        return url
+    if assets is not None:
+        path = url.split("?", 1)[0].split("#", 1)[0]
+        fingerprinted = assets.get(path)
+        if fingerprinted is not None:
+            url = fingerprinted + url[len(path):]
+    return url_prefix + url
@@ -0,0 +1,65 @@
+import unittest
+
+from src import block_cache
+from src.block_cache import BlockCache
+from src.markdown_to_html import parse_page
+from src.profiling import PageProfile
+
+
+FOOTER = "Read the [license](/license/) and ![badge](/img/badge.png) before **copying**."
+PAGE = f"# Post {{}}\n\nBody of post {{}}.\n\n{FOOTER}\n\n- shared\n- list\n\n```\ncode\n```\n\n{FOOTER}"
+
+
+class TestBlockCache(unittest.TestCase):
+    def tearDown(self):
+        block_cache.configure(0)
+
+    def test_least_recently_used_entry_is_dropped(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_output_and_metadata_match_without_cache(self):
+        pages = [PAGE.format(i, i) for i in range(3)]
+        plain = [parse_page(page, "/site/", collect_terms=True) for page in pages]
+        block_cache.configure(64)
+        cached = [parse_page(page, "/site/", collect_terms=True) for page in pages]
+        self.assertEqual(cached, plain)
+        # A block is stored the second time it's seen: the first page's second
+        # footer, the second page's list and code. Every body paragraph misses
+        self.assertEqual(block_cache.counters(), (2 + 4, 5 + 3 + 1))
+
+    def test_blocks_are_stored_once_seen_twice(self):
+        cache = BlockCache(max_entries=1)
+        self.assertFalse(cache.admit("a"))
+        self.assertTrue(cache.admit("a"))
+        for key in "bcdefghi":
+            cache.admit(key)
+        # Past 8 keys per entry, those seen are forgotten
+        self.assertFalse(cache.admit("a"))
+
+    def test_basepath_is_part_of_the_key(self):
+        block_cache.configure(64)
+        _, html = parse_page(PAGE.format(1, 1), "/a/")
+        _, other = parse_page(PAGE.format(1, 1), "/b/")
+        self.assertIn('href="/b/license/"', other)
+        self.assertNotIn("/a/", other)
+
+    def test_profiled_parse_uses_the_cache(self):
+        block_cache.configure(64)
+        parse_page(PAGE.format(1, 1))
+        parse_page(PAGE.format(1, 1))
+        misses = block_cache.active.misses
+        profile = PageProfile("page.md")
+        _, html = parse_page(PAGE.format(1, 1), profile=profile)
+        self.assertEqual(html, parse_page(PAGE.format(1, 1))[1])
+        self.assertEqual(block_cache.active.misses, misses)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import gzip
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.compress import encodings, precompress, remove_variants
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "blog").mkdir()
+        (self.root / "index.html").write_text("<p>home</p>" * 50, encoding="utf-8")
+        (self.root / "blog" / "index.html").write_text("<p>blog</p>" * 50, encoding="utf-8")
+        (self.root / "index.css").write_text("body {}", encoding="utf-8")
+        (self.root / "logo.png").write_bytes(b"\x89PNG")
+        (self.root / ".ssg-shard.json").write_text("{}", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_writes_gzip_siblings_for_text_files(self):
+        stats = {}
+        precompress(self.root, workers=2, stats=stats)
+        self.assertEqual(stats["compressed_files"], 3)
+        page = self.root / "blog" / "index.html"
+        self.assertEqual(gzip.decompress((self.root / "blog" / "index.html.gz").read_bytes()), page.read_bytes())
+        self.assertTrue((self.root / "index.css.gz").exists())
+        self.assertFalse((self.root / "logo.png.gz").exists())
+        self.assertFalse((self.root / ".ssg-shard.json.gz").exists())
+
+    def test_up_to_date_variants_are_skipped(self):
+        precompress(self.root)
+        marker = (self.root / "index.css.gz").stat().st_ino
+        page = self.root / "index.html"
+        page.write_text("<p>changed</p>", encoding="utf-8")
+        os.utime(page, ns=(0, 10**9))  # an older mtime still counts as a change
+        stats = {}
+        precompress(self.root, stats=stats)
+        self.assertEqual(stats["compressed_files"], 1)
+        self.assertEqual((self.root / "index.css.gz").stat().st_ino, marker)
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), b"<p>changed</p>")
+
+    def test_variants_of_removed_files_are_deleted(self):
+        precompress(self.root)
+        (self.root / "blog" / "index.html").unlink()
+        (self.root / "archive.tar.gz").write_bytes(b"not ours")
+        stats = {}
+        precompress(self.root, stats=stats)
+        self.assertEqual(stats["removed_files"], 1)
+        self.assertFalse((self.root / "blog" / "index.html.gz").exists())
+        self.assertTrue((self.root / "archive.tar.gz").exists())
+
+    def test_missing_encoding_removes_only_outdated_variants(self):
+        gzip_only = {".gz": encodings()[".gz"]}
+        precompress(self.root, available=gzip_only)
+        (self.root / "index.html.br").write_bytes(b"old")
+        os.utime(self.root / "index.html.br", ns=(0, 10**9))
+        (self.root / "index.css.br").write_bytes(b"fresh")
+        os.utime(self.root / "index.css.br", ns=(0, (self.root / "index.css").stat().st_mtime_ns))
+        stats = {}
+        precompress(self.root, stats=stats, available=gzip_only)
+        self.assertEqual((stats["compressed_files"], stats["removed_files"]), (0, 1))
+        self.assertEqual(sorted(p.name for p in self.root.rglob("*.br")), ["index.css.br"])
+
+    def test_remove_variants_deletes_fresh_ones_too(self):
+        precompress(self.root)
+        (self.root / "archive.tar.gz").write_bytes(b"not ours")
+        stats = {}
+        remove_variants(self.root, stats=stats)
+        self.assertEqual(stats["removed_files"], 3 * len(encodings()))
+        self.assertEqual(sorted(p.name for p in self.root.rglob("*.gz")), ["archive.tar.gz"])
+
+    def test_only_given_paths_are_updated(self):
+        precompress(self.root)
+        (self.root / "blog" / "index.html").unlink()
+        (self.root / "index.css").write_text("body { margin: 0 }", encoding="utf-8")
+        (self.root / "index.html").write_text("<p>changed</p>", encoding="utf-8")
+        stats = {}
+        precompress(self.root, stats=stats, paths={"index.html", "blog/index.html"})
+        self.assertEqual((stats["compressed_files"], stats["removed_files"]), (1, 1))
+        self.assertFalse((self.root / "blog" / "index.html.gz").exists())
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), b"<p>changed</p>")
+        self.assertEqual(gzip.decompress((self.root / "index.css.gz").read_bytes()), b"body {}")
+
+    def test_output_is_reproducible(self):
+        precompress(self.root)
+        first = (self.root / "index.html.gz").read_bytes()
+        (self.root / "index.html.gz").unlink()
+        precompress(self.root)
+        self.assertEqual((self.root / "index.html.gz").read_bytes(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src import content_cache
+from src.assets import AssetMap
+from src.content_cache import ContentCache
+from src.main import BuildOptions, build_pages
+from src.markdown_to_html import parse_page
+
+
+SOURCE = b"# Title\n\nSee [home](/) and ![logo](/logo.png) or [out](https://x.org/)."
+
+
+class TestContentCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cache = ContentCache(self.root / "cache")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_hit_skips_parsing(self):
+        first = self.cache.render(SOURCE, "/base/")
+        with mock.patch("src.content_cache.parse_page") as parse:
+            self.assertEqual(self.cache.render(SOURCE, "/base/"), first)
+        parse.assert_not_called()
+        self.assertEqual(first, parse_page(SOURCE.decode(), "/base/"))
+
+    def test_entry_is_reused_across_basepaths(self):
+        self.cache.render(SOURCE, "/")
+        with mock.patch("src.content_cache.parse_page") as parse:
+            for basepath in ("/", "/base/", "site"):
+                self.assertEqual(self.cache.render(SOURCE, basepath),
+                                 parse_page(SOURCE.decode(), basepath))
+        parse.assert_not_called()
+
+    def test_entry_is_reused_across_asset_maps(self):
+        self.cache.render(SOURCE)
+        assets = AssetMap({"/logo.png": "/logo.0123456789.png"})
+        with mock.patch("src.content_cache.parse_page") as parse:
+            self.assertEqual(self.cache.render(SOURCE, "/base/", assets=assets),
+                             parse_page(SOURCE.decode(), "/base/", assets=assets))
+        parse.assert_not_called()
+
+    def test_memory_entries(self):
+        cache = ContentCache(self.root / "cache", memory_entries=1)
+        first = cache.render(SOURCE)
+        for path in (self.root / "cache").glob("*/*"):
+            path.unlink()
+        self.assertEqual(cache.render(SOURCE), first)
+        cache.render(b"# Other")
+        self.assertIsNone(cache.get(ContentCache.key(SOURCE)))  # pushed out of memory, gone from disk
+        self.assertEqual(len(pickle.loads(pickle.dumps(cache))._memory), 0)
+
+    def test_parser_version_is_part_of_the_key(self):
+        key = ContentCache.key(SOURCE)
+        with mock.patch.object(content_cache, "PARSER_VERSION", "other"):
+            self.assertNotEqual(ContentCache.key(SOURCE), key)
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = ContentCache.key(SOURCE)
+        self.cache.render(SOURCE)
+        self.cache._path(key).write_text("{not json", encoding="utf-8")
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.render(SOURCE), parse_page(SOURCE.decode()))
+        self.assertIsNotNone(self.cache.get(key))
+
+    def test_evict_removes_least_recently_used(self):
+        sources = [b"# Page %d\n\nbody" % i for i in range(4)]
+        for i, source in enumerate(sources):
+            self.cache.render(source)
+            os.utime(self.cache._path(ContentCache.key(source)), ns=(i * 10**9, i * 10**9))
+        self.cache.get(ContentCache.key(sources[0]))  # now the most recent
+        size = self.cache._path(ContentCache.key(sources[1])).stat().st_size
+        self.cache.max_bytes = 2 * size + size // 2
+        self.assertEqual(self.cache.evict(), 2)
+        left = [s for s in sources if self.cache.get(ContentCache.key(s)) is not None]
+        self.assertEqual(left, [sources[0], sources[3]])
+
+    def test_parallel_build_matches_uncached(self):
+        content, template = self.root / "content", self.root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}", encoding="utf-8")
+        for i in range(6):
+            page = content / f"p{i}" / "index.md"
+            page.parent.mkdir(parents=True)
+            page.write_text(f"# Page {i}\n\n[up](/p{i}/) **{i}**", encoding="utf-8")
+
+        def build(out, cache):
+            build_pages(content, template, self.root / out, "/base/",
+                        manifest_path=self.root / f"{out}.json", cache=cache, options=BuildOptions(jobs=3))
+            return {p.relative_to(self.root / out): p.read_bytes() for p in (self.root / out).rglob("*.html")}
+
+        plain = build("plain", None)
+        self.assertEqual(build("cold", self.cache), plain)
+        self.assertEqual(build("warm", self.cache), plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
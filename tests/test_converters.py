@@ -8,5 +8,25 @@ def test_text(self):
     html_node = text_node_to_html_node(node)
     self.assertEqual(html_node.tag, None)
     self.assertEqual(html_node.value, "This is a text node")
+
+class TestTextNodeToHTMLNode(unittest.TestCase):
+    def test_bold(self):
+        html_node = text_node_to_html_node(TextNode("Bold", TextType.BOLD, None))
+        self.assertEqual(html_node.to_html(), "<b>Bold</b>")
+
+    def test_link(self):
+        html_node = text_node_to_html_node(TextNode("Home", TextType.LINK, "/"))
+        self.assertEqual(html_node.to_html(), '<a href="/">Home</a>')
+
+    def test_image(self):
+        html_node = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/a.png"))
+        self.assertEqual(html_node.tag, "img")
+        self.assertEqual(dict(html_node.props), {"src": "/a.png", "alt": "alt"})
+
+    def test_unsupported_type_raises(self):
+        with self.assertRaises(ValueError):
+            text_node_to_html_node(TextNode("x", "bogus", None))
+
+
 if __name__ == "__main__":
     unittest.main()
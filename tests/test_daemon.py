@@ -0,0 +1,133 @@
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.daemon import BuildDaemon, BuildQueue, SourceSnapshot
+from src.daemon_client import request
+from src.manifest import BuildManifest
+
+
+class TestBuildQueue(unittest.TestCase):
+    def test_requests_during_a_build_are_coalesced(self):
+        started, release = threading.Event(), threading.Event()
+        batches = []
+
+        def build(paths):
+            batches.append(paths)
+            started.set()
+            release.wait()
+            return sorted(paths)
+
+        queue = BuildQueue(build)
+        results = {}
+        first = threading.Thread(target=lambda: results.setdefault("a", queue.submit({"a"})))
+        first.start()
+        started.wait()
+        waiting = [threading.Thread(target=lambda p=p: results.setdefault(p, queue.submit({p}))) for p in "bc"]
+        for thread in waiting:
+            thread.start()
+        while queue._waiting < 2:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in [first, *waiting]:
+            thread.join()
+        queue.stop()
+
+        self.assertEqual(batches, [{"a"}, {"b", "c"}])
+        self.assertEqual(results["a"]["rendered"], ["a"])
+        self.assertEqual(results["b"]["rendered"], ["b", "c"])
+        self.assertEqual(results["c"]["requests"], 2)
+
+    def test_failed_build_is_reported(self):
+        def build(paths):
+            raise ValueError("boom")
+
+        queue = BuildQueue(build)
+        with self.assertLogs("ssg", level="ERROR") as logs:
+            result = queue.submit(None)
+            queue.stop()
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["error"], "ValueError: boom")
+        self.assertEqual(logs.output, ["ERROR:ssg:Build 1 failed: ValueError: boom"])
+
+
+class TestSourceSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.page = self.root / "index.md"
+        self.page.write_text("# Home", encoding="utf-8")
+        self.walks = 0
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def list_pages(self):
+        self.walks += 1
+        return [(p, p.with_suffix(".html")) for p in sorted(self.root.glob("*.md"))]
+
+    def test_hashes_and_walk_are_reused(self):
+        snapshot = SourceSnapshot(self.list_pages)
+        snapshot.pages()
+        digest = snapshot.hash(self.page)
+        with mock.patch("src.daemon.hash_file") as hash_file:
+            self.assertEqual(snapshot.hash(self.page), digest)
+        hash_file.assert_not_called()
+        snapshot.pages()
+        self.assertEqual(self.walks, 1)
+
+    def test_forget_rewalks_only_for_added_or_removed_pages(self):
+        snapshot = SourceSnapshot(self.list_pages)
+        snapshot.pages()
+        snapshot.forget({self.page})
+        snapshot.pages()
+        self.assertEqual(self.walks, 1)
+        new = self.root / "new.md"
+        new.write_text("# New", encoding="utf-8")
+        snapshot.forget({new})
+        self.assertEqual([p for p, _ in snapshot.pages()], [self.page, new])
+        self.assertEqual(self.walks, 2)
+
+    def test_saved_manifest_is_reused_until_the_file_changes(self):
+        snapshot = SourceSnapshot(self.list_pages)
+        path = self.root / "manifest.json"
+        manifest = BuildManifest("t", "/")
+        manifest.save(path)
+        snapshot.saved_manifest(path, manifest)
+        self.assertIs(snapshot.load_manifest(path), manifest)
+        BuildManifest("other", "/").save(path)
+        self.assertEqual(snapshot.load_manifest(path).template_hash, "other")
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestBuildDaemon(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            requested = []
+
+            def build(paths):
+                requested.append(paths)
+                return sorted(p.relative_to(root).as_posix() for p in paths)
+
+            daemon = BuildDaemon(root / "d.sock", build, root)
+            server = threading.Thread(target=daemon.serve_forever)
+            server.start()
+            try:
+                reply = request({"paths": ["content/a.md", str(root / "static" / "x.css")]},
+                                str(daemon.socket_path), timeout=5)
+                self.assertEqual(reply["rendered"], ["content/a.md", "static/x.css"])
+                self.assertFalse(request({"paths": 3}, str(daemon.socket_path), timeout=5)["ok"])
+                with self.assertRaisesRegex(RuntimeError, "already listening"):
+                    BuildDaemon(daemon.socket_path, build, root)
+                self.assertTrue(request({"command": "stop"}, str(daemon.socket_path), timeout=5)["ok"])
+            finally:
+                server.join(5)
+            self.assertFalse(daemon.socket_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
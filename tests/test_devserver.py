@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from src.devserver import LIVE_RELOAD_SCRIPT, DevServer, PageCache
+
+
+class TestPageCache(unittest.TestCase):
+    def test_html_gets_live_reload_script(self):
+        cache = PageCache(Path("."))
+        data = cache.put("index.html", b"<html><body>hi</body></html>")
+        self.assertEqual(data, b"<html><body>hi" + LIVE_RELOAD_SCRIPT + b"</body></html>")
+        self.assertEqual(cache.put("index.css", b"body {}"), b"body {}")
+
+    def test_misses_load_from_disk_until_invalidated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "a.css").write_text("one", encoding="utf-8")
+            cache = PageCache(Path(tmp))
+            self.assertEqual(cache.get("a.css"), b"one")
+            (Path(tmp) / "a.css").write_text("two", encoding="utf-8")
+            self.assertEqual(cache.get("a.css"), b"one")
+            cache.invalidate("a.css")
+            self.assertEqual(cache.get("a.css"), b"two")
+
+    def test_directory_invalidation(self):
+        cache = PageCache(Path("."))
+        for rel in ["search/index.json", "search/terms/ab.json", "searching.html"]:
+            cache.put(rel, b"x")
+        cache.invalidate("search/")
+        self.assertEqual(list(cache._files), ["searching.html"])
+
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        (root / "blog").mkdir()
+        (root / "index.html").write_text("<body>home</body>", encoding="utf-8")
+        (root / "blog" / "index.html").write_text("<body>blog</body>", encoding="utf-8")
+        self.server = DevServer(root, port=0, basepath="/site/")
+        self.server.serve_in_background()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self._tmp.cleanup()
+
+    def fetch(self, path):
+        with urllib.request.urlopen(f"http://localhost:{self.server.port}{path}") as resp:
+            return resp.read()
+
+    def test_resolve(self):
+        self.assertEqual(self.server.resolve("/"), "index.html")
+        self.assertEqual(self.server.resolve("/site/blog"), "blog/index.html")
+        self.assertEqual(self.server.resolve("/blog/?x=1"), "blog/index.html")
+        self.assertIsNone(self.server.resolve("/../secret"))
+
+    def test_serves_cached_pages(self):
+        self.assertTrue(self.fetch("/site/blog").startswith(b"<body>blog<script>"))
+        self.server.cache.put("blog/index.html", b"<body>rebuilt</body>")
+        self.assertTrue(self.fetch("/blog/").startswith(b"<body>rebuilt"))
+
+    def test_missing_page_is_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self.fetch("/nope")
+        self.assertEqual(ctx.exception.code, 404)
+
+    def test_wait_for_reload(self):
+        seen = self.server.wait_for_reload(-1, 0)
+        self.server.notify_reload()
+        self.assertEqual(self.server.wait_for_reload(seen, 1), seen + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
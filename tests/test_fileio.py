@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.fileio import prefetch, scan_tree
+
+
+class TestScanTree(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for name in ["b/2.md", "b/1.md", "a/c/x.md", "top.md"]:
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_every_directory_is_listed_sorted(self):
+        listing = scan_tree(self.root, workers=3)
+        self.assertEqual(set(listing), {self.root, self.root / "a", self.root / "a" / "c", self.root / "b"})
+        self.assertEqual(listing[self.root], [
+            (self.root / "a", True, False),
+            (self.root / "b", True, False),
+            (self.root / "top.md", False, True),
+        ])
+        self.assertEqual([path.name for path, _, _ in listing[self.root / "b"]], ["1.md", "2.md"])
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_results_keep_their_order(self):
+        self.assertEqual(list(prefetch(lambda n: n * n, range(50), workers=4)), [n * n for n in range(50)])
+
+    def test_items_are_taken_a_bounded_distance_ahead(self):
+        pulled = []
+
+        def items():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        for consumed, _ in enumerate(prefetch(str, items(), workers=3), 1):
+            self.assertLessEqual(len(pulled) - consumed, 2 * 3 + 1)
+        self.assertEqual(consumed, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
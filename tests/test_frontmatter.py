@@ -0,0 +1,52 @@
+import io
+import unittest
+
+from src.frontmatter import read_front_matter, split_front_matter
+
+
+PAGE = """---
+title: "Hello: world"
+date: 2024-05-01
+# a comment
+tags: [one, 'two words']
+---
+# Heading
+
+Body
+"""
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_parses_values(self):
+        front_matter, body = split_front_matter(PAGE)
+        self.assertEqual(front_matter, {
+            "title": "Hello: world",
+            "date": "2024-05-01",
+            "tags": ["one", "two words"],
+        })
+        self.assertEqual(body, "# Heading\n\nBody\n")
+
+    def test_without_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\nBody"), ({}, "# Title\n\nBody"))
+
+    def test_unclosed_fence_is_markdown(self):
+        md = "---\n\n# Title"
+        self.assertEqual(split_front_matter(md), ({}, md))
+
+    def test_malformed_line_raises(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\njust words\n---\n# T")
+
+    def test_read_from_file_matches(self):
+        f = io.StringIO(PAGE)
+        self.assertEqual(read_front_matter(f), split_front_matter(PAGE)[0])
+        self.assertEqual(f.read(), split_front_matter(PAGE)[1])
+
+    def test_read_without_front_matter_rewinds(self):
+        f = io.StringIO("# Title\n")
+        self.assertEqual(read_front_matter(f), {})
+        self.assertEqual(f.read(), "# Title\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
@@ -62,6 +64,39 @@ class TestHTMLNode(unittest.TestCase):
         parent = ParentNode("div", [])
         self.assertEqual(parent.to_html(), "<div></div>")
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hi "), LeafNode("a", "there", {"href": "/x"})]),
+            LeafNode("img", "", {"src": "/i.png"}),
+        ])
+        self.assertEqual(
+            "".join(node.iter_html()),
+            '<div><p>Hi <a href="/x">there</a></p><img src="/i.png"></img></div>',
+        )
+
+    def test_write_html_to_stream(self):
+        out = io.StringIO()
+        ParentNode("ul", [LeafNode("li", "a"), LeafNode("li", "b")]).write_html(out)
+        self.assertEqual(out.getvalue(), "<ul><li>a</li><li>b</li></ul>")
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode("b", "x")
+        for _ in range(sys.getrecursionlimit() * 2):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertIn("<b>x</b>", html)
+
+    def test_leaf_nodes_share_empty_containers(self):
+        a, b = LeafNode("p", "a"), LeafNode("p", "b")
+        self.assertIs(a.children, b.children)
+        self.assertIs(a.props, b.props)
+        self.assertFalse(hasattr(a, "__dict__"))
+
+    def test_nested_parent_without_tag_raises(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode(None, [])]).to_html()
+
 
 
 if __name__ == "__main__":
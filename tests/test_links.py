@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.links import find_broken_links, link_target, output_paths
+from src.main import BuildError, BuildOptions, build_pages
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+class TestLinkTarget(unittest.TestCase):
+    def test_site_absolute_and_relative(self):
+        self.assertEqual(link_target("/blog/tom/", "index.html"), "blog/tom")
+        self.assertEqual(link_target("../tom/a%20b.png", "blog/glorfindel/index.html"), "blog/tom/a b.png")
+        self.assertEqual(link_target("/", "blog/index.html"), "")
+        self.assertEqual(link_target("/index.css?v=2#x", "index.html"), "index.css")
+
+    def test_external_urls_and_anchors_are_skipped(self):
+        for url in ["https://example.com/a", "mailto:a@b.c", "//cdn.example.com/x.js", "#top", "?q=1"]:
+            self.assertIsNone(link_target(url, "index.html"), url)
+
+
+class TestFindBrokenLinks(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.content = Path(self._tmp.name)
+        self.paths = {"index.html", "about.html", "blog/tom/index.html", "images/a.png"}
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_pages_files_and_directories_resolve(self):
+        urls = ["/", "/about", "/about.html", "/blog/tom/", "/blog/tom", "images/a.png", "https://x.y"]
+        self.assertEqual(find_broken_links({"index.md": ("index.html", urls)}, self.paths, self.content), [])
+
+    def test_every_occurrence_is_reported_with_its_line(self):
+        (self.content / "index.md").write_text(
+            "# Home\n\n[gone](/blog/missing) and ![pic](/images/b.png)\n\n- [again](/blog/missing)\n",
+            encoding="utf-8")
+        urls = ["/blog/missing", "/images/a.png", "/images/b.png"]
+        self.assertEqual(find_broken_links({"index.md": ("index.html", urls)}, self.paths, self.content), [
+            ("index.md", 3, "/blog/missing"),
+            ("index.md", 3, "/images/b.png"),
+            ("index.md", 5, "/blog/missing"),
+        ])
+
+    def test_output_paths(self):
+        (self.content / "blog").mkdir()
+        (self.content / "blog" / "index.html").write_text("", encoding="utf-8")
+        self.assertEqual(output_paths(self.content), {"blog/index.html"})
+
+
+class TestBuildCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.content = root / "content"
+        self.out = root / "docs"
+        self.template = root / "template.html"
+        self.manifest = root / "manifest.json"
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+        self.content.mkdir()
+        (self.content / "index.md").write_text("# Home\n\n[post](/post)", encoding="utf-8")
+        (self.content / "post.md").write_text("# Post\n\n[home](/)", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build(self):
+        return build_pages(self.content, self.template, self.out, manifest_path=self.manifest,
+                           incremental=True, options=BuildOptions(check_links=True))
+
+    def test_links_of_unchanged_pages_are_checked_from_the_manifest(self):
+        self.build()
+        (self.content / "post.md").unlink()
+        with self.assertLogs("ssg", level="ERROR") as logs, self.assertRaises(BuildError) as ctx:
+            self.build()
+        self.assertEqual(ctx.exception.broken_links, [("index.md", 3, "/post")])
+        self.assertEqual(logs.output, [f"ERROR:ssg:error: {self.content / 'index.md'}:3: broken link to /post"])
+        self.assertEqual(ctx.exception.failures, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src import listings
+from src.listings import page_url, plan_listings, tag_slug
+from src.main import BuildOptions, build_pages
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+def entry(output, date=None, tags=(), title="T"):
+    return {"output": output, "title": title, "date": date, "tags": list(tags),
+            "description": None, "word_count": 1}
+
+
+class TestPlanListings(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(page_url("about.html"), "/about.html")
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Lord of the Rings!"), "lord-of-the-rings")
+
+    def test_sections_tags_and_feeds(self):
+        index = {
+            "index.md": entry("index.html", title="Home"),
+            "blog/a/index.md": entry("blog/a/index.html", "2024-01-01", ["X"]),
+            "blog/b/index.md": entry("blog/b/index.html", "2024-02-01T09:00:00+01:00", ["x"]),
+            "about.md": entry("about.html", tags=["y"]),
+        }
+        planned = plan_listings(index, taken={"index.html"}, site_url="https://example.com")
+        self.assertEqual(sorted(planned), ["atom.xml", "blog/index.html", "feed.xml", "sitemap.xml",
+                                           "tags/x/index.html", "tags/y/index.html"])
+        kind, title, entries = planned["blog/index.html"]
+        self.assertEqual((kind, title), ("section", "Blog"))
+        self.assertEqual([e["url"] for e in entries], ["/blog/b/", "/blog/a/"])
+        self.assertEqual(planned["feed.xml"][1], "Home")
+        self.assertIn("/tags/x/", [e["url"] for e in planned["sitemap.xml"][2]])
+
+    def test_no_feeds_without_site_url(self):
+        planned = plan_listings({"a.md": entry("a.html", "2024-01-01")})
+        self.assertEqual(sorted(planned), ["index.html"])
+
+    def test_pages_win_over_listings(self):
+        index = {"blog/index.md": entry("blog/index.html"),
+                 "blog/a/index.md": entry("blog/a/index.html", "2024-01-01")}
+        self.assertEqual(plan_listings(index, taken={"blog/index.html", "blog/a/index.html"}), {})
+
+
+class TestBuildListings(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.content = self.root / "content"
+        self.out = self.root / "docs"
+        self.template = self.root / "template.html"
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+        self.write("index.md", "# Home")
+        self.write("blog/a/index.md", "---\ndate: 2024-01-01\ntags: [alpha]\n---\n# A")
+        self.write("blog/b/index.md", "---\ndate: 2024-02-01\ntags: [beta]\n---\n# B")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, rel, text):
+        path = self.content / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def build(self):
+        return build_pages(self.content, self.template, self.out, "/base/",
+                           manifest_path=self.root / "manifest.json", incremental=True,
+                           options=BuildOptions(site_url="https://example.com"))
+
+    def test_listing_pages_are_rendered(self):
+        self.build()
+        blog = (self.out / "blog" / "index.html").read_text()
+        self.assertLess(blog.index('href="/base/blog/b/"'), blog.index('href="/base/blog/a/"'))
+        self.assertIn("<link>https://example.com/base/blog/b/</link>", (self.out / "feed.xml").read_text())
+        manifest = json.loads((self.root / "manifest.json").read_text())
+        self.assertEqual(manifest["pages"]["blog/a/index.md"]["meta"]["tags"], ["alpha"])
+
+    def test_incremental_build_touches_only_affected_listings(self):
+        self.build()
+        self.write("blog/b/index.md", "---\ndate: 2024-02-01\ntags: [beta]\n---\n# B again")
+        with mock.patch("src.listings.render_listing", wraps=listings.render_listing) as render:
+            self.assertEqual(self.build(), ["blog/b/index.md"])
+        kinds = sorted(call.args[0] for call in render.call_args_list)
+        self.assertEqual(kinds, ["atom", "rss", "section", "sitemap", "tag"])
+        self.assertIn("B again", (self.out / "tags" / "beta" / "index.html").read_text())
+
+    def test_stale_listings_are_removed(self):
+        self.build()
+        self.write("blog/a/index.md", "---\ndate: 2024-01-01\n---\n# A")
+        self.build()
+        self.assertFalse((self.out / "tags" / "alpha").exists())
+        self.assertTrue((self.out / "tags" / "beta" / "index.html").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.assets import AssetMap
+from src.manifest import BuildManifest
+from src.main import (BuildError, BuildOptions, CONTENT_DIR, SRC_STATIC, _apply_changes, _built_from,
+                      _outputs_written, _update_variants, build_pages, generate_page, iter_pages, render_pages)
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+class TestBuildPages(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.content = root / "content"
+        self.out = root / "docs"
+        self.template = root / "template.html"
+        self.manifest = root / "manifest.json"
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+        for i in range(6):
+            page = self.content / f"page{i}" / "index.md"
+            page.parent.mkdir(parents=True)
+            page.write_text(f"# Page {i}\n\nBody **{i}**", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build(self, jobs):
+        return build_pages(self.content, self.template, self.out,
+                           manifest_path=self.manifest, options=BuildOptions(jobs=jobs))
+
+    def test_iter_pages_is_sorted(self):
+        pages = [src.parent.name for src, _ in iter_pages(self.content, self.out)]
+        self.assertEqual(pages, [f"page{i}" for i in range(6)])
+
+    def test_parallel_matches_serial(self):
+        serial = self.build(jobs=1)
+        serial_html = {p: p.read_bytes() for p in self.out.rglob("*.html")}
+        parallel = self.build(jobs=3)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(serial_html, {p: p.read_bytes() for p in self.out.rglob("*.html")})
+
+    def test_threaded_io_matches_serial(self):
+        (self.content / "page3" / "deep").mkdir()
+        (self.content / "page3" / "deep" / "extra.md").write_text("# Extra\n\n[up](/page3)", encoding="utf-8")
+        self.assertEqual(list(iter_pages(self.content, self.out, workers=4)), list(iter_pages(self.content, self.out)))
+        serial = build_pages(self.content, self.template, self.out, manifest_path=self.manifest,
+                             options=BuildOptions(io_threads=1))
+        serial_html = {p: p.read_bytes() for p in self.out.rglob("*.html")}
+        serial_hashes = self.output_hashes()
+        threaded = build_pages(self.content, self.template, self.out, manifest_path=self.manifest,
+                               options=BuildOptions(io_threads=4))
+        self.assertEqual(serial, threaded)
+        self.assertEqual(serial_html, {p: p.read_bytes() for p in self.out.rglob("*.html")})
+        self.assertEqual(serial_hashes, self.output_hashes())
+
+    def output_hashes(self):
+        pages = json.loads(self.manifest.read_text(encoding="utf-8"))["pages"]
+        return {source: (entry["source_hash"], entry["output_hash"]) for source, entry in pages.items()}
+
+    def test_outputs_written_by_an_incremental_build(self):
+        build_pages(self.content, self.template, self.out, manifest_path=self.manifest)
+        before = BuildManifest.load(self.manifest)
+        (self.content / "page1" / "index.md").write_text("# Page 1\n\nBody **one**", encoding="utf-8")
+        (self.content / "page4" / "index.md").unlink()
+        build_pages(self.content, self.template, self.out, manifest_path=self.manifest, incremental=True)
+        written = _outputs_written(before, BuildManifest.load(self.manifest))
+        self.assertEqual(written, {"page1/index.html", "page4/index.html"})
+
+    def test_full_build_over_old_output_removes_deleted_pages(self):
+        self.build(jobs=1)
+        (self.content / "page4" / "index.md").unlink()
+        self.assertEqual(len(self.build(jobs=1)), 5)
+        self.assertFalse((self.out / "page4").exists())
+
+    def test_new_asset_map_rerenders_every_page(self):
+        (self.content / "page0" / "index.md").write_text("# Page 0\n\n![logo](/logo.png)", encoding="utf-8")
+        first = AssetMap({"/logo.png": "/logo.0123456789.png"})
+        build_pages(self.content, self.template, self.out, manifest_path=self.manifest, assets=first)
+        self.assertEqual(build_pages(self.content, self.template, self.out, manifest_path=self.manifest,
+                                     incremental=True, assets=first), [])
+        second = AssetMap({"/logo.png": "/logo.9876543210.png"})
+        rendered = build_pages(self.content, self.template, self.out, manifest_path=self.manifest,
+                               incremental=True, assets=second)
+        self.assertEqual(len(rendered), 6)
+        self.assertIn('src="/logo.9876543210.png"', (self.out / "page0" / "index.html").read_text(encoding="utf-8"))
+
+    def test_failed_pages_are_reported(self):
+        (self.content / "page2" / "index.md").write_text("No title here", encoding="utf-8")
+        with self.assertLogs("ssg", level="ERROR") as logs, self.assertRaises(BuildError) as ctx:
+            self.build(jobs=2)
+        self.assertEqual([source for source, _ in ctx.exception.failures], ["page2/index.md"])
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn(f"error: {self.content / 'page2' / 'index.md'}: ValueError: ", logs.output[0])
+        self.assertTrue((self.out / "page5" / "index.html").exists())
+
+    def test_render_pages_takes_jobs_as_results_are_consumed(self):
+        pulled = []
+
+        def jobs():
+            for i in range(40):
+                src = self.content / f"page{i % 6}" / "index.md"
+                pulled.append(i)
+                yield src, self.template, self.out / f"{i}.html", "/", None, None, None, False, None
+
+        results = render_pages(jobs(), workers=2, max_in_flight=4)
+        for consumed, (output_hash, error, _, _) in enumerate(results, 1):
+            self.assertIsNone(error)
+            # The window of four pages, plus a chunk being filled
+            self.assertLessEqual(len(pulled) - consumed, 8)
+        self.assertEqual(consumed, 40)
+
+    def test_streamed_page_matches_in_memory(self):
+        src = self.content / "page0" / "index.md"
+        in_memory, streamed = self.out / "a.html", self.out / "b.html"
+        for markdown in ["Intro [home](/) text.\n\n# Page 0\n\n- a\n- b\n\n```\nx\n```\n",
+                         "```\n# install deps\n```\n\n# Real Title",
+                         "- list\n# Only in a list"]:
+            src.write_text(markdown, encoding="utf-8")
+            expected = generate_page(src, self.template, in_memory, "/base/")
+            with mock.patch("src.main.STREAM_THRESHOLD", 0):
+                self.assertEqual(generate_page(src, self.template, streamed, "/base/"), expected)
+            self.assertEqual(in_memory.read_bytes(), streamed.read_bytes())
+        self.assertIn(b"<title>Only in a list</title>", streamed.read_bytes())
+
+    def test_crlf_source_matches_lf(self):
+        src = self.content / "page0" / "index.md"
+        src.write_bytes(b"# Page 0\r\n\r\n- a\r\n- b\r\n")
+        crlf = generate_page(src, self.template, self.out / "a.html")
+        src.write_bytes(b"# Page 0\n\n- a\n- b\n")
+        self.assertEqual(generate_page(src, self.template, self.out / "b.html"), crlf)
+
+
+class TestApplyChanges(unittest.TestCase):
+    def test_io_error_keeps_watching(self):
+        server = mock.Mock()
+        with mock.patch("src.main.rebuild_changed", side_effect=FileNotFoundError("gone.md")), \
+                self.assertLogs("ssg", level="ERROR") as logs:
+            _apply_changes({Path("gone.md")}, set(), server, mock.Mock())
+        self.assertIn("gone.md", logs.output[0])
+        server.cache.invalidate.assert_called_once_with()
+        server.notify_reload.assert_called_once_with()
+
+
+class TestBuiltFrom(unittest.TestCase):
+    def test_deleted_directories_expand_to_what_was_built_from_them(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = Path(tmp)
+            for rel in ("img/a.png", "img/deep/b.png", "img/index.html", "imgs/c.png"):
+                (dest / rel).parent.mkdir(parents=True, exist_ok=True)
+                (dest / rel).write_bytes(b"")
+            manifest = BuildManifest()
+            manifest.record("img/index.md", "s", "img/index.html", "o")
+            manifest.record("imgs.md", "s", "imgs.html", "o")
+            self.assertEqual(_built_from(CONTENT_DIR / "img", manifest, dest), {CONTENT_DIR / "img" / "index.md"})
+            self.assertEqual(_built_from(SRC_STATIC / "img", manifest, dest),
+                             {SRC_STATIC / "img" / "a.png", SRC_STATIC / "img" / "deep" / "b.png"})
+
+
+class TestUpdateVariants(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "index.css").write_text("body {}", encoding="utf-8")
+        (self.root / "index.css.gz").write_bytes(b"fresh")
+        self.args = mock.Mock(precompress=False, jobs=1)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_nothing_is_walked_without_variants_recorded(self):
+        with mock.patch("src.main.remove_variants") as remove:
+            _update_variants(self.root, self.args, [])
+        remove.assert_not_called()
+
+    def test_turning_precompress_off_removes_every_variant(self):
+        _update_variants(self.root, self.args, [".gz"])
+        self.assertEqual([p.name for p in self.root.iterdir()], ["index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
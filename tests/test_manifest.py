@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.manifest import BuildManifest, hash_bytes, hash_file
+from src.main import build_pages
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+class TestBuildManifest(unittest.TestCase):
+    def test_load_missing_returns_empty(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = BuildManifest.load(Path(tmp) / "missing.json")
+            self.assertEqual(manifest.pages, {})
+            self.assertFalse(BuildManifest("t", "/").is_compatible(manifest))
+
+    def test_save_and_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "manifest.json"
+            manifest = BuildManifest("abc", "/site/", variants=[".gz"])
+            manifest.record("index.md", "s1", "index.html", "o1")
+            manifest.save(path)
+
+            loaded = BuildManifest.load(path)
+            self.assertTrue(manifest.is_compatible(loaded))
+            self.assertEqual(loaded.pages["index.md"]["output"], "index.html")
+            self.assertEqual(loaded.variants, [".gz"])
+
+    def test_basepath_change_is_incompatible(self):
+        self.assertFalse(BuildManifest("abc", "/").is_compatible(BuildManifest("abc", "/site/")))
+
+    def test_hash_file_matches_hash_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "f.txt"
+            path.write_bytes(b"hello")
+            self.assertEqual(hash_file(path), hash_bytes(b"hello"))
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.content = root / "content"
+        self.out = root / "docs"
+        self.template = root / "template.html"
+        self.manifest = root / "manifest.json"
+        (self.content / "blog" / "post").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nHello", encoding="utf-8")
+        (self.content / "blog" / "post" / "index.md").write_text("# Post\n\nBody", encoding="utf-8")
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build(self, basepath="/"):
+        return build_pages(self.content, self.template, self.out, basepath,
+                           manifest_path=self.manifest, incremental=True)
+
+    def test_unchanged_pages_are_skipped(self):
+        self.assertEqual(self.build(), ["blog/post/index.md", "index.md"])
+        self.assertEqual(self.build(), [])
+
+    def test_edited_page_is_rerendered(self):
+        self.build()
+        (self.content / "index.md").write_text("# Home\n\nChanged", encoding="utf-8")
+        self.assertEqual(self.build(), ["index.md"])
+        self.assertIn("Changed", (self.out / "index.html").read_text(encoding="utf-8"))
+
+    def test_externally_modified_output_is_rerendered(self):
+        self.build()
+        (self.out / "index.html").write_text("overwritten elsewhere", encoding="utf-8")
+        self.assertEqual(self.build(), ["index.md"])
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        (self.content / "blog" / "post" / "index.md").unlink()
+        self.build()
+        self.assertFalse((self.out / "blog" / "post" / "index.html").exists())
+        self.assertFalse((self.out / "blog").exists())
+        self.assertTrue((self.out / "index.html").exists())
+
+    def test_template_change_invalidates_everything(self):
+        self.build()
+        self.template.write_text("<h1>{{ Title }}</h1>{{ Content }}", encoding="utf-8")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_basepath_change_invalidates_everything(self):
+        self.build()
+        self.assertEqual(len(self.build("/site/")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
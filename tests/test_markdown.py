@@ -1,6 +1,6 @@
 import unittest
 from src.textnode import TextNode, TextType
-from src.markdown_to_html import markdown_to_html_node
+from src.markdown_to_html import PageMetadata, markdown_to_html_node, parse_markdown, parse_page
 from src.markdown import (
     BlockType,
     split_nodes_delimiter, 
@@ -11,6 +11,7 @@ from src.markdown import (
     text_to_textnodes,
     markdown_to_blocks,
     block_to_block_type,
+    iter_blocks,
     extract_title
 )
 
@@ -20,11 +21,11 @@ class TestSplitNodesDelimiter(unittest.TestCase):
         self.assertEqual(block_to_block_type("# Heading"), BlockType.HEADING)
         self.assertEqual(block_to_block_type("###### Deep heading"), BlockType.HEADING)
 
-def test_block_to_block_type_code_block(self):
-    block = """```
+    def test_block_to_block_type_code_block(self):
+        block = """```
 code
 ```"""
-    self.assertEqual(block_to_block_type(block), BlockType.CODE)
+        self.assertEqual(block_to_block_type(block), BlockType.CODE)
 
 
     def test_block_to_block_type_quote(self):
@@ -264,6 +265,85 @@ the **same** even with inline stuff
 
 
 
+class TestTextToTextNodes(unittest.TestCase):
+    def test_link_url_with_underscore(self):
+        text = "See [docs](https://example.com/a_b) and _this_"
+        expected = [
+            TextNode("See ", TextType.TEXT, None),
+            TextNode("docs", TextType.LINK, "https://example.com/a_b"),
+            TextNode(" and ", TextType.TEXT, None),
+            TextNode("this", TextType.ITALIC, None),
+        ]
+        self.assertListEqual(text_to_textnodes(text), expected)
+
+    def test_code_keeps_delimiters(self):
+        text = "Run `a * b` now"
+        expected = [
+            TextNode("Run ", TextType.TEXT, None),
+            TextNode("a * b", TextType.CODE, None),
+            TextNode(" now", TextType.TEXT, None),
+        ]
+        self.assertListEqual(text_to_textnodes(text), expected)
+
+    def test_matches_split_pipeline(self):
+        text = "A **b** *c* [d](/e) ![f](/g.png) `h` _i_ end"
+        nodes = [TextNode(text, TextType.TEXT, None)]
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+        nodes = split_nodes_link(split_nodes_image(nodes))
+        self.assertListEqual(text_to_textnodes(text), nodes)
+
+    def test_linked_image(self):
+        expected = [
+            TextNode("[", TextType.TEXT, None),
+            TextNode("logo", TextType.IMAGE, "/images/logo.png"),
+            TextNode("](/about)", TextType.TEXT, None),
+        ]
+        self.assertListEqual(text_to_textnodes("[![logo](/images/logo.png)](/about)"), expected)
+
+    def test_emphasis_in_link_label_matches_split_pipeline(self):
+        text = "[ b *c* [x](/u)"
+        nodes = [TextNode(text, TextType.TEXT, None)]
+        nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+        nodes = split_nodes_link(split_nodes_image(nodes))
+        self.assertListEqual(text_to_textnodes(text), nodes)
+
+    def test_unmatched_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("Unmatched **bold")
+
+
+class TestIterBlocks(unittest.TestCase):
+    def assertMatchesBlocks(self, md):
+        expected = [(block_to_block_type(b), b) for b in markdown_to_blocks(md)]
+        self.assertEqual(list(iter_blocks(md.split("\n"))), expected)
+        # Lines read from a file keep their newline
+        self.assertEqual(list(iter_blocks(md.splitlines(keepends=True))), expected)
+
+    def test_matches_markdown_to_blocks(self):
+        self.assertMatchesBlocks("# Title\n\nSome *text*\nmore\n\n\n\n- a\n- b\n\n1. one\n2. two\n")
+        self.assertMatchesBlocks("\n\n  \n  Indented start\n\n> quote\n> more\n  \n\n```\ncode\n```")
+        self.assertMatchesBlocks("a\n  \nb\n\n \nc\n\n\nd")
+        self.assertMatchesBlocks("")
+
+    def test_yields_before_input_is_exhausted(self):
+        def lines():
+            yield "# Title"
+            yield ""
+            raise AssertionError("read past the first block")
+        blocks = iter_blocks(lines())
+        self.assertEqual(next(blocks), (BlockType.HEADING, "# Title"))
+
+    def test_paragraph_without_period_is_not_ordered_list(self):
+        self.assertEqual(block_to_block_type("Just words\nand more"), BlockType.PARAGRAPH)
+
+    def test_ordered_list_needs_every_line_numbered(self):
+        self.assertEqual(block_to_block_type("1. one\nloose line"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. one\n10. ten"), BlockType.ORDERED_LIST)
+
+
 class TestExtractTitle(unittest.TestCase):
     def test_simple_h1(self):
         md = "# Hello"
@@ -305,6 +385,53 @@ class TestExtractTitle(unittest.TestCase):
             extract_title(md)
 
 
+class TestParseMarkdown(unittest.TestCase):
+    MD = """# The **Title**
+
+Intro with [a link](/blog/) and ![a pic](/img.png) too.
+
+## Part one
+
+```
+# not a heading or a title
+```
+
+- [ext](https://example.com) item"""
+
+    def test_tree_matches_markdown_to_html_node(self):
+        node, _ = parse_markdown(self.MD, "/base/")
+        self.assertEqual(node.to_html(), markdown_to_html_node(self.MD, "/base/").to_html())
+
+    def test_metadata(self):
+        _, metadata = parse_markdown(self.MD, "/base/")
+        self.assertEqual(metadata.title, "The **Title**")
+        self.assertEqual(metadata.outline, [(1, "The Title"), (2, "Part one")])
+        self.assertEqual(metadata.links, [("a link", "/blog/"), ("ext", "https://example.com")])
+        self.assertEqual(metadata.images, [("a pic", "/img.png")])
+        # Words in link text and image alt text count; code blocks don't
+        self.assertEqual(metadata.word_count, 14)
+        self.assertEqual(PageMetadata.from_dict(metadata.as_dict()), metadata)
+
+    def test_title_matches_extract_title(self):
+        for md in (self.MD, "Intro\n\n   # Indented\n\n# Second", "# Only"):
+            metadata, _ = parse_page(md)
+            self.assertEqual(metadata.title, extract_title(md))
+
+    def test_title_falls_back_to_any_h1_line(self):
+        md = "> quoted\n# Title in a quote block"
+        self.assertIsNone(parse_markdown(md)[1].title)
+        self.assertEqual(parse_page(md)[0].title, "Title in a quote block")
+
+    def test_front_matter_title_wins(self):
+        metadata, html = parse_page("---\ntitle: Custom\ntags: [a]\n---\n# Heading\n\nBody.")
+        self.assertEqual(metadata.title, "Custom")
+        self.assertEqual(metadata.front_matter, {"title": "Custom", "tags": ["a"]})
+        self.assertEqual(html, "<div><h1>Heading</h1><p>Body.</p></div>")
+
+    def test_missing_title_raises(self):
+        with self.assertRaises(ValueError):
+            parse_page("## Not top level")
+
 
 if __name__ == "__main__":
     unittest.main()
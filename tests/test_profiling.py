@@ -0,0 +1,90 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.content_cache import ContentCache
+from src.main import build_pages, generate_page
+from src.profiling import STAGES, BuildReport, PageProfile
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+class TestPageProfile(unittest.TestCase):
+    def test_timed_accumulates_calls(self):
+        profile = PageProfile("a.md")
+        double = profile.timed("inline", lambda x: x * 2)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(3), 6)
+        data = profile.as_dict()
+        self.assertEqual(list(data["stages"]), ["inline"])
+        self.assertGreaterEqual(data["wall"], 0.0)
+
+    def test_measure_records_on_error(self):
+        profile = PageProfile("a.md")
+        with self.assertRaises(ValueError):
+            with profile.measure("read"):
+                raise ValueError("boom")
+        self.assertIn("read", profile.stages)
+
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.root = root
+        self.content = root / "content"
+        self.out = root / "docs"
+        self.template = root / "template.html"
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+        for i in range(3):
+            page = self.content / f"page{i}" / "index.md"
+            page.parent.mkdir(parents=True)
+            page.write_text(f"# Page {i}\n\nSee [home](/) and **{i}**.", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build(self, report, incremental=False, cache=None):
+        build_pages(self.content, self.template, self.out, "/base/",
+                    manifest_path=self.root / "manifest.json", incremental=incremental,
+                    report=report, cache=cache)
+
+    def test_profiled_output_matches_streamed(self):
+        src = self.content / "page0" / "index.md"
+        plain, profiled = self.root / "plain.html", self.root / "profiled.html"
+        profile = PageProfile("page0/index.md")
+        self.assertEqual(generate_page(src, self.template, plain, "/base/"),
+                         generate_page(src, self.template, profiled, "/base/", profile))
+        self.assertEqual(plain.read_bytes(), profiled.read_bytes())
+        self.assertEqual(profile.bytes_in, src.stat().st_size)
+        self.assertEqual(profile.bytes_out, profiled.stat().st_size)
+
+    def test_report_covers_every_stage(self):
+        report = BuildReport()
+        report.set_static(0.5, 2, 1000)
+        # A cold cache is looked up, misses, and then every parsing stage runs
+        self.build(report, cache=ContentCache(self.root / "cache"))
+        data = report.to_dict(slowest=2)
+        self.assertEqual(data["pages_rendered"], 3)
+        self.assertEqual(data["pages_skipped"], 0)
+        self.assertEqual(list(data["stages"]), list(STAGES))
+        self.assertEqual(len(data["slowest_pages"]), 2)
+        self.assertEqual(data["static"]["bytes_per_second"], 2000)
+        self.assertIn("slowest pages:", report.summary())
+
+        path = self.root / "report.json"
+        report.write(path)
+        self.assertEqual(json.loads(path.read_text())["pages_rendered"], 3)
+
+    def test_skipped_pages_counted(self):
+        self.build(None, incremental=True)
+        report = BuildReport()
+        self.build(report, incremental=True)
+        self.assertEqual(report.to_dict()["pages_rendered"], 0)
+        self.assertEqual(report.skipped, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
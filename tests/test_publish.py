@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.main import generate_page
+from src.publish import prepare_staging, publish, staging_dir
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.live = self.root / "docs"
+        (self.live / "blog").mkdir(parents=True)
+        (self.live / "index.html").write_text("old home", encoding="utf-8")
+        (self.live / "blog" / "index.html").write_text("old blog", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_carry_over_uses_hardlinks(self):
+        staging = prepare_staging(self.live, carry_over=True)
+        self.assertEqual((staging / "blog" / "index.html").stat().st_ino,
+                         (self.live / "blog" / "index.html").stat().st_ino)
+
+    def test_without_carry_over_staging_is_empty(self):
+        self.assertEqual(list(prepare_staging(self.live).iterdir()), [])
+
+    def test_leftover_staging_is_discarded(self):
+        leftover = staging_dir(self.live)
+        leftover.mkdir()
+        (leftover / "half-written.html").write_text("x", encoding="utf-8")
+        staging = prepare_staging(self.live, carry_over=True)
+        self.assertFalse((staging / "half-written.html").exists())
+
+    def test_rendering_over_a_carried_file_leaves_live_alone(self):
+        staging = prepare_staging(self.live, carry_over=True)
+        page = self.root / "index.md"
+        page.write_text("# New home", encoding="utf-8")
+        template = self.root / "template.html"
+        template.write_text("{{ Title }}", encoding="utf-8")
+        generate_page(page, template, staging / "index.html")
+        self.assertEqual((self.live / "index.html").read_text(encoding="utf-8"), "old home")
+        self.assertEqual((staging / "index.html").read_text(encoding="utf-8"), "New home")
+
+    def test_publish_swaps_directories(self):
+        staging = prepare_staging(self.live)
+        (staging / "index.html").write_text("new home", encoding="utf-8")
+        publish(staging, self.live)
+        self.assertEqual((self.live / "index.html").read_text(encoding="utf-8"), "new home")
+        self.assertFalse((self.live / "blog").exists())
+        self.assertFalse(staging.exists())
+
+    def test_publish_creates_missing_output(self):
+        fresh = self.root / "site"
+        staging = prepare_staging(fresh)
+        (staging / "index.html").write_text("home", encoding="utf-8")
+        publish(staging, fresh)
+        self.assertTrue((fresh / "index.html").is_file())
+
+    def test_publish_flips_symlink(self):
+        site = self.root / "site"
+        site.symlink_to(self.live, target_is_directory=True)
+        for content in ("first", "second"):
+            staging = prepare_staging(site, carry_over=True)
+            (staging / "index.html").unlink()
+            (staging / "index.html").write_text(content, encoding="utf-8")
+            publish(staging, site)
+            self.assertTrue(site.is_symlink())
+            self.assertEqual((site / "index.html").read_text(encoding="utf-8"), content)
+        # The hand-made target is kept; only the superseded build is removed
+        self.assertEqual((self.live / "index.html").read_text(encoding="utf-8"), "old home")
+        self.assertEqual(len(list(self.root.glob(".site.*"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
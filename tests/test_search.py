@@ -0,0 +1,128 @@
+import json
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from src.content_cache import ContentCache
+from src.main import BuildOptions, build_pages
+from src.markdown_to_html import parse_markdown
+from src.search import SEARCH_DIR, TERM_RE, TermSpill, tokenize, update_search_index
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+def read(root: Path, *parts):
+    return json.loads((root / SEARCH_DIR).joinpath(*parts).read_text(encoding="utf-8"))
+
+
+class TestTokenize(unittest.TestCase):
+    def test_words_are_lowercased_and_split_on_punctuation(self):
+        self.assertEqual(tokenize("Tom's snake_case, x 42 (Bombadil)!"), ["tom", "snake", "case", "42", "bombadil"])
+
+    def test_ascii_fast_path_matches_the_regex(self):
+        text = "A-b c\td\x00ef [link](/u) **Gh**\n`ij`"
+        self.assertEqual(tokenize(text), TERM_RE.findall(text.lower()))
+
+    def test_non_ascii_words(self):
+        self.assertEqual(tokenize("Eärendil und Námo"), ["eärendil", "und", "námo"])
+
+    def test_terms_skip_code_blocks_and_urls(self):
+        _, metadata = parse_markdown("# Title\n\nSee [the docs](/guide/setup).\n\n```\nhidden code\n```",
+                                     collect_terms=True)
+        self.assertEqual(metadata.terms, Counter({"title": 1, "see": 1, "the": 1, "docs": 1}))
+        self.assertIsNone(parse_markdown("text")[1].terms)
+
+
+class TestUpdateSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self._tmp.name)
+        self.pages = {"a.md": ("/a.html", "A"), "b.md": ("/b.html", "B")}
+        self.state = update_search_index(self.out, self.pages, {
+            "a.md": Counter({"apple": 2, "banana": 1}),
+            "b.md": Counter({"banana": 3, "cherry": 1}),
+        })
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_postings_and_docs(self):
+        self.assertEqual(read(self.out, "terms", "ba.json"), {"banana": [0, 1, 1, 3]})
+        self.assertEqual(read(self.out, "docs", "0.json"), [["/a.html", "A"], ["/b.html", "B"]])
+        index = read(self.out, "index.json")
+        self.assertEqual(index["shards"], {"ap": "ap.json", "ba": "ba.json", "ch": "ch.json"})
+        self.assertEqual(index["doc_count"], 2)
+
+    def test_update_rewrites_only_affected_shards(self):
+        untouched = (self.out / SEARCH_DIR / "terms" / "ap.json").stat().st_ino
+        pages = dict(self.pages, **{"c.md": ("/c.html", "C")})
+        state = update_search_index(self.out, pages, {
+            "b.md": Counter({"banana": 1, "date": 2}),
+            "c.md": Counter({"cherry": 5}),
+        }, self.state)
+        self.assertEqual((self.out / SEARCH_DIR / "terms" / "ap.json").stat().st_ino, untouched)
+        self.assertEqual(read(self.out, "terms", "ba.json"), {"banana": [0, 1, 1, 1]})
+        self.assertEqual(read(self.out, "terms", "ch.json"), {"cherry": [2, 5]})
+        self.assertEqual(read(self.out, "terms", "da.json"), {"date": [1, 2]})
+        self.assertEqual(state["pages"]["b.md"], [1, "bada"])
+
+    def test_removed_page_keeps_its_id_retired(self):
+        state = update_search_index(self.out, {"b.md": self.pages["b.md"]}, {}, self.state)
+        self.assertFalse((self.out / SEARCH_DIR / "terms" / "ap.json").exists())
+        self.assertEqual(read(self.out, "terms", "ba.json"), {"banana": [1, 3]})
+        self.assertEqual(read(self.out, "docs", "0.json"), [None, ["/b.html", "B"]])
+        self.assertNotIn("ap", read(self.out, "index.json")["shards"])
+        self.assertEqual(state["next_id"], 2)
+
+    def test_spilled_terms_give_the_same_index(self):
+        spill = TermSpill(max_bytes=1)
+        spill.add("b.md", Counter({"banana": 3, "cherry": 1}))
+        spill.add("a.md", Counter({"apple": 2, "banana": 1}))
+        other = self.out / "spilled"
+        try:
+            self.assertEqual(update_search_index(other, self.pages, spill), self.state)
+        finally:
+            spill.close()
+        for path in (self.out / SEARCH_DIR).rglob("*.json"):
+            self.assertEqual(path.read_bytes(), (other / path.relative_to(self.out)).read_bytes())
+
+
+class TestBuildWithSearch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.content = root / "content"
+        self.out = root / "docs"
+        self.template = root / "template.html"
+        self.manifest = root / "manifest.json"
+        self.cache = ContentCache(root / "cache")
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+        for name, body in [("elves", "Legolas and Glorfindel"), ("hobbits", "Frodo and Sam")]:
+            page = self.content / name / "index.md"
+            page.parent.mkdir(parents=True)
+            page.write_text(f"# {name.title()}\n\n{body}", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build(self, search=False):
+        return build_pages(self.content, self.template, self.out, "/site/", manifest_path=self.manifest,
+                           incremental=True, cache=self.cache, options=BuildOptions(search=search))
+
+    def test_cached_pages_without_terms_are_indexed(self):
+        self.build()
+        self.assertEqual(len(self.build(search=True)), 2)
+        self.assertEqual(read(self.out, "terms", "an.json"), {"and": [0, 1, 1, 1]})
+        self.assertEqual(read(self.out, "docs", "0.json"), [["/site/elves/", "Elves"], ["/site/hobbits/", "Hobbits"]])
+        self.assertEqual(self.build(search=True), [])
+
+    def test_turning_search_off_removes_the_index(self):
+        self.build(search=True)
+        self.build()
+        self.assertFalse((self.out / SEARCH_DIR).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
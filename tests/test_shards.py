@@ -0,0 +1,95 @@
+import argparse
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.main import build_pages
+from src.manifest import BuildManifest
+from src.shards import SHARD_MANIFEST_NAME, ShardError, merge_shards, parse_shard, shard_of
+
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+class TestPartition(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(bad)
+
+    def test_shard_of_is_stable(self):
+        # Fixed values: the partition must not change between runs or machines
+        self.assertEqual([shard_of(f"blog/{i}/index.md", 4) for i in range(6)], [3, 3, 4, 4, 3, 2])
+
+    def test_every_page_lands_in_exactly_one_shard(self):
+        sources = [f"p{i}.md" for i in range(200)]
+        counts = [sum(shard_of(s, 4) == k for s in sources) for k in range(1, 5)]
+        self.assertEqual(sum(counts), 200)
+        self.assertTrue(all(30 <= c <= 70 for c in counts), counts)
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.content = self.root / "content"
+        self.template = self.root / "template.html"
+        self.template.write_text(TEMPLATE, encoding="utf-8")
+        for i in range(8):
+            page = self.content / "blog" / f"post{i}" / "index.md"
+            page.parent.mkdir(parents=True)
+            page.write_text(f"---\ndate: 2024-01-0{i + 1}\n---\n# Post {i}\n\n[home](/)", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build_shards(self, count):
+        dirs = []
+        for index in range(1, count + 1):
+            out = self.root / f"shard{index}"
+            build_pages(self.content, self.template, out, "/base/",
+                        manifest_path=out / SHARD_MANIFEST_NAME, shard=(index, count))
+            dirs.append(out)
+        return dirs
+
+    def read_tree(self, root):
+        return {p.relative_to(root).as_posix(): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+
+    def test_merge_matches_full_build(self):
+        full = self.root / "full"
+        build_pages(self.content, self.template, full, "/base/", manifest_path=self.root / "full.json")
+        merged = self.root / "merged"
+        manifest_path = self.root / "merged.json"
+        merge_shards(self.build_shards(3), merged, self.template, "/base/", manifest_path)
+        self.assertEqual(self.read_tree(merged), self.read_tree(full))
+
+        # The merged manifest lets an incremental build reuse every page
+        rendered = build_pages(self.content, self.template, merged, "/base/",
+                               manifest_path=manifest_path, incremental=True)
+        self.assertEqual(rendered, [])
+
+    def test_missing_shard(self):
+        dirs = self.build_shards(3)
+        with self.assertRaisesRegex(ShardError, "missing shard"):
+            merge_shards(dirs[:2], self.root / "merged", self.template, "/base/")
+
+    def test_overlapping_outputs(self):
+        dirs = self.build_shards(2)
+        first = BuildManifest.load(dirs[0] / SHARD_MANIFEST_NAME)
+        second_path = dirs[1] / SHARD_MANIFEST_NAME
+        data = json.loads(second_path.read_text())
+        data["pages"]["extra.md"] = next(iter(first.pages.values()))
+        second_path.write_text(json.dumps(data))
+        with self.assertRaisesRegex(ShardError, "is produced by shards"):
+            merge_shards(dirs, self.root / "merged", self.template, "/base/")
+
+    def test_mismatched_basepath(self):
+        dirs = self.build_shards(2)
+        with self.assertRaisesRegex(ShardError, "different template"):
+            merge_shards(dirs, self.root / "merged", self.template, "/other/")
+
+
+if __name__ == "__main__":
+    unittest.main()
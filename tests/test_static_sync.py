@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from unittest import mock
+
+from src.assets import fingerprinted_name
+from src.manifest import hash_bytes
+from src.static_sync import sync_static
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.src = root / "static"
+        self.dst = root / "docs"
+        (self.src / "images").mkdir(parents=True)
+        (self.src / "index.css").write_text("body {}", encoding="utf-8")
+        (self.src / "images" / "a.png").write_bytes(b"png-a")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_initial_sync_copies_everything(self):
+        state = sync_static(self.src, self.dst)
+        self.assertEqual(sorted(state), ["images/a.png", "index.css"])
+        self.assertEqual((self.dst / "images" / "a.png").read_bytes(), b"png-a")
+
+    def test_unchanged_files_are_not_copied_again(self):
+        state = sync_static(self.src, self.dst)
+        target = self.dst / "index.css"
+        marker = target.stat().st_ino
+        sync_static(self.src, self.dst, state)
+        self.assertEqual(target.stat().st_ino, marker)
+
+    def test_changed_file_is_copied(self):
+        state = sync_static(self.src, self.dst)
+        (self.src / "index.css").write_text("body { color: red }", encoding="utf-8")
+        sync_static(self.src, self.dst, state)
+        self.assertIn("red", (self.dst / "index.css").read_text(encoding="utf-8"))
+
+    def test_removed_source_is_deleted_but_pages_are_kept(self):
+        state = sync_static(self.src, self.dst)
+        (self.dst / "index.html").write_text("page", encoding="utf-8")
+        (self.src / "images" / "a.png").unlink()
+        state["index.html"] = [4, 0]  # pretend a page shares a previously synced name
+        sync_static(self.src, self.dst, state, keep={"index.html"})
+        self.assertFalse((self.dst / "images").exists())
+        self.assertTrue((self.dst / "index.html").exists())
+
+    def test_hash_mode_ignores_touched_but_identical_files(self):
+        state = sync_static(self.src, self.dst)
+        target = self.dst / "index.css"
+        marker = target.stat().st_ino
+        os.utime(self.src / "index.css", ns=(0, 10**9))
+        sync_static(self.src, self.dst, state, verify_hash=True)
+        self.assertEqual(target.stat().st_ino, marker)
+
+    def test_hardlink_mode(self):
+        sync_static(self.src, self.dst, link="hardlink")
+        self.assertTrue(os.path.samefile(self.src / "index.css", self.dst / "index.css"))
+
+    def test_fingerprint_places_hashed_copies(self):
+        state = sync_static(self.src, self.dst, fingerprint=True)
+        digest = hash_bytes(b"png-a")
+        self.assertEqual(state["images/a.png"][2], digest)
+        hashed = self.dst / fingerprinted_name("images/a.png", digest)
+        self.assertEqual(hashed.read_bytes(), b"png-a")
+        self.assertTrue((self.dst / "images" / "a.png").exists())
+
+    def test_fingerprint_hashes_are_reused_while_stat_is_unchanged(self):
+        state = sync_static(self.src, self.dst, fingerprint=True)
+        with mock.patch("src.static_sync.hash_file") as hash_file:
+            self.assertEqual(sync_static(self.src, self.dst, state, fingerprint=True), state)
+        hash_file.assert_not_called()
+
+    def test_fingerprint_of_old_content_is_removed(self):
+        state = sync_static(self.src, self.dst, fingerprint=True)
+        old = self.dst / fingerprinted_name("index.css", state["index.css"][2])
+        (self.src / "index.css").write_text("body { color: red }", encoding="utf-8")
+        state = sync_static(self.src, self.dst, state, fingerprint=True)
+        self.assertFalse(old.exists())
+        self.assertTrue((self.dst / fingerprinted_name("index.css", state["index.css"][2])).exists())
+        sync_static(self.src, self.dst, state)
+        self.assertEqual(sorted(p.name for p in self.dst.iterdir()), ["images", "index.css"])
+
+    def test_unknown_link_mode_raises(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.src, self.dst, link="symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
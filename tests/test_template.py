@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.htmlnode import LeafNode, ParentNode
+from src.template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compiles_literals_and_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.literals, ["<title>", "</title><main>", "</main>"])
+        self.assertEqual([name for name, _ in template.slots], ["Title", "Content"])
+
+    def test_render_with_extra_slots(self):
+        template = Template("{{ Title }} | {{ Date }} | {{Path}}")
+        self.assertEqual(
+            template.render({"Title": "T", "Date": "2024-01-01", "Path": "/a"}),
+            "T | 2024-01-01 | /a",
+        )
+
+    def test_callable_values_are_streamed(self):
+        node = ParentNode("p", [LeafNode("b", "hi")])
+        template = Template("<article>{{ Content }}</article>")
+        chunks = list(template.iter_chunks({"Content": node.iter_html}))
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual("".join(chunks), "<article><p><b>hi</b></p></article>")
+
+    def test_missing_slot_is_left_untouched(self):
+        self.assertEqual(Template("a {{ Other }} b").render({}), "a {{ Other }} b")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("plain").render({"Title": "x"}), "plain")
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def test_cached_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "template.html"
+            path.write_text("<h1>{{ Title }}</h1>", encoding="utf-8")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            path.write_text("<h2>{{ Title }}</h2>", encoding="utf-8")
+            st = path.stat()
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            self.assertEqual(load_template(path).render({"Title": "x"}), "<h2>x</h2>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from src.converters import text_node_to_html_node
+from src.markdown_to_html import markdown_to_html_node
+from src.template import Template
+from src.textnode import TextNode, TextType
+from src.assets import AssetMap
+from src.urls import normalize_basepath, prefix_url
+
+ASSETS = AssetMap({"/index.css": "/index.0123456789.css", "/a.png": "/a.abcdef0123.png"})
+
+
+class TestBasepath(unittest.TestCase):
+    def test_normalize_basepath(self):
+        self.assertEqual(normalize_basepath("/"), "")
+        self.assertEqual(normalize_basepath(""), "")
+        self.assertEqual(normalize_basepath("site"), "/site")
+        self.assertEqual(normalize_basepath("/site/"), "/site")
+
+    def test_prefix_url(self):
+        self.assertEqual(prefix_url("/images/a.png", "/site"), "/site/images/a.png")
+        self.assertEqual(prefix_url("/", "/site"), "/site/")
+        self.assertEqual(prefix_url("https://a.com/x", "/site"), "https://a.com/x")
+        self.assertEqual(prefix_url("//cdn.com/x", "/site"), "//cdn.com/x")
+        self.assertEqual(prefix_url("page.html", "/site"), "page.html")
+        self.assertEqual(prefix_url("/x", ""), "/x")
+
+    def test_converter_prefixes_link_and_image(self):
+        link = text_node_to_html_node(TextNode("Home", TextType.LINK, "/blog"), "/site")
+        image = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/a.png"), "/site")
+        self.assertEqual(link.props["href"], "/site/blog")
+        self.assertEqual(image.props["src"], "/site/a.png")
+
+    def test_code_that_looks_like_an_attribute_is_untouched(self):
+        md = 'See [home](/) and `href="/x"`.'
+        html = markdown_to_html_node(md, "/site/").to_html()
+        self.assertEqual(
+            html, '<div><p>See <a href="/site/">home</a> and <code>href="/x"</code>.</p></div>'
+        )
+
+    def test_prefix_url_with_assets(self):
+        self.assertEqual(prefix_url("/a.png", "/site", ASSETS), "/site/a.abcdef0123.png")
+        self.assertEqual(prefix_url("/index.css?v=2", "", ASSETS), "/index.0123456789.css?v=2")
+        self.assertEqual(prefix_url("/other.png", "/site", ASSETS), "/site/other.png")
+        self.assertEqual(prefix_url("a.png", "/site", ASSETS), "a.png")
+
+    def test_fingerprinted_urls_in_pages_and_template(self):
+        html = markdown_to_html_node("![logo](/a.png) [css](/index.css)", "/site/", assets=ASSETS).to_html()
+        self.assertEqual(html, '<div><p><img src="/site/a.abcdef0123.png" alt="logo"></img> '
+                               '<a href="/site/index.0123456789.css">css</a></p></div>')
+        template = Template('<link href="/index.css" />', "", ASSETS)
+        self.assertEqual(template.render({}), '<link href="/index.0123456789.css" />')
+
+    def test_template_urls_prefixed_at_compile_time(self):
+        template = Template('<link href="/index.css" /><img src="https://a.com/x.png" />', "/site")
+        self.assertEqual(
+            template.render({}), '<link href="/site/index.css" /><img src="https://a.com/x.png" />'
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
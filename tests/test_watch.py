@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.watch import diff_snapshots, snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_detects_added_modified_and_removed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "sub").mkdir()
+            keep, edit, gone = root / "keep.md", root / "sub" / "edit.md", root / "gone.md"
+            for path in (keep, edit, gone):
+                path.write_text("x", encoding="utf-8")
+            before = snapshot(root)
+
+            edit.write_text("changed", encoding="utf-8")
+            gone.unlink()
+            added = root / "sub" / "new.md"
+            added.write_text("new", encoding="utf-8")
+            changed, removed = diff_snapshots(before, snapshot(root))
+
+            self.assertEqual(changed, {edit, added})
+            self.assertEqual(removed, {gone})
+
+    def test_single_file_roots_and_missing_roots(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template = Path(tmp) / "template.html"
+            template.write_text("t", encoding="utf-8")
+            files = snapshot(template, Path(tmp) / "missing")
+            self.assertEqual(list(files), [template])
+
+    def test_touch_counts_as_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.md"
+            path.write_text("x", encoding="utf-8")
+            before = snapshot(Path(tmp))
+            st = path.stat()
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            self.assertEqual(diff_snapshots(before, snapshot(Path(tmp)))[0], {path})
+
+
+if __name__ == "__main__":
+    unittest.main()